@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark
+Runs chaos experiments against local sandboxes to measure orchestration overhead
+(sandbox setup, script upload, monitoring and metrics collection) without E2B
+
+Usage:
+    python benchmark_pipeline.py --experiments 8 --concurrency 4 --duration 10
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+
+from services.async_e2b_manager import AsyncE2BManager
+from services.sandbox_backends import LocalSandboxBackend
+
+
+async def run_one(backend: LocalSandboxBackend, scenario: str, duration: int, slots: asyncio.Semaphore) -> dict:
+    """Run a single experiment and time each pipeline stage"""
+    async with slots:
+        manager = AsyncE2BManager(api_key="", backend=backend)
+        timings = {}
+
+        start = time.perf_counter()
+        await manager.create_sandbox()
+        timings["create"] = time.perf_counter() - start
+
+        try:
+            start = time.perf_counter()
+            await manager.deploy_test_app()
+            timings["deploy"] = time.perf_counter() - start
+
+            config = {"duration": duration, "intensity": "low"}
+            baseline_seconds, recovery_seconds = manager._phase_seconds(config)
+            start = time.perf_counter()
+            metrics = await manager.run_chaos_script(scenario, config)
+            timings["run"] = time.perf_counter() - start
+            # Time spent outside the baseline, fault and recovery phases themselves
+            timings["overhead"] = timings["run"] - (baseline_seconds + duration + recovery_seconds)
+            timings["samples"] = len(metrics.get("timeline", []))
+        finally:
+            start = time.perf_counter()
+            await manager.cleanup()
+            timings["cleanup"] = time.perf_counter() - start
+
+        return timings
+
+
+async def run_all(backend: LocalSandboxBackend, args) -> list:
+    """Run the experiments, at most `args.concurrency` at once"""
+    slots = asyncio.Semaphore(args.concurrency)
+    outcomes = await asyncio.gather(
+        *(run_one(backend, args.scenario, args.duration, slots) for _ in range(args.experiments)),
+        return_exceptions=True
+    )
+    results = []
+    for outcome in outcomes:
+        if isinstance(outcome, Exception):
+            print(f"❌ Experiment failed: {outcome}")
+        else:
+            results.append(outcome)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the experiment pipeline on local sandboxes")
+    parser.add_argument("--experiments", type=int, default=4, help="Number of experiments to run")
+    parser.add_argument("--concurrency", type=int, default=2, help="Experiments running at once")
+    parser.add_argument("--duration", type=int, default=10, help="Chaos duration per experiment (s)")
+    parser.add_argument("--scenario", default="process_kill", help="Chaos scenario to run")
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline logs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    backend = LocalSandboxBackend()
+    print(f"🚀 Running {args.experiments} x {args.scenario} ({args.duration}s) with concurrency {args.concurrency}")
+
+    wall_start = time.perf_counter()
+    results = asyncio.run(run_all(backend, args))
+    wall = time.perf_counter() - wall_start
+
+    if not results:
+        print("❌ No experiment completed")
+        return False
+
+    print(f"\n📊 {len(results)}/{args.experiments} experiments in {wall:.1f}s "
+          f"({len(results) / wall * 60:.1f} experiments/min)\n")
+    for stage in ("create", "deploy", "run", "overhead", "cleanup", "samples"):
+        values = [r[stage] for r in results if stage in r]
+        if values:
+            print(f"  {stage:<9} median={statistics.median(values):7.2f}  max={max(values):7.2f}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
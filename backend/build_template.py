@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+E2B Template Builder
+Builds the prebaked ChaosLab sandbox template from test-app/Dockerfile
+(python3, curl, Flask and the test app preinstalled)
+
+Requires the E2B CLI: npm install -g @e2b/cli && e2b auth login
+"""
+
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+TEST_APP_DIR = Path(__file__).resolve().parent.parent / "test-app"
+TEMPLATE_NAME = "chaoslab-test-app"
+
+
+def build_template():
+    """Build the template and print its id"""
+    if not shutil.which("e2b"):
+        print("❌ ERROR: E2B CLI not found")
+        print("\nInstall it with: npm install -g @e2b/cli")
+        print("Then log in with: e2b auth login")
+        return False
+
+    print(f"🔨 Building E2B template '{TEMPLATE_NAME}' from {TEST_APP_DIR / 'Dockerfile'}...")
+    result = subprocess.run(
+        [
+            "e2b", "template", "build",
+            "--name", TEMPLATE_NAME,
+            "--dockerfile", "Dockerfile",
+            "--cpu-count", "2",
+            "--memory-mb", "1024"
+        ],
+        cwd=TEST_APP_DIR
+    )
+    if result.returncode != 0:
+        print("❌ Template build failed")
+        return False
+
+    # The CLI records the template id in e2b.toml next to the Dockerfile
+    config_file = TEST_APP_DIR / "e2b.toml"
+    match = None
+    if config_file.exists():
+        match = re.search(r'template_id\s*=\s*"([^"]+)"', config_file.read_text())
+
+    if not match:
+        print("⚠️  WARNING: Build finished but template id not found in e2b.toml")
+        print(f"Use the template name instead: E2B_TEMPLATE_ID={TEMPLATE_NAME}")
+        return True
+
+    print("✅ Template built successfully!")
+    print("\nAdd this to your .env:")
+    print(f"E2B_TEMPLATE_ID={match.group(1)}")
+    return True
+
+
+if __name__ == "__main__":
+    success = build_template()
+    sys.exit(0 if success else 1)
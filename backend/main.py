@@ -1,12 +1,14 @@
 import os
+import asyncio
 import uuid
 import logging
 import time
-from datetime import datetime
-from typing import Dict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
@@ -16,12 +18,24 @@ from models import (
     ExperimentResponse,
     StatusResponse,
     ResultsResponse,
+    InstanceSeries,
+    LogsResponse,
     ExperimentStatus,
     ExperimentMetrics
 )
-from services.e2b_manager import E2BManager
+from services.e2b_manager import E2BManager, TEST_APP_SOURCE
+from services.async_e2b_manager import AsyncE2BManager
 from services.groq_analyzer import GroqAnalyzer
 from services.grafana_mcp_client import GrafanaMCPClient  # New MCP-based client
+from services.job_runner import ExperimentJobRunner
+from services.admission import SandboxAdmissionController
+from services.sandbox_pool import SandboxPool
+from services.sandbox_backends import create_sandbox_backend
+from services.event_bus import ExperimentEventBus, format_sse
+from services.experiment_store import ExperimentStore
+from services.analysis_cache import AnalysisCache
+from services.code_context import CodeContext
+from services.log_index import LOG_TIME_FORMAT
 
 # Load environment variables
 load_dotenv()
@@ -38,27 +52,113 @@ class Settings(BaseSettings):
     """Application settings from environment"""
     model_config = {"env_file": ".env"}
     
-    e2b_api_key: str
+    e2b_api_key: str = ""
     groq_api_key: str
     groq_model: str = "mixtral-8x7b-32768"
     grafana_mcp_url: str = "http://localhost:8000"  # Grafana MCP default
     backend_port: int = 9000  # Backend port
     backend_host: str = "0.0.0.0"
+    sandbox_backend: str = "e2b"  # "e2b" or "local" (runs sandboxes as local processes)
+    e2b_template_id: Optional[str] = None  # Prebaked test app template (see build_template.py)
+    max_concurrent_experiments: int = 4  # Experiment pipelines running at once
+    sandbox_pool_size: int = 0  # Warm sandboxes kept ready (0 disables the pool); reserved out of max_concurrent_sandboxes
+    sandbox_pool_idle_ttl: int = 600  # Seconds before an idle pooled sandbox is replaced
+    experiment_db_path: str = "experiment_results/chaoslab.db"  # SQLite experiment store
+    experiment_cache_size: int = 256  # Experiment records cached in memory
+    max_concurrent_sandboxes: int = 10  # Sandboxes alive at once, warm pool included
+    analysis_cache_path: str = "experiment_results/analysis_cache.db"  # SQLite cache of Groq analyses
+    analysis_cache_ttl: int = 7 * 24 * 3600  # Seconds a cached analysis stays valid
+    analysis_cache_size: int = 512  # Cached analyses kept (0 disables the cache)
+    analysis_prompt_tokens: int = 4000  # Token budget of the analysis prompt (timeline, logs and code share it)
+    groq_timeout: float = 60.0  # Seconds an analysis may take before the fallback analysis is used
+    groq_hedge_after: float = 0  # Seconds before a second, hedged Groq request is sent (0 disables hedging)
+    max_concurrent_llm_calls: int = 4  # Groq requests in flight at once across all experiments
 
 
 # Initialize settings
 settings = Settings()
 
-# In-memory storage for experiments (use database in production)
-experiments: Dict[str, Dict] = {}
+# Persistent experiment storage (SQLite) with an in-memory LRU for hot records
+store = ExperimentStore(settings.experiment_db_path, cache_size=settings.experiment_cache_size)
+
+# Groq analyses reused for byte-identical prompts
+analysis_cache = AnalysisCache(
+    settings.analysis_cache_path,
+    ttl_seconds=settings.analysis_cache_ttl,
+    max_entries=settings.analysis_cache_size
+)
+
+# Test app source and endpoint summary for analysis prompts, re-parsed only when the file changes
+code_context = CodeContext(TEST_APP_SOURCE)
+
+# Groq analysis shared by all experiments, so they share its limit on in-flight LLM calls
+groq_analyzer = GroqAnalyzer(
+    settings.groq_api_key,
+    settings.groq_model,
+    cache=analysis_cache,
+    prompt_tokens=settings.analysis_prompt_tokens,
+    code_context=code_context,
+    deadline_seconds=settings.groq_timeout,
+    hedge_after_seconds=settings.groq_hedge_after or None,
+    max_concurrent_calls=settings.max_concurrent_llm_calls
+)
+
+# Where experiment sandboxes run
+sandbox_backend = create_sandbox_backend(
+    settings.sandbox_backend,
+    settings.e2b_api_key,
+    **({"template_id": settings.e2b_template_id} if settings.sandbox_backend == "e2b" else {})
+)
+
+# Live progress events for SSE viewers
+event_bus = ExperimentEventBus()
+
+# Bounded concurrency for experiment pipelines (async tasks on the event loop)
+job_runner = ExperimentJobRunner(max_workers=settings.max_concurrent_experiments)
+
+# FIFO admission of experiments against a global sandbox budget. The pool refills while
+# the sandboxes it handed out run under admitted slots, so its size is reserved out of the budget.
+if settings.sandbox_pool_size >= settings.max_concurrent_sandboxes:
+    raise ValueError(
+        f"SANDBOX_POOL_SIZE ({settings.sandbox_pool_size}) must be below "
+        f"MAX_CONCURRENT_SANDBOXES ({settings.max_concurrent_sandboxes})"
+    )
+sandbox_admission = SandboxAdmissionController(
+    max_sandboxes=settings.max_concurrent_sandboxes - settings.sandbox_pool_size
+)
+
+# Warm pool of sandboxes with the test app already deployed
+sandbox_pool = SandboxPool(
+    manager_factory=lambda: E2BManager(settings.e2b_api_key, backend=sandbox_backend),
+    size=settings.sandbox_pool_size,
+    idle_ttl=settings.sandbox_pool_idle_ttl
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     logger.info("Starting ChaosLab backend...")
+    event_bus.bind_loop(asyncio.get_running_loop())
+    interrupted = store.fail_incomplete(
+        "Backend restarted before the experiment finished",
+        [ExperimentStatus.PENDING.value, ExperimentStatus.RUNNING.value, ExperimentStatus.ANALYZING.value]
+    )
+    if interrupted:
+        logger.warning(f"Marked {interrupted} interrupted experiment(s) as failed")
+    try:
+        sandbox_backend.check_configured()
+        sandbox_pool.start()
+    except ValueError as e:
+        # Experiments are refused at start until the backend is configured
+        logger.error(f"Sandbox backend not configured: {e}")
     yield
     logger.info("Shutting down ChaosLab backend...")
+    await job_runner.ashutdown()
+    await asyncio.to_thread(sandbox_pool.stop)
+    store.close()
+    analysis_cache.close()
+    await groq_analyzer.aclose()
 
 
 # Initialize FastAPI app
@@ -96,12 +196,49 @@ async def root():
     }
 
 
-@app.post("/api/experiment/start", response_model=ExperimentResponse)
-async def start_experiment(request: StartExperimentRequest):
+def _update_experiment(experiment_id: str, **fields):
+    """Update an experiment record and notify live viewers of stage/progress changes"""
+    store.update(experiment_id, **fields)
+    
+    if "status" in fields or "progress" in fields:
+        event_bus.publish(experiment_id, "status", _status_payload(store.get(experiment_id)))
+
+
+def _status_payload(exp: Dict) -> Dict:
+    """Status fields shared by the status endpoint and the event stream"""
+    return {
+        "experiment_id": exp["id"],
+        "status": exp["status"],
+        "progress": exp.get("progress", 0),
+        "message": exp.get("error"),
+        "queue_position": _queue_position(exp["id"])
+    }
+
+
+def _queue_position(experiment_id: str) -> Optional[int]:
+    """Position in line for a pipeline slot and then sandbox capacity (None once admitted)"""
+    position = job_runner.queue_position(experiment_id)
+    if position is not None:
+        # Jobs waiting for a pipeline slot are behind everyone waiting for sandboxes
+        return sandbox_admission.queue_depth() + position
+    return sandbox_admission.queue_position(experiment_id)
+
+
+async def _acquire_pooled() -> AsyncE2BManager:
+    """Take a warm sandbox from the pool and drive it through the async SDK"""
+    manager = await asyncio.to_thread(sandbox_pool.acquire)
+    try:
+        return await AsyncE2BManager.adopt(manager)
+    except Exception:
+        await asyncio.to_thread(manager.cleanup)
+        raise
+
+
+async def _run_experiment(experiment_id: str, request: StartExperimentRequest):
     """
-    Start a new chaos experiment
+    Run the full experiment pipeline (executed as a job runner task)
     
-    This endpoint:
+    Steps:
     1. Creates an E2B sandbox
     2. Deploys the test Flask app
     3. Runs the chaos script
@@ -109,91 +246,98 @@ async def start_experiment(request: StartExperimentRequest):
     5. Analyzes with Groq
     6. Creates Grafana dashboard
     """
-    experiment_id = f"exp_{uuid.uuid4().hex[:8]}"
-    
-    logger.info(f"Starting experiment {experiment_id}: {request.scenario}")
-    
-    # Initialize experiment
-    experiments[experiment_id] = {
-        "id": experiment_id,
-        "scenario": request.scenario,
-        "config": request.config.model_dump(),
-        "status": ExperimentStatus.PENDING,
-        "created_at": datetime.now(),
-        "progress": 0
-    }
-    
     try:
-        # Update status
-        experiments[experiment_id]["status"] = ExperimentStatus.RUNNING
-        experiments[experiment_id]["progress"] = 10
-        
         # Get number of instances
         num_instances = request.config.num_instances
         logger.info(f"Running chaos script for {experiment_id} on {num_instances} instance(s)")
         
-        # Initialize E2B manager (but don't create sandbox yet)
-        e2b_manager = E2BManager(settings.e2b_api_key)
+        async def on_samples(points: List[Dict]):
+            # Live timeline, filled in one batch per metrics poll
+            await asyncio.to_thread(store.append_timeline_points, experiment_id, points)
+            for point in points:
+                event_bus.publish(experiment_id, "sample", point)
         
-        if num_instances > 1:
-            # Run in parallel - this will create its own sandboxes
-            experiments[experiment_id]["progress"] = 30
-            metrics = e2b_manager.run_parallel_experiments(
-                request.scenario.value,
-                request.config.model_dump(),
-                num_instances
-            )
-            experiments[experiment_id]["sandbox_id"] = f"parallel_{num_instances}_instances"
-        else:
-            # Single instance - create sandbox, deploy, and run
-            logger.info(f"Creating sandbox for {experiment_id}")
-            sandbox_id = e2b_manager.create_sandbox()
-            experiments[experiment_id]["sandbox_id"] = sandbox_id
-            experiments[experiment_id]["progress"] = 30
-            
-            logger.info(f"Deploying test app for {experiment_id}")
-            e2b_manager.deploy_test_app()
-            experiments[experiment_id]["progress"] = 50
+        # Wait for sandbox capacity shared by all running experiments
+        async with sandbox_admission.slots(experiment_id, num_instances):
+            _update_experiment(experiment_id, status=ExperimentStatus.RUNNING, progress=10)
             
-            metrics = e2b_manager.run_chaos_script(
-                request.scenario.value,
-                request.config.model_dump()
-            )
+            # Initialize E2B manager (but don't create sandbox yet)
+            e2b_manager = AsyncE2BManager(settings.e2b_api_key, backend=sandbox_backend)
             
-            # Cleanup single instance
-            logger.info(f"Cleaning up sandbox for {experiment_id}")
-            e2b_manager.cleanup()
+            if num_instances > 1:
+                # Run in parallel - this will create its own sandboxes
+                _update_experiment(experiment_id, progress=30)
+                metrics = await e2b_manager.run_parallel_experiments(
+                    request.scenario.value,
+                    request.config.model_dump(),
+                    num_instances,
+                    provision=_acquire_pooled if sandbox_pool.size > 0 else None,
+                    on_samples=on_samples
+                )
+                _update_experiment(experiment_id, sandbox_id=f"parallel_{num_instances}_instances")
+            else:
+                # Single instance - take a warm sandbox from the pool, or create and deploy one
+                if sandbox_pool.size > 0:
+                    logger.info(f"Acquiring pooled sandbox for {experiment_id}")
+                    e2b_manager = await _acquire_pooled()
+                    _update_experiment(experiment_id, sandbox_id=e2b_manager.sandbox.sandbox_id)
+                else:
+                    logger.info(f"Creating sandbox for {experiment_id}")
+                    sandbox_id = await e2b_manager.create_sandbox()
+                    _update_experiment(experiment_id, sandbox_id=sandbox_id)
+                _update_experiment(experiment_id, progress=30)
+                
+                try:
+                    if sandbox_pool.size <= 0:
+                        logger.info(f"Deploying test app for {experiment_id}")
+                        await e2b_manager.deploy_test_app()
+                    _update_experiment(experiment_id, progress=50)
+                    
+                    metrics = await e2b_manager.run_chaos_script(
+                        request.scenario.value,
+                        request.config.model_dump(),
+                        on_samples=on_samples
+                    )
+                finally:
+                    # Cleanup single instance
+                    logger.info(f"Cleaning up sandbox for {experiment_id}")
+                    await e2b_manager.cleanup()
         
-        experiments[experiment_id]["progress"] = 70
-        experiments[experiment_id]["raw_metrics"] = metrics
-        experiments[experiment_id]["num_instances"] = num_instances
+        await asyncio.to_thread(store.save_metrics, experiment_id, metrics)
+        _update_experiment(experiment_id, progress=70, num_instances=num_instances)
         
         # Analyze with Groq
         logger.info(f"Analyzing results with Groq for {experiment_id}")
-        experiments[experiment_id]["status"] = ExperimentStatus.ANALYZING
+        _update_experiment(experiment_id, status=ExperimentStatus.ANALYZING)
         
-        groq_analyzer = GroqAnalyzer(settings.groq_api_key, settings.groq_model)
-        analysis = groq_analyzer.analyze_experiment(
+        analysis = await groq_analyzer.aanalyze_experiment(
             request.scenario.value,
             metrics,
             metrics.get("logs", "")
         )
-        experiments[experiment_id]["analysis"] = analysis
-        experiments[experiment_id]["progress"] = 85
+        # Measured latency and recovery take precedence over whatever the model reported
+        if metrics.get("latency_p95") is not None:
+            analysis.setdefault("metrics", {})["latency_p95"] = metrics["latency_p95"]
+        if metrics.get("recovery"):
+            # None unless something degraded and recovered; the status tells which
+            analysis.setdefault("metrics", {})["recovery_time_seconds"] = metrics.get("recovery_time_seconds")
+            analysis["metrics"]["recovery_status"] = metrics["recovery"].get("status")
+        # Shown on the Grafana dashboard
+        analysis.setdefault("metrics", {})["num_instances"] = num_instances
+        await asyncio.to_thread(store.save_analysis, experiment_id, analysis)
+        _update_experiment(experiment_id, progress=85)
         
         # Create Grafana dashboard via MCP protocol
         logger.info(f"Creating Grafana dashboard for {experiment_id}")
         dashboard_url = None
         
         try:
-            # Add num_instances to metrics for Grafana
-            analysis["metrics"]["num_instances"] = num_instances
-            
             # Use MCP protocol to create dashboard
             grafana_mcp_client = GrafanaMCPClient(
                 mcp_url=settings.grafana_mcp_url
             )
-            dashboard_url = grafana_mcp_client.create_dashboard_via_mcp(
+            dashboard_url = await asyncio.to_thread(
+                grafana_mcp_client.create_dashboard_via_mcp,
                 experiment_id=experiment_id,
                 metrics=analysis["metrics"],
                 scenario=request.scenario.value,
@@ -207,90 +351,160 @@ async def start_experiment(request: StartExperimentRequest):
             logger.warning(f"Failed to create Grafana dashboard: {e}. Using mock URL.")
             dashboard_url = f"{settings.grafana_mcp_url}/d/chaoslab-{experiment_id}/chaos-experiment-{experiment_id}"
         
-        experiments[experiment_id]["grafana_url"] = dashboard_url
-        experiments[experiment_id]["progress"] = 95
+        _update_experiment(experiment_id, grafana_url=dashboard_url, progress=95)
         
         # Mark as completed (cleanup already done above)
-        experiments[experiment_id]["status"] = ExperimentStatus.COMPLETED
-        experiments[experiment_id]["progress"] = 100
-        
-        # Save results to file for verification
-        try:
-            import json
-            from pathlib import Path
-            
-            # Create results directory if it doesn't exist
-            results_dir = Path("experiment_results")
-            results_dir.mkdir(exist_ok=True)
-            
-            # Save experiment results to JSON file
-            result_file = results_dir / f"{experiment_id}.json"
-            with open(result_file, "w") as f:
-                json.dump({
-                    "experiment_id": experiment_id,
-                    "scenario": request.scenario.value,
-                    "config": request.config.model_dump(),
-                    "status": experiments[experiment_id]["status"],
-                    "created_at": experiments[experiment_id]["created_at"].isoformat(),
-                    "raw_metrics": experiments[experiment_id].get("raw_metrics", {}),
-                    "analysis": analysis,
-                    "grafana_url": dashboard_url
-                }, f, indent=2, default=str)
-            
-            logger.info(f"Results saved to {result_file}")
-        except Exception as e:
-            logger.warning(f"Failed to save results to file: {e}")
+        _update_experiment(experiment_id, status=ExperimentStatus.COMPLETED, progress=100)
         
         logger.info(f"Experiment {experiment_id} completed successfully")
         
-        return ExperimentResponse(
-            experiment_id=experiment_id,
-            status=ExperimentStatus.COMPLETED,
-            created_at=experiments[experiment_id]["created_at"]
-        )
-        
     except Exception as e:
         logger.error(f"Experiment {experiment_id} failed: {e}")
-        experiments[experiment_id]["status"] = ExperimentStatus.FAILED
-        experiments[experiment_id]["error"] = str(e)
-        
+        _update_experiment(experiment_id, status=ExperimentStatus.FAILED, error=str(e))
+    finally:
+        event_bus.close(experiment_id)
+
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """Runtime metrics for the job runner, sandbox admission, sandbox pool, analysis cache, code context, LLM calls and event streams"""
+    return {
+        "jobs": job_runner.stats(),
+        "sandbox_admission": sandbox_admission.metrics(),
+        "sandbox_pool": sandbox_pool.metrics(),
+        "analysis_cache": analysis_cache.metrics(),
+        "code_context": code_context.metrics(),
+        "llm": groq_analyzer.metrics(),
+        "event_subscribers": event_bus.subscriber_count()
+    }
+
+
+@app.post("/api/experiment/start", response_model=ExperimentResponse)
+async def start_experiment(request: StartExperimentRequest):
+    """
+    Start a new chaos experiment
+    
+    The experiment is queued on the job runner and this endpoint returns
+    immediately with the experiment in PENDING state. Follow progress via
+    /api/experiment/{id}/events (SSE) or poll /api/experiment/{id}/status.
+    """
+    try:
+        sandbox_backend.check_configured()
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    try:
+        sandbox_admission.check(request.config.num_instances)
+    except ValueError as e:
+        # Would never be admitted, and running it with fewer slots would exceed the limit
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    experiment_id = f"exp_{uuid.uuid4().hex[:8]}"
+    
+    logger.info(f"Starting experiment {experiment_id}: {request.scenario}")
+    
+    # Initialize experiment
+    exp = store.create(
+        experiment_id,
+        scenario=request.scenario.value,
+        config=request.config.model_dump(),
+        status=ExperimentStatus.PENDING.value
+    )
+    
+    try:
+        job_runner.submit(experiment_id, _run_experiment, experiment_id, request)
+    except RuntimeError as e:
+        # Executor is shutting down
+        _update_experiment(experiment_id, status=ExperimentStatus.FAILED, error=str(e))
         raise HTTPException(
-            status_code=500,
-            detail=f"Experiment failed: {str(e)}"
+            status_code=503,
+            detail=f"Experiment could not be scheduled: {str(e)}"
         )
+    
+    return ExperimentResponse(
+        experiment_id=experiment_id,
+        status=ExperimentStatus.PENDING,
+        created_at=exp["created_at"]
+    )
 
 
 @app.get("/api/experiment/{experiment_id}/status", response_model=StatusResponse)
 async def get_experiment_status(experiment_id: str):
     """Get current status of an experiment"""
-    if experiment_id not in experiments:
+    exp = store.get(experiment_id)
+    if not exp:
         raise HTTPException(status_code=404, detail="Experiment not found")
     
-    exp = experiments[experiment_id]
+    return StatusResponse(**_status_payload(exp))
+
+
+@app.get("/api/experiment/{experiment_id}/events")
+async def stream_experiment_events(experiment_id: str, request: Request):
+    """
+    Stream live experiment progress as Server-Sent Events
     
-    return StatusResponse(
-        experiment_id=experiment_id,
-        status=exp["status"],
-        progress=exp.get("progress", 0),
-        message=exp.get("error")
+    Events:
+    - status: stage/progress changes ({status, progress, message})
+    - sample: each new timeline point as the monitor produces it
+    - reset: sent instead of missed events that are no longer available;
+      holds the current status and the whole timeline so far
+    
+    Every event has an increasing id. Viewers connecting mid-run, or
+    reconnecting with Last-Event-ID, first receive the events they missed.
+    The stream ends once the experiment completes or fails.
+    """
+    if not store.get(experiment_id):
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    
+    try:
+        last_event_id = int(request.headers.get("last-event-id", 0))
+    except ValueError:
+        last_event_id = 0
+    
+    async def snapshot() -> Dict:
+        timeline = await asyncio.to_thread(store.get_timeline, experiment_id)
+        return {**_status_payload(store.get(experiment_id)), "timeline": timeline}
+    
+    async def event_stream():
+        finished = store.get(experiment_id)["status"] in (ExperimentStatus.COMPLETED, ExperimentStatus.FAILED)
+        events = event_bus.subscribe(experiment_id, last_event_id, snapshot=snapshot, finished=finished)
+        try:
+            async for event in events:
+                if event is None:
+                    if await request.is_disconnected():
+                        return
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(*event)
+        finally:
+            await events.aclose()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
 @app.get("/api/experiment/{experiment_id}/results", response_model=ResultsResponse)
-async def get_experiment_results(experiment_id: str):
-    """Get complete results of an experiment"""
-    if experiment_id not in experiments:
+async def get_experiment_results(experiment_id: str, include_logs: bool = False):
+    """
+    Get complete results of an experiment
+
+    Logs are read through /logs; `include_logs` embeds them in full as `raw_logs`.
+    """
+    exp = store.get(experiment_id)
+    if not exp:
         raise HTTPException(status_code=404, detail="Experiment not found")
     
-    exp = experiments[experiment_id]
-    
     if exp["status"] != ExperimentStatus.COMPLETED:
         raise HTTPException(
             status_code=400,
             detail=f"Experiment not completed. Current status: {exp['status']}"
         )
     
-    analysis = exp.get("analysis", {})
+    analysis = store.get_analysis(experiment_id) or {}
+    raw_metrics = exp.get("raw_metrics") or {}
     
     return ResultsResponse(
         experiment_id=experiment_id,
@@ -299,9 +513,74 @@ async def get_experiment_results(experiment_id: str):
         grafana_url=exp.get("grafana_url"),
         recommendations=analysis.get("recommendations", []),
         severity=analysis.get("severity", "unknown"),
-        raw_logs=exp.get("raw_metrics", {}).get("logs"),
-        timeline=analysis.get("timeline", [])
+        raw_logs=store.get_logs(experiment_id) if include_logs else None,
+        timeline=analysis.get("timeline", []),
+        latency_timeline=raw_metrics.get("latency_timeline"),
+        instances=store.get_instances(experiment_id) or None,
+        distribution=raw_metrics.get("distribution"),
+        recovery=raw_metrics.get("recovery"),
+        phases=raw_metrics.get("phases"),
+        prompt=analysis.get("prompt")
+    )
+
+
+@app.get("/api/experiment/{experiment_id}/instances", response_model=List[InstanceSeries])
+async def get_experiment_instances(experiment_id: str, fields: Optional[str] = None):
+    """
+    Per-instance results and timelines of a parallel run
+
+    Timelines are columnar; `fields` (comma separated, e.g. `cpu,memory`)
+    limits them to those columns.
+    """
+    if not store.get(experiment_id):
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    
+    selected = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    return store.get_instances(experiment_id, include_series=True, fields=selected)
+
+
+@app.get("/api/experiment/{experiment_id}/logs", response_model=LogsResponse)
+async def get_experiment_logs(
+    experiment_id: str,
+    offset: int = Query(default=0, ge=0, description="Line number to start scanning at"),
+    limit: int = Query(default=500, ge=1, le=5000, description="Maximum lines to return"),
+    level: Optional[str] = Query(default=None, description="Comma separated levels, e.g. ERROR,WARNING"),
+    since: Optional[datetime] = Query(default=None, description="Only lines logged at or after this time"),
+    until: Optional[datetime] = Query(default=None, description="Only lines logged at or before this time"),
+    search: Optional[str] = Query(default=None, min_length=1, description="Case-insensitive substring")
+):
+    """
+    Page through an experiment's application logs
+
+    Filters combine; follow `next_offset` to continue the scan. Times are
+    compared on the sandbox clock (timezone-aware values are taken as UTC).
+    """
+    if not store.get(experiment_id):
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    
+    levels = [name.strip().upper() for name in level.split(",") if name.strip()] if level else None
+    page = await asyncio.to_thread(
+        store.query_logs,
+        experiment_id,
+        offset,
+        limit,
+        levels,
+        _log_time(since),
+        _log_time(until),
+        search
     )
+    if page is None:
+        raise HTTPException(status_code=404, detail="No metrics collected for this experiment yet")
+    return LogsResponse(experiment_id=experiment_id, **page)
+
+
+def _log_time(value: Optional[datetime]) -> Optional[str]:
+    """A query time in the (sortable) format of log record times"""
+    if value is None:
+        return None
+    if value.tzinfo:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime(LOG_TIME_FORMAT)[:23]
 
 
 if __name__ == "__main__":
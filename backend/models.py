@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime
 from enum import Enum
 
@@ -13,11 +13,70 @@ class ChaosScenario(str, Enum):
     DEPENDENCY_FAILURE = "dependency_failure"
 
 
+class AbortThresholds(BaseModel):
+    """Stop the chaos script early when a live sample reaches any of these values"""
+    cpu: Optional[float] = Field(default=None, description="CPU usage percentage", ge=0, le=100)
+    memory: Optional[float] = Field(default=None, description="Memory usage percentage", ge=0, le=100)
+    error_count: Optional[int] = Field(default=None, description="Cumulative error count", ge=1)
+
+
+# Test app endpoints the load generator can be weighted across
+LoadEndpoint = Literal["/api/data", "/api/heavy", "/api/memory", "/api/database", "/api/network", "/api/stress"]
+
+
+class LoadProfile(BaseModel):
+    """Target request rate (requests per second) over the chaos run"""
+    shape: str = Field(default="constant", description="constant, ramp, step, spike or sinusoid", pattern="^(constant|ramp|step|spike|sinusoid)$")
+    rate: float = Field(default=1.0, description="Constant rate, or the start/base rate of the other shapes", ge=0, le=200)
+    peak_rate: Optional[float] = Field(default=None, description="Final rate of ramp/step, rate during a spike, sinusoid maximum", ge=0, le=200)
+    steps: int = Field(default=4, description="Number of equal steps (step)", ge=1, le=50)
+    spike_start: Optional[float] = Field(default=None, description="Seconds into the run the spike starts (defaults to mid-run)", ge=0)
+    spike_duration: float = Field(default=5.0, description="Spike length in seconds", gt=0)
+    period: float = Field(default=30.0, description="Sinusoid period in seconds", gt=0)
+
+
+class LoadConfig(BaseModel):
+    """HTTP load generated against the test app during the chaos script"""
+    mode: str = Field(default="open", description="open: scheduled request rate; closed: fixed number of concurrent workers", pattern="^(open|closed)$")
+    rate: Optional[float] = Field(default=None, description="Constant requests per second in open mode (defaults to the scenario's rate)", gt=0, le=200)
+    profile: Optional[LoadProfile] = Field(default=None, description="Rate profile for open mode; takes precedence over rate")
+    weights: Optional[Dict[LoadEndpoint, float]] = Field(default=None, description="Relative share of requests per endpoint (defaults to the scenario's mix)")
+    concurrency: int = Field(default=4, description="Concurrent workers in closed mode", ge=1, le=64)
+    timeout: float = Field(default=10.0, description="Seconds before a request counts as timed out", gt=0, le=60)
+    bucket_seconds: float = Field(default=1.0, description="Width of the reported latency time buckets", ge=0.5, le=30)
+
+
+class MetricTolerance(BaseModel):
+    """Band above the baseline within which a metric counts as healthy (the larger bound applies)"""
+    relative: Optional[float] = Field(default=None, description="Fraction of the baseline value", ge=0)
+    absolute: Optional[float] = Field(default=None, description="In the metric's unit (%, errors/s, ms)", ge=0)
+
+
+class RecoveryConfig(BaseModel):
+    """Recovery detection settings"""
+    baseline_seconds: float = Field(default=5.0, description="Baseline window at the start of the run when there are no pre-fault samples", ge=1, le=60)
+    hold_seconds: float = Field(default=5.0, description="Seconds a metric must stay in band to count as recovered", ge=0, le=120)
+    tolerances: Optional[Dict[Literal["cpu", "memory", "error_rate", "latency_p95"], MetricTolerance]] = Field(
+        default=None, description="Per-metric tolerance bands"
+    )
+
+
+class PhaseConfig(BaseModel):
+    """Steady-load phases around the fault"""
+    baseline_seconds: int = Field(default=10, description="Seconds of load before the fault is injected", ge=0, le=120)
+    recovery_seconds: int = Field(default=10, description="Seconds of load after the fault is removed", ge=0, le=120)
+
+
 class ExperimentConfig(BaseModel):
     """Configuration for chaos experiment"""
     duration: int = Field(default=60, description="Duration in seconds", ge=10, le=300)
     intensity: str = Field(default="medium", description="Intensity level: low, medium, high")
     num_instances: int = Field(default=1, description="Number of parallel E2B instances", ge=1, le=5)
+    metrics_interval: float = Field(default=1.0, description="Seconds between metrics samples", ge=0.1, le=10)
+    abort_thresholds: Optional[AbortThresholds] = Field(default=None, description="Early abort thresholds")
+    load: Optional[LoadConfig] = Field(default=None, description="Load generator settings")
+    recovery: Optional[RecoveryConfig] = Field(default=None, description="Recovery detection settings")
+    phases: Optional[PhaseConfig] = Field(default=None, description="Baseline and recovery phase lengths")
 
 
 class StartExperimentRequest(BaseModel):
@@ -48,6 +107,7 @@ class StatusResponse(BaseModel):
     status: ExperimentStatus
     progress: int = Field(ge=0, le=100)
     message: Optional[str] = None
+    queue_position: Optional[int] = Field(default=None, description="Position in the experiment queue while pending")
 
 
 class ExperimentMetrics(BaseModel):
@@ -61,10 +121,87 @@ class ExperimentMetrics(BaseModel):
 
 class TimelineDataPoint(BaseModel):
     """Time-series data point"""
-    time_offset: int = Field(description="Time offset from experiment start in seconds")
+    time_offset: float = Field(description="Time offset from experiment start in seconds")
     cpu: float = Field(description="CPU usage percentage at this time")
     memory: float = Field(description="Memory usage percentage at this time")
     error_count: int = Field(description="Cumulative error count at this time")
+    load_1m: Optional[float] = Field(default=None, description="1-minute load average")
+    app_cpu_percent: Optional[float] = Field(default=None, description="CPU usage of the test app process")
+    app_rss_mb: Optional[float] = Field(default=None, description="Resident memory of the test app process in MB")
+    warning_count: Optional[int] = Field(default=None, description="Cumulative WARNING log records at this time")
+    exception_count: Optional[int] = Field(default=None, description="Cumulative log records carrying a traceback at this time")
+    error_delta: Optional[int] = Field(default=None, description="ERROR/CRITICAL log records since the previous sample")
+    warning_delta: Optional[int] = Field(default=None, description="WARNING log records since the previous sample")
+    exception_delta: Optional[int] = Field(default=None, description="Log records carrying a traceback since the previous sample")
+    phase: Optional[str] = Field(default=None, description="Experiment phase: baseline, fault or recovery")
+    # Parallel runs: fields above are means across instances, with these bands
+    instances: Optional[int] = Field(default=None, description="Instances with data at this time (parallel runs)")
+    cpu_min: Optional[float] = Field(default=None, description="Lowest CPU usage percentage across instances")
+    cpu_max: Optional[float] = Field(default=None, description="Highest CPU usage percentage across instances")
+    cpu_std: Optional[float] = Field(default=None, description="Standard deviation of the CPU usage percentage across instances")
+    memory_min: Optional[float] = Field(default=None, description="Lowest memory usage percentage across instances")
+    memory_max: Optional[float] = Field(default=None, description="Highest memory usage percentage across instances")
+    memory_std: Optional[float] = Field(default=None, description="Standard deviation of the memory usage percentage across instances")
+    error_count_min: Optional[int] = Field(default=None, description="Lowest cumulative error count across instances")
+    error_count_max: Optional[int] = Field(default=None, description="Highest cumulative error count across instances")
+    error_count_std: Optional[float] = Field(default=None, description="Standard deviation of the cumulative error count across instances")
+    load_1m_min: Optional[float] = Field(default=None, description="Lowest 1-minute load average across instances")
+    load_1m_max: Optional[float] = Field(default=None, description="Highest 1-minute load average across instances")
+    load_1m_std: Optional[float] = Field(default=None, description="Standard deviation of the 1-minute load average across instances")
+    app_cpu_percent_min: Optional[float] = Field(default=None, description="Lowest test app CPU percentage across instances")
+    app_cpu_percent_max: Optional[float] = Field(default=None, description="Highest test app CPU percentage across instances")
+    app_cpu_percent_std: Optional[float] = Field(default=None, description="Standard deviation of the test app CPU percentage across instances")
+    app_rss_mb_min: Optional[float] = Field(default=None, description="Lowest test app resident memory in MB across instances")
+    app_rss_mb_max: Optional[float] = Field(default=None, description="Highest test app resident memory in MB across instances")
+    app_rss_mb_std: Optional[float] = Field(default=None, description="Standard deviation of the test app resident memory in MB across instances")
+
+
+class LatencyBucket(BaseModel):
+    """Requests completed during one load generator time bucket"""
+    time_offset: float = Field(description="End of the bucket in seconds on the timeline's clock (from the start of metrics sampling)")
+    requests: int
+    errors: int = Field(description="HTTP 4xx/5xx responses and connection failures")
+    timeouts: int = Field(description="Requests given up on after the timeout; included in latency_ms")
+    status: Dict[str, int] = Field(description="Responses per status code")
+    latency_ms: Dict[str, float] = Field(description="p50/p90/p95/p99/max latency in ms, from the scheduled send time in open mode, including timed out and dropped requests")
+    service_ms: Optional[Dict[str, float]] = Field(default=None, description="The same percentiles from the actual send time")
+    sent: Optional[int] = Field(default=None, description="Requests sent during the bucket")
+    dropped: Optional[int] = Field(default=None, description="Scheduled requests skipped because too many were outstanding; recorded in latency_ms at the timeout")
+    target_rps: Optional[float] = Field(default=None, description="Mean rate of the load profile over the bucket")
+    throughput_rps: Optional[float] = Field(default=None, description="Responses completed per second")
+    phase: Optional[str] = Field(default=None, description="Experiment phase when the bucket closed")
+    instances: Optional[int] = Field(default=None, description="Instance buckets combined at this time (parallel runs)")
+    endpoints: Dict[str, Dict[str, Any]] = Field(default_factory=dict, description="The same stats per endpoint")
+
+
+class DistributionStats(BaseModel):
+    """Spread of a metric across the instances of a parallel run"""
+    n: int = Field(description="Instances with a value")
+    mean: float
+    std: float
+    min: float
+    p25: float
+    p50: float
+    p75: float
+    p90: float
+    max: float
+
+
+class InstanceResult(BaseModel):
+    """Results of one instance of a parallel run"""
+    instance: int
+    cpu_peak: float
+    memory_peak: float
+    error_count: int
+    recovery_time_seconds: Optional[float] = None
+    latency_p95: Optional[float] = None
+    aborted: Optional[bool] = None
+    abort_reason: Optional[str] = None
+
+
+class InstanceSeries(InstanceResult):
+    """Instance results with its own timeline in columnar form"""
+    series: Dict[str, List[Any]] = Field(description="Timeline columns: field -> one value per sample (null if missing)")
 
 
 class ResultsResponse(BaseModel):
@@ -75,5 +212,28 @@ class ResultsResponse(BaseModel):
     grafana_url: Optional[str] = Field(default=None, description="Grafana dashboard URL")
     recommendations: List[str] = Field(description="AI-generated recommendations")
     severity: str = Field(description="Severity level: low, medium, high")
-    raw_logs: Optional[str] = Field(default=None, description="Raw logs from experiment")
+    raw_logs: Optional[str] = Field(default=None, description="Raw logs from experiment (only with include_logs; see /logs)")
     timeline: Optional[List[TimelineDataPoint]] = Field(default=None, description="Time-series metrics data")
+    latency_timeline: Optional[List[LatencyBucket]] = Field(default=None, description="Request latency per time bucket")
+    instances: Optional[List[InstanceResult]] = Field(default=None, description="Per-instance results of a parallel run")
+    distribution: Optional[Dict[str, Optional[DistributionStats]]] = Field(default=None, description="Spread of the headline metrics across instances")
+    recovery: Optional[Dict[str, Any]] = Field(default=None, description="Baseline, degradation onset and time-to-recover per metric")
+    phases: Optional[Dict[str, Any]] = Field(default=None, description="Phase boundaries, per-phase stats and deltas against the baseline phase")
+    prompt: Optional[Dict[str, Any]] = Field(default=None, description="Estimated size of the analysis prompt in tokens: budget, total, fixed text, and budget and use per section")
+
+
+class LogLine(BaseModel):
+    """One application log line"""
+    line: int = Field(description="Line number (from 0)")
+    time: Optional[str] = Field(default=None, description="Time of the log record the line belongs to (sandbox clock)")
+    level: Optional[str] = Field(default=None, description="Level of the log record the line belongs to")
+    text: str
+
+
+class LogsResponse(BaseModel):
+    """A page of an experiment's application log lines"""
+    experiment_id: str
+    total_lines: int = Field(description="Lines in the whole log")
+    offset: int = Field(description="Line number the scan started at")
+    lines: List[LogLine] = Field(description="Matching lines")
+    next_offset: Optional[int] = Field(default=None, description="Line number to continue from (null at the end)")
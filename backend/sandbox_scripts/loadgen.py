@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+"""
+ChaosLab load generator (runs inside the sandbox)
+
+Sends HTTP GET requests to the test app with asyncio and records latency per
+endpoint in log-linear (HdrHistogram-style) histograms. Every --bucket
+seconds one JSON line with request, status and timeout counts and latency
+percentiles is appended to the output file; a final "summary" line covers the
+whole run. The first line is a "start" record with the wall-clock time at
+which time_offset 0 falls, so buckets can be aligned with other streams.
+Only the standard library is used.
+
+Modes:
+  open    requests are scheduled by a rate profile (--profile, or a constant
+          --rate) no matter how long earlier ones take, so a slow app faces
+          the same arrival rate. Latency is measured from each request's
+          scheduled time, which corrects for coordinated omission: a stalled
+          sender cannot hide the delay from the percentiles. The time from
+          the actual send is reported separately as service time. Requests
+          that time out are recorded at the time they were given up on;
+          requests not sent because --max-in-flight are outstanding are
+          counted as dropped and recorded at the timeout.
+  closed  --concurrency workers each send their next request as soon as the
+          previous one has completed
+
+Endpoints are given as `path=weight` pairs and are interleaved by smooth
+weighted round-robin, so any window of requests follows the mix closely.
+
+With --phase-file, each bucket is tagged with the experiment phase named in
+that file when the bucket closes, and the summary adds totals per phase.
+
+SIGTERM stops sending; in-flight requests are given a moment to finish and
+the last bucket and the summary are still written.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import signal
+import time
+from urllib.parse import urlsplit
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of non-negative integers (microseconds here)
+
+    Values below 2**sub_bucket_bits are counted exactly; each power-of-two
+    range above that is split into 2**(sub_bucket_bits - 1) equal sub-buckets,
+    so a reported value is within 2**-(sub_bucket_bits - 1) (~0.8% for the
+    default) of the recorded one. Counts are sparse, so empty histograms are
+    cheap and merging is a dict sum.
+    """
+
+    def __init__(self, sub_bucket_bits=8):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.half = 1 << (sub_bucket_bits - 1)
+        self.counts = {}
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, value):
+        value = max(int(value), 0)
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        if other.total:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        self.total += other.total
+
+    def value_at_percentile(self, percentile):
+        """Highest value equivalent to the requested percentile (0 if empty)"""
+        if not self.total:
+            return 0
+        rank = max(1, int(round(percentile / 100.0 * self.total)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._highest_equivalent(index), self.max)
+        return self.max
+
+    def _index(self, value):
+        shift = value.bit_length() - self.sub_bucket_bits
+        if shift <= 0:
+            return value
+        return shift * self.half + (value >> shift)
+
+    def _highest_equivalent(self, index):
+        if index < 2 * self.half:
+            return index
+        shift = (index >> (self.sub_bucket_bits - 1)) - 1
+        mantissa = index - shift * self.half
+        return ((mantissa + 1) << shift) - 1
+
+
+class RateProfile:
+    """
+    Target request rate over time
+
+    Shapes (rates in requests/s, times in seconds from the start):
+      constant  `rate` throughout
+      ramp      linear from `rate` to `peak_rate` over the run
+      step      `steps` equal steps from `rate` up to `peak_rate`
+      spike     `rate`, with `peak_rate` from `spike_start` for `spike_duration`
+      sinusoid  between `rate` and `peak_rate`, starting at `rate`, with period `period`
+    """
+
+    SHAPES = ("constant", "ramp", "step", "spike", "sinusoid")
+
+    def __init__(self, duration, shape="constant", rate=1.0, peak_rate=None, steps=4,
+                 spike_start=None, spike_duration=5.0, period=30.0):
+        if shape not in self.SHAPES:
+            raise ValueError(f"Unknown profile shape: {shape}")
+        self.duration = duration
+        self.shape = shape
+        self.rate = rate
+        self.peak_rate = rate if peak_rate is None else peak_rate
+        self.steps = max(int(steps), 1)
+        self.spike_start = duration / 2 if spike_start is None else spike_start
+        self.spike_duration = spike_duration
+        self.period = period
+
+    def rate_at(self, t):
+        low, high = self.rate, self.peak_rate
+        if self.shape == "ramp":
+            return low + (high - low) * min(max(t / self.duration, 0.0), 1.0)
+        if self.shape == "step":
+            if self.steps == 1:
+                return low
+            index = min(int(t / self.duration * self.steps), self.steps - 1)
+            return low + (high - low) * index / (self.steps - 1)
+        if self.shape == "spike":
+            return high if self.spike_start <= t < self.spike_start + self.spike_duration else low
+        if self.shape == "sinusoid":
+            return (low + high) / 2 - (high - low) / 2 * math.cos(2 * math.pi * t / self.period)
+        return low
+
+    def mean_rate(self, t0, t1, samples=20):
+        """Average target rate over [t0, t1); zero past the end of the run"""
+        active_end = min(t1, self.duration)
+        if t1 <= t0 or active_end <= t0:
+            return 0.0
+        width = (active_end - t0) / samples
+        total = sum(self.rate_at(t0 + (i + 0.5) * width) for i in range(samples)) * width
+        return total / (t1 - t0)
+
+    def next_send(self, t, end, area=0.0, resolution=0.01):
+        """
+        Time after `t` at which the profile has scheduled one more request
+
+        Integrates the rate (midpoint rule) from `area` until it adds up to
+        one request, so changing rates are followed exactly rather than per
+        interval. Returns None when that falls at or past `end`.
+        """
+        while t < end:
+            step = min(resolution, end - t)
+            rate = self.rate_at(t + step / 2)
+            if rate > 0 and area + rate * step >= 1.0:
+                sent_at = t + (1.0 - area) / rate
+                return sent_at if sent_at < end else None
+            area += rate * step
+            t += step
+        return None
+
+    def to_dict(self):
+        spec = {"shape": self.shape, "rate": self.rate, "peak_rate": self.peak_rate}
+        if self.shape == "step":
+            spec["steps"] = self.steps
+        elif self.shape == "spike":
+            spec.update(spike_start=self.spike_start, spike_duration=self.spike_duration)
+        elif self.shape == "sinusoid":
+            spec["period"] = self.period
+        return spec
+
+
+class EndpointMix:
+    """Smooth weighted round-robin: each pick goes to the path furthest behind its share"""
+
+    def __init__(self, weights):
+        self.weights = [(path, weight) for path, weight in weights if weight > 0]
+        if not self.weights:
+            raise ValueError("At least one endpoint needs a positive weight")
+        self.total = sum(weight for _, weight in self.weights)
+        self.current = {path: 0.0 for path, _ in self.weights}
+
+    def next(self):
+        for path, weight in self.weights:
+            self.current[path] += weight
+        path = max(self.current, key=self.current.get)
+        self.current[path] -= self.total
+        return path
+
+    def to_dict(self):
+        return {path: weight for path, weight in self.weights}
+
+
+def parse_endpoints(spec):
+    """`/a=3,/b=1` (weights default to 1) -> [(path, weight)]; repeated paths add up"""
+    weights = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        path, _, weight = item.partition("=")
+        weights[path.strip()] = weights.get(path.strip(), 0.0) + (float(weight) if weight else 1.0)
+    return list(weights.items())
+
+
+class Stats:
+    """Request outcomes and latencies for one endpoint over some period"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.dropped = 0
+        self.status = {}
+        # From the scheduled send time (coordinated omission corrected) and from the actual send
+        self.latency = LatencyHistogram()
+        self.service = LatencyHistogram()
+
+    def merge(self, other):
+        self.requests += other.requests
+        self.errors += other.errors
+        self.timeouts += other.timeouts
+        self.dropped += other.dropped
+        for code, count in other.status.items():
+            self.status[code] = self.status.get(code, 0) + count
+        self.latency.merge(other.latency)
+        self.service.merge(other.service)
+
+    def to_dict(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "dropped": self.dropped,
+            "status": dict(sorted(self.status.items())),
+            "latency_ms": percentiles_ms(self.latency),
+            "service_ms": percentiles_ms(self.service),
+        }
+
+
+def percentiles_ms(histogram):
+    result = {f"p{p}": round(histogram.value_at_percentile(p) / 1000.0, 2) for p in PERCENTILES}
+    result["max"] = round(histogram.max / 1000.0, 2)
+    return result
+
+
+def summarize(per_endpoint):
+    """Combined stats of all endpoints, with the per-endpoint breakdown"""
+    total = Stats()
+    for stats in per_endpoint.values():
+        total.merge(stats)
+    result = total.to_dict()
+    result["endpoints"] = {path: stats.to_dict() for path, stats in sorted(per_endpoint.items())}
+    return result
+
+
+async def fetch(host, port, path):
+    """GET `path` over a fresh connection; returns the status code once the body is read"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        # Drain headers and body so the latency covers the whole response
+        while await reader.read(65536):
+            pass
+    finally:
+        writer.close()
+    parts = status_line.split()
+    if len(parts) < 2 or not parts[1].isdigit():
+        raise ConnectionError(f"Malformed status line: {status_line!r}")
+    return int(parts[1])
+
+
+def read_phase(path):
+    """Phase named in `path`, or "unknown" if it cannot be read"""
+    try:
+        with open(path) as f:
+            return f.read().strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+class LoadGenerator:
+    def __init__(self, args):
+        url = urlsplit(args.url)
+        self.host = url.hostname or "localhost"
+        self.port = url.port or 80
+        self.args = args
+        self.mix = EndpointMix(args.endpoints)
+        self.profile = args.profile
+
+        self.bucket = {}
+        self.totals = {}
+        # phase -> {"duration", "sent", "stats": {path: Stats}}
+        self.phases = {}
+        self.sent = 0
+        self.bucket_sent = 0
+        self.in_flight = set()
+        self.stopping = asyncio.Event()
+
+    async def request(self, path, scheduled=None):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        status = None
+        timed_out = False
+        try:
+            status = await asyncio.wait_for(fetch(self.host, self.port, path), self.args.timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+        except (OSError, ConnectionError):
+            pass
+        finished = loop.time()
+
+        stats = self.bucket.setdefault(path, Stats())
+        stats.requests += 1
+        if timed_out:
+            # Waited at least the timeout; leaving it out would hide the worst requests
+            stats.timeouts += 1
+        elif status is None:
+            stats.errors += 1
+            stats.status["connect_error"] = stats.status.get("connect_error", 0) + 1
+            return
+        else:
+            stats.status[str(status)] = stats.status.get(str(status), 0) + 1
+            if status >= 400:
+                stats.errors += 1
+        stats.latency.record((finished - (scheduled or started)) * 1e6)
+        stats.service.record((finished - started) * 1e6)
+
+    async def open_loop(self, start, end):
+        loop = asyncio.get_running_loop()
+        # The profile's clock starts at 0; the schedule never looks at when requests complete.
+        # Starting half a request in keeps sends off the bucket boundaries.
+        next_send = self.profile.next_send(0.0, end - start, area=0.5)
+        while not self.stopping.is_set() and next_send is not None:
+            scheduled = start + next_send
+            delay = scheduled - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self.stopping.wait(), delay)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+            path = self.mix.next()
+            if len(self.in_flight) >= self.args.max_in_flight:
+                # The app is not keeping up; count the request instead of piling on,
+                # at the latency of one that was sent and timed out
+                stats = self.bucket.setdefault(path, Stats())
+                stats.dropped += 1
+                stats.latency.record(self.args.timeout * 1e6)
+            else:
+                self.sent += 1
+                self.bucket_sent += 1
+                task = asyncio.ensure_future(self.request(path, scheduled))
+                self.in_flight.add(task)
+                task.add_done_callback(self.in_flight.discard)
+            next_send = self.profile.next_send(next_send, end - start)
+
+    async def closed_loop(self, end):
+        loop = asyncio.get_running_loop()
+
+        async def worker():
+            while not self.stopping.is_set() and loop.time() < end:
+                self.sent += 1
+                self.bucket_sent += 1
+                await self.request(self.mix.next())
+
+        await asyncio.gather(*(worker() for _ in range(self.args.concurrency)))
+
+    def add_to_phase(self, phase, duration, bucket):
+        totals = self.phases.setdefault(phase, {"duration": 0.0, "sent": 0, "stats": {}})
+        totals["duration"] += duration
+        totals["sent"] += self.bucket_sent
+        for path, stats in bucket.items():
+            totals["stats"].setdefault(path, Stats()).merge(stats)
+
+    def phase_summaries(self):
+        summaries = {}
+        for phase, totals in self.phases.items():
+            summary = summarize(totals["stats"])
+            completed = summary["requests"] - summary["timeouts"]
+            summary.update(
+                duration=round(totals["duration"], 3),
+                sent=totals["sent"],
+                throughput_rps=round(completed / max(totals["duration"], 1e-6), 2),
+            )
+            summaries[phase] = summary
+        return summaries
+
+    async def run(self, out):
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGTERM, self.stopping.set)
+        start = loop.time()
+        out.write(json.dumps({"type": "start", "start_time": round(time.time(), 3)}) + "\n")
+        end = start + self.args.duration
+        bucket_start = start
+
+        def flush_bucket():
+            nonlocal bucket_start
+            now = loop.time()
+            bucket, self.bucket = self.bucket, {}
+            for path, stats in bucket.items():
+                self.totals.setdefault(path, Stats()).merge(stats)
+            completed = sum(stats.requests - stats.timeouts for stats in bucket.values())
+            line = {
+                "type": "bucket",
+                "time_offset": round(now - start, 3),
+                "sent": self.bucket_sent,
+                "throughput_rps": round(completed / max(now - bucket_start, 1e-6), 2),
+            }
+            if self.args.mode == "open":
+                line["target_rps"] = round(self.profile.mean_rate(bucket_start - start, now - start), 2)
+            if self.args.phase_file:
+                phase = read_phase(self.args.phase_file)
+                line["phase"] = phase
+                self.add_to_phase(phase, now - bucket_start, bucket)
+            line.update(summarize(bucket))
+            out.write(json.dumps(line) + "\n")
+            self.bucket_sent = 0
+            bucket_start = now
+
+        async def reporter():
+            next_flush = start + self.args.bucket
+            while not self.stopping.is_set():
+                try:
+                    await asyncio.wait_for(self.stopping.wait(), max(next_flush - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    flush_bucket()
+                    next_flush += self.args.bucket
+
+        reporting = asyncio.ensure_future(reporter())
+        if self.args.mode == "open":
+            await self.open_loop(start, end)
+        else:
+            await self.closed_loop(end)
+
+        # Let in-flight requests complete so they are not lost from the stats
+        if self.in_flight:
+            await asyncio.wait(list(self.in_flight), timeout=self.args.timeout)
+        self.stopping.set()
+        await reporting
+        flush_bucket()
+
+        summary = {
+            "type": "summary",
+            "mode": self.args.mode,
+            "profile": self.profile.to_dict() if self.args.mode == "open" else None,
+            "concurrency": self.args.concurrency if self.args.mode == "closed" else None,
+            "weights": self.mix.to_dict(),
+            "duration": round(loop.time() - start, 3),
+            "sent": self.sent,
+        }
+        summary.update(summarize(self.totals))
+        if self.args.phase_file:
+            summary["phases"] = self.phase_summaries()
+        out.write(json.dumps(summary) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:5000", help="Base URL of the app")
+    parser.add_argument("--endpoints", default="/api/data", help="Comma separated paths with optional weights (/a=3,/b=1)")
+    parser.add_argument("--output", required=True, help="JSON lines file to write buckets and the summary to")
+    parser.add_argument("--pid-file", help="Write this process id here")
+    parser.add_argument("--duration", type=float, required=True, help="Seconds to generate load for")
+    parser.add_argument("--mode", choices=("open", "closed"), default="open")
+    parser.add_argument("--rate", type=float, default=1.0, help="Constant requests per second (open mode without --profile)")
+    parser.add_argument("--profile", help="Rate profile as JSON, e.g. {\"shape\": \"ramp\", \"rate\": 1, \"peak_rate\": 20}")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent workers (closed mode)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Seconds before a request counts as timed out")
+    parser.add_argument("--bucket", type=float, default=1.0, help="Seconds per reported time bucket")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Open mode cap on outstanding requests")
+    parser.add_argument("--phase-file", help="File naming the current experiment phase")
+    args = parser.parse_args()
+    args.endpoints = parse_endpoints(args.endpoints)
+    args.profile = RateProfile(args.duration, **json.loads(args.profile)) if args.profile else RateProfile(args.duration, rate=args.rate)
+
+    if args.pid_file:
+        with open(args.pid_file, "w") as f:
+            f.write(str(os.getpid()))
+    with open(args.output, "w", buffering=1) as out:
+        asyncio.run(LoadGenerator(args).run(out))
+
+
+if __name__ == "__main__":
+    main()
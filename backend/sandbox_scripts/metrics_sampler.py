@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+ChaosLab metrics sampler (runs inside the sandbox)
+
+Samples host CPU/memory/load and the test app process from /proc at a fixed
+interval and appends one CSV row per sample. Only the standard library is
+used and no processes are forked, so sub-second intervals are cheap.
+
+Each row is tagged with the current experiment phase (index into PHASES),
+read from a file that the chaos script rewrites at every phase change.
+
+The CSV header is preceded by a `# start_time=<unix time>` line giving the
+wall-clock time at which time_offset 0 falls, so samples can be aligned with
+other streams.
+
+SIGTERM stops sampling early; a final sample is always written before exit.
+"""
+
+import argparse
+import os
+import re
+import signal
+import time
+
+# Record header of the test app log ("2024-01-01 12:00:00,123 - LEVEL - message");
+# the same pattern as LOG_LINE_PATTERN in services/log_index.py
+LOG_LINE_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - ([A-Z]+) - ")
+
+# Record levels counted in the app log: name -> logging levels it covers
+LOG_LEVELS = {
+    "error": ("ERROR", "CRITICAL"),
+    "warning": ("WARNING",),
+}
+
+# A record with a continuation line starting with this also counts as an exception
+TRACEBACK_MARKER = "Traceback (most recent call last):"
+
+# Experiment phases; the `phase` column holds the index
+PHASES = ("baseline", "fault", "recovery")
+
+CSV_COLUMNS = [
+    "time_offset",
+    "cpu_percent",
+    "memory_percent",
+    "error_count",
+    "load_1m",
+    "app_cpu_percent",
+    "app_rss_mb",
+    "warning_count",
+    "exception_count",
+    "error_delta",
+    "warning_delta",
+    "exception_delta",
+    "phase",
+]
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def read_cpu_times():
+    """(busy, total) jiffies summed over all CPUs"""
+    with open("/proc/stat") as f:
+        values = [int(v) for v in f.readline().split()[1:]]
+    idle = values[3] + (values[4] if len(values) > 4 else 0)  # idle + iowait
+    # guest time is already included in user/nice
+    total = sum(values[:8])
+    return total - idle, total
+
+
+def read_memory_percent():
+    info = {}
+    with open("/proc/meminfo") as f:
+        for line in f:
+            key, value = line.split(":", 1)
+            info[key] = int(value.split()[0])
+    total = info["MemTotal"]
+    available = info.get("MemAvailable", info.get("MemFree", 0) + info.get("Cached", 0))
+    return 100.0 * (total - available) / total if total else 0.0
+
+
+def read_load_1m():
+    with open("/proc/loadavg") as f:
+        return float(f.read().split()[0])
+
+
+def read_process_stat(pid):
+    """(cpu jiffies, rss bytes) of a process, or None if it is gone"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # The command name may contain spaces; fields after it are fixed
+    fields = stat[stat.rindex(")") + 2:].split()
+    return int(fields[11]) + int(fields[12]), int(fields[21]) * PAGE_SIZE
+
+
+def read_phase(path):
+    """Index of the phase named in `path` (baseline if missing or unknown)"""
+    try:
+        with open(path) as f:
+            return PHASES.index(f.read().strip())
+    except (OSError, ValueError):
+        return 0
+
+
+def find_process(match):
+    """First python process with an argument ending in `match` (e.g. app.py)"""
+    own_pid = os.getpid()
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit() or int(entry) == own_pid:
+            continue
+        try:
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                argv = f.read().decode(errors="replace").split("\0")
+        except OSError:
+            continue
+        # Skip shells that merely launched it (e.g. `bash -c "... python3 app.py"`)
+        if os.path.basename(argv[0]).startswith("python") and any(arg.endswith(match) for arg in argv[1:]):
+            return int(entry)
+    return None
+
+
+class LogLevelCounter:
+    """
+    Counts log records per level, reading only what was appended since the last call
+
+    Lines are parsed like the stored log index parses them: a record header
+    opens a record of its level, and the lines after it (tracebacks,
+    multi-line messages) belong to that record. Each record counts once
+    towards its level, and once as an "exception" if it carries a traceback,
+    so a logger.exception() call is both an error and an exception. Returns
+    cumulative counts and the increase since the last call.
+    """
+
+    def __init__(self, path, levels=LOG_LEVELS):
+        self.path = path
+        self.levels = levels
+        self.offset = 0
+        self.partial = b""
+        self.counts = {level: 0 for level in (*levels, "exception")}
+        # Whether a record is open, and whether it was already counted as an exception
+        self.in_record = False
+        self.record_traceback = False
+
+    def update(self):
+        deltas = {level: 0 for level in self.counts}
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                if size < self.offset:
+                    # Log was truncated or rotated; start over
+                    self.offset, self.partial = 0, b""
+                    self.in_record = self.record_traceback = False
+                f.seek(self.offset)
+                data = f.read(size - self.offset)
+        except OSError:
+            return dict(self.counts), deltas
+        self.offset += len(data)
+
+        # A trailing partial line is kept and completed on the next call
+        lines = (self.partial + data).split(b"\n")
+        self.partial = lines.pop()
+        for line in lines:
+            line = line.decode(errors="replace")
+            match = LOG_LINE_PATTERN.match(line)
+            if match:
+                self.in_record, self.record_traceback = True, False
+                for level, names in self.levels.items():
+                    if match.group(2) in names:
+                        deltas[level] += 1
+            elif self.in_record and not self.record_traceback and line.startswith(TRACEBACK_MARKER):
+                self.record_traceback = True
+                deltas["exception"] += 1
+
+        for level, delta in deltas.items():
+            self.counts[level] += delta
+        return dict(self.counts), deltas
+
+
+class Sampler:
+    def __init__(self, app_match, app_log, phase_file):
+        self.app_match = app_match
+        self.phase_file = phase_file
+        self.log_levels = LogLevelCounter(app_log)
+        self.app_pid = None
+        self.previous_cpu = read_cpu_times()
+        self.previous_app = None
+        self.previous_time = time.monotonic()
+
+    def sample(self):
+        now = time.monotonic()
+        elapsed = max(now - self.previous_time, 1e-6)
+        self.previous_time = now
+
+        busy, total = read_cpu_times()
+        busy_delta = busy - self.previous_cpu[0]
+        total_delta = total - self.previous_cpu[1]
+        self.previous_cpu = (busy, total)
+        cpu_percent = 100.0 * busy_delta / total_delta if total_delta > 0 else 0.0
+
+        app_cpu_percent, app_rss_mb = self._sample_app(elapsed)
+        counts, deltas = self.log_levels.update()
+
+        return [
+            cpu_percent,
+            read_memory_percent(),
+            counts["error"],
+            read_load_1m(),
+            app_cpu_percent,
+            app_rss_mb,
+            counts["warning"],
+            counts["exception"],
+            deltas["error"],
+            deltas["warning"],
+            deltas["exception"],
+            read_phase(self.phase_file),
+        ]
+
+    def _sample_app(self, elapsed):
+        stat = read_process_stat(self.app_pid) if self.app_pid else None
+        if stat is None:
+            # First sample, or the app was killed/restarted by the scenario
+            self.app_pid = find_process(self.app_match)
+            self.previous_app = read_process_stat(self.app_pid) if self.app_pid else None
+            return 0.0, (self.previous_app[1] / 1048576 if self.previous_app else 0.0)
+
+        jiffies, rss = stat
+        app_cpu_percent = 100.0 * (jiffies - self.previous_app[0]) / CLOCK_TICKS / elapsed
+        self.previous_app = stat
+        return app_cpu_percent, rss / 1048576
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", required=True, help="CSV file to append samples to")
+    parser.add_argument("--pid-file", help="Write this process id here")
+    parser.add_argument("--duration", type=float, required=True, help="Seconds to sample for")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between samples")
+    parser.add_argument("--app-match", default="app.py", help="Command line substring of the app process")
+    parser.add_argument("--app-log", default="/tmp/flask_app.log", help="Application log to count levels in")
+    parser.add_argument("--phase-file", default="/tmp/chaos_phase", help="File naming the current experiment phase")
+    args = parser.parse_args()
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    if args.pid_file:
+        with open(args.pid_file, "w") as f:
+            f.write(str(os.getpid()))
+
+    start = time.monotonic()
+    started_at = time.time()
+    sampler = Sampler(args.app_match, args.app_log, args.phase_file)
+
+    with open(args.output, "w", buffering=1) as out:
+        out.write(f"# start_time={started_at:.3f}\n")
+        out.write(",".join(CSV_COLUMNS) + "\n")
+
+        def write_sample():
+            offset = time.monotonic() - start
+            values = sampler.sample()
+            out.write(f"{offset:.3f}," + ",".join(f"{v:.2f}" if isinstance(v, float) else str(v) for v in values) + "\n")
+
+        # CPU deltas need a baseline, so the first row comes shortly after start
+        next_sample = start + min(args.interval, 0.1)
+        end = start + args.duration
+        while not stopping and time.monotonic() < end:
+            delay = next_sample - time.monotonic()
+            if delay > 0:
+                # Sleep in short steps so SIGTERM is handled promptly
+                while delay > 0 and not stopping:
+                    time.sleep(min(delay, 0.1))
+                    delay = next_sample - time.monotonic()
+                if stopping:
+                    break
+            write_sample()
+            # Fixed schedule: sampling cost does not accumulate as drift
+            next_sample += args.interval
+            if next_sample < time.monotonic():
+                next_sample = time.monotonic() + args.interval
+
+        # Final sample so the end of the run is captured
+        if time.monotonic() - sampler.previous_time >= min(args.interval, 0.1):
+            write_sample()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Waiter:
+    def __init__(self, ticket_id: str, count: int, future: asyncio.Future):
+        self.ticket_id = ticket_id
+        self.count = count
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class SandboxAdmissionController:
+    """
+    Process-wide limit on sandboxes held by running experiments
+
+    Experiments request as many slots as they need sandboxes and are admitted
+    strictly first-come first-served: a large request at the head of the queue
+    is not overtaken by smaller ones behind it. A request for more slots than
+    the whole budget is refused with ValueError. Must be used from the server
+    event loop.
+    """
+
+    def __init__(self, max_sandboxes: int = 10):
+        """
+        Initialize admission controller
+
+        Args:
+            max_sandboxes: Maximum sandboxes held at once across all experiments
+        """
+        self.capacity = max_sandboxes
+        self._in_use = 0
+        self._waiters: Deque[_Waiter] = deque()
+
+        self._admitted = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._last_wait = 0.0
+
+    @asynccontextmanager
+    async def slots(self, ticket_id: str, count: int) -> AsyncIterator[None]:
+        """Hold `count` sandbox slots for the duration of the block"""
+        await self.acquire(ticket_id, count)
+        try:
+            yield
+        finally:
+            self.release(count)
+
+    async def acquire(self, ticket_id: str, count: int):
+        """Wait in line until `count` slots are free"""
+        self.check(count)
+        started = time.monotonic()
+
+        if not self._waiters and self._in_use + count <= self.capacity:
+            self._in_use += count
+            self._record_wait(0.0)
+            return
+
+        waiter = _Waiter(ticket_id, count, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        logger.info(
+            f"{ticket_id} waiting for {count} sandbox slot(s) "
+            f"(position {len(self._waiters)}, {self._in_use}/{self.capacity} in use)"
+        )
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Admitted just before the cancellation was delivered
+                self.release(count)
+            else:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                self._admit_waiting()
+            raise
+
+        waited = time.monotonic() - started
+        self._record_wait(waited)
+        logger.info(f"{ticket_id} admitted after {waited:.1f}s")
+
+    def release(self, count: int):
+        """Return slots taken with acquire()"""
+        self._in_use -= count
+        self._admit_waiting()
+
+    def queue_position(self, ticket_id: str) -> Optional[int]:
+        """1-based position of a waiting ticket, or None if it is not queued"""
+        for position, waiter in enumerate(self._waiters, start=1):
+            if waiter.ticket_id == ticket_id:
+                return position
+        return None
+
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Slot usage, queue depth and admission wait times"""
+        now = time.monotonic()
+        return {
+            "max_sandboxes": self.capacity,
+            "in_use": self._in_use,
+            "queue_depth": len(self._waiters),
+            "queued_slots": sum(waiter.count for waiter in self._waiters),
+            "oldest_wait_seconds": round(now - self._waiters[0].enqueued_at, 2) if self._waiters else 0.0,
+            "admitted": self._admitted,
+            "avg_wait_seconds": round(self._total_wait / self._admitted, 2) if self._admitted else 0.0,
+            "max_wait_seconds": round(self._max_wait, 2),
+            "last_wait_seconds": round(self._last_wait, 2)
+        }
+
+    def _admit_waiting(self):
+        while self._waiters and self._in_use + self._waiters[0].count <= self.capacity:
+            waiter = self._waiters.popleft()
+            if waiter.future.done():
+                continue
+            self._in_use += waiter.count
+            waiter.future.set_result(None)
+
+    def check(self, count: int):
+        """Raise ValueError unless `count` slots could ever be granted"""
+        if count < 1:
+            raise ValueError(f"At least one sandbox slot must be requested, not {count}")
+        if count > self.capacity:
+            # Granting fewer would run more sandboxes than requested slots
+            raise ValueError(f"{count} sandboxes requested, but at most {self.capacity} may run at once")
+
+    def _record_wait(self, waited: float):
+        self._admitted += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+        self._last_wait = waited
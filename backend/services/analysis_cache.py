@@ -0,0 +1,133 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_used ON analysis_cache(last_used);
+"""
+
+
+class AnalysisCache:
+    """
+    Content-addressed cache of LLM analyses backed by SQLite
+
+    Entries are keyed by a SHA-256 of everything that determines the model's
+    answer (model, request parameters, system and user prompt), so only
+    byte-identical requests hit. Entries expire `ttl_seconds` after they were
+    stored; beyond `max_entries` the least recently used are evicted. A
+    `max_entries` of 0 disables the cache. All methods are thread-safe.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: float = 7 * 24 * 3600, max_entries: int = 512):
+        """
+        Initialize analysis cache
+
+        Args:
+            db_path: SQLite database file (created if missing)
+            ttl_seconds: Lifetime of an entry from when it was stored
+            max_entries: Entries kept before the least recently used are evicted
+        """
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evicted = 0
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_prompt: str, **parameters: Any) -> str:
+        """Hash of a request; `parameters` are other settings that change the answer (temperature, ...)"""
+        request = json.dumps(
+            {"model": model, "parameters": parameters, "system": system_prompt, "user": user_prompt},
+            sort_keys=True,
+            separators=(",", ":")
+        )
+        return hashlib.sha256(request.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached analysis for `key`, or None on a miss (expired entries are removed)"""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM analysis_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM analysis_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self._expired += 1
+                row = None
+            if not row:
+                self._misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE analysis_cache SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self._hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Dict[str, Any]):
+        """Store an analysis, evicting the least recently used entries beyond `max_entries`"""
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache (key, value, created_at, last_used, hits) VALUES (?, ?, ?, ?, 0)",
+                (key, json.dumps(value, default=str), now, now)
+            )
+            cursor = self._conn.execute(
+                "DELETE FROM analysis_cache WHERE key IN ("
+                "SELECT key FROM analysis_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._evicted += cursor.rowcount
+            self._conn.commit()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Size and hit-rate counters"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+            total = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 3) if total else None,
+                "expired": self._expired,
+                "evicted": self._evicted
+            }
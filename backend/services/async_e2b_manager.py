@@ -0,0 +1,393 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, Dict, Any, List, Optional
+import logging
+
+from services.e2b_manager import (
+    E2BManager,
+    ExperimentScripts,
+    METRICS_FILE,
+    MONITOR_PID_FILE,
+    METRICS_SAMPLER_PATH,
+    DEFAULT_METRICS_INTERVAL,
+    CHAOS_CLEANUP_COMMAND,
+    APP_LOGS_COMMAND,
+    APP_LOG_ARCHIVE,
+    ARCHIVE_APP_LOG_COMMAND,
+    LOADGEN_PATH,
+    LOADGEN_FILE,
+    LOADGEN_PID_FILE,
+    LOADGEN_RESULTS_COMMAND,
+    PHASE_FILE,
+    PHASES_SCRIPT_PATH,
+    FAULT_OVERRUN_SECONDS,
+    SANDBOX_TIMEOUT_MARGIN,
+    TEMPLATE_APP_PATH
+)
+from services.metrics_stream import AsyncMetricsStreamCollector
+from services.sandbox_backends import SandboxBackend, E2BSandboxBackend
+from services.probes import (
+    async_check_condition,
+    async_wait_for_http_ready,
+    async_wait_for_file_content,
+    async_wait_for_process_exit
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncE2BManager(ExperimentScripts):
+    """
+    Manages E2B sandbox lifecycle and chaos experiments with the async SDK
+
+    The async sibling of E2BManager, built on the same ExperimentScripts:
+    every sandbox call is a coroutine on an AsyncSandbox handle, so many
+    sandboxes can be driven from the server event loop without a thread
+    per instance. Summaries and averaging run in a worker thread.
+    """
+
+    def __init__(self, api_key: str, backend: Optional[SandboxBackend] = None):
+        """
+        Args:
+            api_key: E2B API key
+            backend: Sandbox backend; defaults to remote E2B sandboxes
+        """
+        self.api_key = api_key
+        self.backend = backend or E2BSandboxBackend(api_key)
+        self.sandbox = None  # Async sandbox handle created by self.backend
+
+    @classmethod
+    async def adopt(cls, manager: E2BManager) -> "AsyncE2BManager":
+        """Take over the sandbox of a synchronous manager (e.g. from SandboxPool)"""
+        async_manager = cls(manager.api_key, backend=manager.backend)
+        async_manager.sandbox = await manager.backend.aconnect(manager.sandbox)
+        return async_manager
+
+    async def create_sandbox(self, max_retries: int = 3) -> str:
+        """Create a new E2B sandbox with retry logic"""
+        last_error = None
+
+        for attempt in range(max_retries):
+            try:
+                logger.info(f"Creating {self.backend.name} sandbox... (attempt {attempt + 1}/{max_retries})")
+
+                self.sandbox = await self.backend.acreate(timeout=120)
+                logger.info(f"Sandbox created successfully: {self.sandbox.sandbox_id}")
+                return self.sandbox.sandbox_id
+
+            except Exception as e:
+                last_error = e
+                logger.warning(f"Sandbox creation attempt {attempt + 1} failed: {e}")
+
+                if self.sandbox:
+                    try:
+                        await self.sandbox.kill()
+                    except Exception:
+                        pass
+                    self.sandbox = None
+
+                if attempt < max_retries - 1:
+                    wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
+                    logger.info(f"Waiting {wait_time}s before retry...")
+                    await asyncio.sleep(wait_time)
+
+        logger.error(f"Failed to create sandbox after {max_retries} attempts: {last_error}")
+        raise Exception(f"Sandbox creation failed after {max_retries} attempts: {last_error}")
+
+    async def deploy_test_app(self) -> bool:
+        """Deploy Flask test app in sandbox"""
+        if not self.sandbox:
+            raise RuntimeError("Sandbox not created")
+
+        try:
+            if await self._has_prebaked_app():
+                logger.info("Starting prebaked test app from template...")
+                await self.sandbox.commands.run(
+                    f"cd {os.path.dirname(TEMPLATE_APP_PATH)} && nohup python3 app.py > /tmp/flask.log 2>&1 &",
+                    background=True
+                )
+            else:
+                logger.info("Deploying test app in sandbox...")
+
+                if self.backend.requires_provisioning:
+                    logger.info("Installing Python and Flask...")
+                    await self.sandbox.commands.run("sudo apt-get update")
+                    await self.sandbox.commands.run("sudo apt-get install -y python3 python3-pip curl")
+
+                await self.sandbox.files.write("/home/user/app.py", self._get_test_app_code())
+
+                if self.backend.requires_provisioning:
+                    await self.sandbox.commands.run("pip3 install flask --break-system-packages")
+
+                logger.info("Starting Flask app...")
+                await self.sandbox.commands.run(
+                    "cd /home/user && nohup python3 app.py > /tmp/flask.log 2>&1 &",
+                    background=True
+                )
+
+            if await async_wait_for_http_ready(self.sandbox, timeout=30):
+                logger.info("Test app deployed and verified successfully")
+            else:
+                logger.warning("App started but health check failed, but continuing...")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to deploy test app: {e}")
+            raise
+
+    async def _has_prebaked_app(self) -> bool:
+        """Whether the sandbox was created from the prebaked test app template"""
+        if not getattr(self.backend, "template_id", None):
+            return False
+        try:
+            return await async_check_condition(self.sandbox, f"[ -f {TEMPLATE_APP_PATH} ]")
+        except Exception as e:
+            logger.warning(f"Could not check for prebaked app: {e}")
+            return False
+
+    async def check_health(self) -> bool:
+        """Check that the sandbox is alive and the test app answers /health"""
+        if not self.sandbox:
+            return False
+
+        try:
+            result = await self.sandbox.commands.run("curl -s http://localhost:5000/health", timeout=10)
+            return "healthy" in result.stdout
+        except Exception as e:
+            logger.warning(f"Health check failed: {e}")
+            return False
+
+    async def extend_timeout(self, seconds: int):
+        """Keep the sandbox alive for at least `seconds` from now"""
+        if not self.sandbox:
+            raise RuntimeError("Sandbox not created")
+
+        await self.sandbox.set_timeout(seconds)
+
+    async def run_chaos_script(
+        self,
+        scenario: str,
+        config: Dict[str, Any],
+        on_samples: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute chaos script and collect metrics with time-series data
+
+        Args:
+            on_samples: Coroutine function awaited with each batch of timeline
+                points as it is collected
+        """
+        if not self.sandbox:
+            raise RuntimeError("Sandbox not created")
+
+        try:
+            logger.info(f"Running chaos scenario: {scenario}")
+
+            duration = config.get("duration", 60)
+            baseline_seconds, recovery_seconds = self._phase_seconds(config)
+            run_seconds = baseline_seconds + duration + recovery_seconds + FAULT_OVERRUN_SECONDS
+            script_timeout = run_seconds + 30
+            # Sandboxes are created with a short timeout; outlive the whole run
+            await self.extend_timeout(script_timeout + SANDBOX_TIMEOUT_MARGIN)
+            script_path = f"/tmp/chaos_{scenario}.sh"
+            await asyncio.gather(
+                self.sandbox.files.write(script_path, self._get_chaos_script(scenario, config)),
+                self.sandbox.files.write(PHASES_SCRIPT_PATH, self._get_phases_script(scenario, config, script_path)),
+                self.sandbox.files.write(METRICS_SAMPLER_PATH, self._get_metrics_sampler_code()),
+                self.sandbox.files.write(LOADGEN_PATH, self._get_loadgen_code())
+            )
+            await self.sandbox.commands.run(
+                f"chmod +x {script_path} {PHASES_SCRIPT_PATH} && "
+                f"rm -f {METRICS_FILE} {MONITOR_PID_FILE} {LOADGEN_FILE} {LOADGEN_PID_FILE} && "
+                f"echo baseline > {PHASE_FILE}"
+            )
+
+            logger.info("Starting metrics monitoring...")
+            await self.sandbox.commands.run(
+                self._metrics_sampler_command(run_seconds, config.get("metrics_interval", DEFAULT_METRICS_INTERVAL)),
+                background=True
+            )
+            await async_wait_for_file_content(self.sandbox, METRICS_FILE, timeout=10)
+
+            chaos_handle = None
+            abort_requested = False
+
+            async def abort_chaos(reason: str):
+                nonlocal abort_requested
+                abort_requested = True
+                # Before the script has started, it is stopped as soon as it does
+                if chaos_handle:
+                    await self._stop_chaos(chaos_handle)
+
+            collector = AsyncMetricsStreamCollector(
+                self.sandbox,
+                METRICS_FILE,
+                interval=config.get("metrics_poll_interval", 2.0),
+                on_samples=on_samples,
+                abort_thresholds=config.get("abort_thresholds"),
+                on_abort=abort_chaos
+            )
+            collector.start()
+            try:
+                logger.info(
+                    f"Executing chaos script with {baseline_seconds}s baseline and "
+                    f"{recovery_seconds}s recovery (timeout: {script_timeout}s)..."
+                )
+                try:
+                    chaos_handle = await self.sandbox.commands.run(
+                        f"bash {PHASES_SCRIPT_PATH}",
+                        background=True,
+                        timeout=script_timeout
+                    )
+                    if abort_requested:
+                        await self._stop_chaos(chaos_handle)
+                    await chaos_handle.wait()
+                except Exception as e:
+                    if not collector.aborted:
+                        raise
+                    logger.info(f"Chaos script stopped early: {e}")
+
+                # Ask the monitor to take a final sample and wait until it has exited
+                await self.sandbox.commands.run(f"kill -TERM $(cat {MONITOR_PID_FILE}) 2>/dev/null || true")
+                if not await async_wait_for_process_exit(self.sandbox, MONITOR_PID_FILE, timeout=10):
+                    await self.sandbox.commands.run(f"kill -KILL $(cat {MONITOR_PID_FILE}) 2>/dev/null || true")
+                # An aborted run's load generator is still writing its summary
+                await async_wait_for_process_exit(self.sandbox, LOADGEN_PID_FILE, timeout=15)
+            finally:
+                # Never leave the collector polling a sandbox that is being torn down
+                timeline = await collector.stop()
+
+            metrics = await self._collect_timeseries_metrics(timeline, config.get("recovery"), collector.start_time)
+            metrics["aborted"] = collector.aborted
+            metrics["abort_reason"] = collector.abort_reason
+
+            logger.info("Chaos script completed")
+            return metrics
+
+        except Exception as e:
+            logger.error(f"Failed to run chaos script: {e}")
+            raise
+
+    async def _stop_chaos(self, chaos_handle):
+        """Kill a running chaos script and undo the faults it injected"""
+        try:
+            await chaos_handle.kill()
+        except Exception as e:
+            logger.warning(f"Failed to kill chaos script: {e}")
+        try:
+            await self.sandbox.commands.run(CHAOS_CLEANUP_COMMAND, timeout=30)
+        except Exception as e:
+            logger.warning(f"Chaos cleanup failed: {e}")
+
+    async def _collect_timeseries_metrics(
+        self,
+        timeline: List[Dict[str, Any]],
+        recovery_config: Optional[Dict[str, Any]] = None,
+        start_time: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Summarize the streamed timeline and collect application logs and load results
+
+        Args:
+            start_time: Wall-clock time of the timeline's offset 0
+        """
+        if not self.sandbox:
+            raise RuntimeError("Sandbox not created")
+
+        try:
+            logs, load_result = await asyncio.gather(
+                self._fetch_app_logs(),
+                self.sandbox.commands.run(LOADGEN_RESULTS_COMMAND)
+            )
+            # Log counting and NumPy summaries are CPU work; keep them off the event loop
+            return await asyncio.to_thread(
+                self._summarize_timeseries, timeline, logs, load_result.stdout, recovery_config, start_time
+            )
+        except Exception as e:
+            logger.error(f"Failed to collect timeseries metrics: {e}")
+            return self._failed_timeseries(timeline, e)
+
+    async def _fetch_app_logs(self) -> str:
+        """Application log, gzipped in the sandbox and downloaded compressed"""
+        try:
+            await self.sandbox.commands.run(ARCHIVE_APP_LOG_COMMAND, timeout=60)
+            archive = await self.sandbox.files.read(APP_LOG_ARCHIVE, format="bytes")
+            logs = await asyncio.to_thread(self._gunzip_chunks, [bytes(archive)])
+        except Exception as e:
+            logger.warning(f"Compressed log download failed, reading the log directly: {e}")
+            return (await self.sandbox.commands.run(APP_LOGS_COMMAND)).stdout
+        logger.info(f"Downloaded {len(archive)} compressed bytes of application logs ({len(logs)} bytes)")
+        return logs
+
+    async def run_parallel_experiments(
+        self,
+        scenario: str,
+        config: Dict[str, Any],
+        num_instances: int,
+        provision: Optional[Callable[[], Awaitable["AsyncE2BManager"]]] = None,
+        on_samples: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run experiments concurrently across multiple sandboxes and average the results
+
+        Args:
+            provision: Optional coroutine function returning a manager with the
+                test app already deployed. Defaults to creating and deploying a
+                fresh sandbox per instance.
+            on_samples: Awaited with each batch of an instance's timeline
+                points, tagged with an `instance` number
+        """
+        logger.info(f"Starting {num_instances} parallel experiments")
+
+        async def provision_fresh() -> "AsyncE2BManager":
+            instance_manager = AsyncE2BManager(self.api_key, backend=self.backend)
+            try:
+                await instance_manager.create_sandbox()
+                await instance_manager.deploy_test_app()
+            except Exception:
+                await instance_manager.cleanup()
+                raise
+            return instance_manager
+
+        provision = provision or provision_fresh
+
+        async def run_single_instance(instance_num: int) -> Optional[Dict[str, Any]]:
+            try:
+                logger.info(f"Instance {instance_num + 1}/{num_instances}: Provisioning sandbox")
+                instance_manager = await provision()
+
+                try:
+                    logger.info(f"Instance {instance_num + 1}/{num_instances}: Running chaos script")
+                    instance_on_samples = None
+                    if on_samples:
+                        async def instance_on_samples(points: List[Dict[str, Any]]):
+                            await on_samples([{**point, "instance": instance_num + 1} for point in points])
+                    metrics = await instance_manager.run_chaos_script(scenario, config, instance_on_samples)
+                    metrics["instance"] = instance_num + 1
+                    return metrics
+                finally:
+                    logger.info(f"Instance {instance_num + 1}/{num_instances}: Cleaning up")
+                    await instance_manager.cleanup()
+            except Exception as e:
+                logger.error(f"Instance {instance_num + 1}/{num_instances} failed: {e}")
+                return None
+
+        results = await asyncio.gather(*(run_single_instance(i) for i in range(num_instances)))
+        all_metrics = [result for result in results if result]
+
+        if not all_metrics:
+            raise Exception("All parallel experiments failed")
+
+        logger.info(f"Successfully completed {len(all_metrics)}/{num_instances} experiments")
+        return await asyncio.to_thread(self._average_metrics, all_metrics, config.get("recovery"))
+
+    async def cleanup(self):
+        """Destroy sandbox and cleanup resources"""
+        if self.sandbox:
+            try:
+                logger.info(f"Destroying sandbox: {self.sandbox.sandbox_id}")
+                await self.sandbox.kill()
+                self.sandbox = None
+                logger.info("Sandbox destroyed successfully")
+            except Exception as e:
+                logger.error(f"Failed to destroy sandbox: {e}")
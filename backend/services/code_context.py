@@ -0,0 +1,285 @@
+import ast
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+# Loop/comprehension sizes from which a range() is reported as CPU or memory work
+LARGE_RANGE = 10000
+
+
+def extract_structure(source: str) -> Dict[str, Any]:
+    """
+    Routes, error handlers and resilience-relevant patterns of a Flask app
+
+    For every decorated view function: its routes and methods, docstring,
+    sleeps (with the delay expression, following a local variable to its
+    assignment), random failures (`random.random() < p` with the status of
+    the response returned under it), loops and comprehensions over large
+    ranges, and the messages it logs at error level.
+    """
+    tree = ast.parse(source)
+    routes = []
+    handlers = []
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef):
+            continue
+        endpoints = []
+        for decorator in node.decorator_list:
+            call = _call_name(decorator)
+            if call.endswith(".route") and decorator.args:
+                methods = _keyword(decorator, "methods")
+                endpoints.append({
+                    "path": _literal(decorator.args[0]),
+                    "methods": _literal(methods) if methods is not None else ["GET"]
+                })
+            elif call.endswith(".errorhandler") and decorator.args:
+                handlers.append({
+                    "function": node.name,
+                    "error": _literal(decorator.args[0]),
+                    "line": node.lineno,
+                    "lines": _span(node)
+                })
+        if endpoints:
+            routes.append({
+                "function": node.name,
+                "line": node.lineno,
+                "lines": _span(node),
+                "routes": endpoints,
+                "doc": ast.get_docstring(node),
+                **_patterns(node)
+            })
+    return {"routes": routes, "error_handlers": handlers}
+
+
+def render_structure(structure: Dict[str, Any], name: str = "app.py") -> str:
+    """Structure as a compact comment block to put before the code"""
+    lines = [f"# ENDPOINTS IN {name} (parsed from the code):"]
+    for view in structure["routes"]:
+        for route in view["routes"]:
+            lines.append(
+                f"# - {','.join(route['methods'])} {route['path']} -> {view['function']}() (line {view['line']})"
+                + (f": {view['doc']}" if view["doc"] else "")
+            )
+        details = (
+            [f"sleeps {delay}s" for delay in view["sleeps"]]
+            + [
+                f"fails {failure['rate']:.0%} of requests" + (f" with HTTP {failure['status']}" if failure["status"] else "")
+                for failure in view["failures"]
+            ]
+            + [f"iterates {work}" for work in view["large_work"]]
+            + [f"logs error {message!r}" for message in view["error_logs"]]
+        )
+        if details:
+            lines.append(f"#     {'; '.join(details)}")
+    for handler in structure["error_handlers"]:
+        lines.append(f"# - error handler {handler['error']} -> {handler['function']}() (line {handler['line']})")
+    return "\n".join(lines)
+
+
+class CodeContext:
+    """
+    Codebase context for analysis prompts, parsed once per version of the file
+
+    The source is re-read only when the file's mtime or size changes, and
+    re-parsed only when its SHA-256 changes too, so an analysis costs a
+    stat() call. Thread-safe.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._stat = None
+        self._context: Optional[Dict[str, Any]] = None
+        self._hits = 0
+        self._parses = 0
+
+    def get(self) -> Optional[Dict[str, Any]]:
+        """Source, hash, structure and rendered summary of the current file (None if unreadable)"""
+        with self._lock:
+            try:
+                stat = self.path.stat()
+            except OSError as e:
+                logger.warning(f"Could not read {self.path}: {e}")
+                return None
+            key = (stat.st_mtime_ns, stat.st_size)
+            if self._context and key == self._stat:
+                self._hits += 1
+                return self._context
+
+            try:
+                source = self.path.read_text()
+            except OSError as e:
+                logger.warning(f"Could not read {self.path}: {e}")
+                return None
+            self._stat = key
+            digest = hashlib.sha256(source.encode()).hexdigest()
+            if self._context and digest == self._context["sha256"]:
+                self._hits += 1
+                return self._context
+
+            try:
+                structure = extract_structure(source)
+            except SyntaxError as e:
+                logger.warning(f"Could not parse {self.path}: {e}")
+                structure = {"routes": [], "error_handlers": []}
+            self._parses += 1
+            self._context = {
+                "source": source,
+                "sha256": digest,
+                "structure": structure,
+                "summary": render_structure(structure, self.path.name)
+            }
+            logger.info(f"Parsed {self.path}: {len(structure['routes'])} views, sha256 {digest[:12]}")
+            return self._context
+
+    def prompt_text(self, endpoints: Optional[Sequence[str]] = None) -> str:
+        """
+        Summary followed by the code relevant to an experiment, for the analysis prompt
+
+        The code is the view functions serving `endpoints` (in that order,
+        so the most relevant come first when the prompt builder cuts it),
+        then the error handlers. All views are shown when `endpoints` is None.
+        """
+        context = self.get()
+        if context is None:
+            return "# Test app code not available"
+
+        structure = context["structure"]
+        views = structure["routes"]
+        if endpoints is not None:
+            order = {path: i for i, path in enumerate(endpoints)}
+            views = sorted(
+                (view for view in views if any(route["path"] in order for route in view["routes"])),
+                key=lambda view: min(order.get(route["path"], len(order)) for route in view["routes"])
+            )
+        lines = context["source"].splitlines()
+        snippets = [
+            f"# {self.path.name} lines {start}-{end}\n" + "\n".join(lines[start - 1:end])
+            for start, end in [view["lines"] for view in views] + [handler["lines"] for handler in structure["error_handlers"]]
+        ]
+        return "\n\n".join([context["summary"]] + snippets)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "path": str(self.path),
+                "sha256": self._context["sha256"] if self._context else None,
+                "views": len(self._context["structure"]["routes"]) if self._context else None,
+                "parses": self._parses,
+                "hits": self._hits
+            }
+
+
+def _span(function: ast.FunctionDef) -> List[int]:
+    """First (decorators included) and last source line of a function"""
+    return [min([function.lineno] + [d.lineno for d in function.decorator_list]), function.end_lineno]
+
+
+def _patterns(function: ast.FunctionDef) -> Dict[str, List[Any]]:
+    """Sleeps, random failures, large iterations and error log messages inside a function"""
+    assignments = {
+        node.targets[0].id: node.value
+        for node in ast.walk(function)
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name)
+    }
+    sleeps, failures, large_work, error_logs = [], [], [], []
+    # In source order (ast.walk is breadth-first)
+    nodes = sorted(ast.walk(function), key=lambda n: (getattr(n, "lineno", 0), getattr(n, "col_offset", 0)))
+    for node in nodes:
+        if isinstance(node, ast.Call):
+            name = _call_name(node)
+            if name.endswith("sleep") and node.args:
+                delay = node.args[0]
+                if isinstance(delay, ast.Name) and delay.id in assignments:
+                    delay = assignments[delay.id]
+                sleeps.append(ast.unparse(delay))
+            elif name.endswith((".error", ".exception", ".critical")) and node.args:
+                error_logs.append(_message(node.args[0]))
+            elif name == "range" and node.args:
+                size = _literal(node.args[-1] if len(node.args) == 1 else node.args[1])
+                if isinstance(size, int) and size >= LARGE_RANGE:
+                    large_work.append(_enclosing_work(function, node))
+        elif isinstance(node, ast.If):
+            rate = _failure_rate(node.test)
+            if rate is not None:
+                failures.append({"rate": rate, "status": _returned_status(node.body), "line": node.lineno})
+    return {"sleeps": sleeps, "failures": failures, "large_work": large_work, "error_logs": error_logs}
+
+
+def _failure_rate(test: ast.expr) -> Optional[float]:
+    """p of a `random.random() < p` condition"""
+    if (
+        isinstance(test, ast.Compare)
+        and len(test.ops) == 1
+        and isinstance(test.ops[0], (ast.Lt, ast.LtE))
+        and isinstance(test.left, ast.Call)
+        and _call_name(test.left) == "random.random"
+    ):
+        rate = _literal(test.comparators[0])
+        if isinstance(rate, (int, float)):
+            return float(rate)
+    return None
+
+
+def _returned_status(body: List[ast.stmt]) -> Optional[int]:
+    """Status of a `return response, status` in a block"""
+    for statement in body:
+        if isinstance(statement, ast.Return) and isinstance(statement.value, ast.Tuple) and len(statement.value.elts) > 1:
+            status = _literal(statement.value.elts[1])
+            if isinstance(status, int):
+                return status
+    return None
+
+
+def _enclosing_work(function: ast.FunctionDef, range_call: ast.Call) -> str:
+    """Source of the statement value (comprehension, sum(...)) that iterates a large range"""
+    for node in ast.walk(function):
+        if isinstance(node, (ast.Assign, ast.Expr, ast.For)):
+            target = node.iter if isinstance(node, ast.For) else node.value
+            if any(child is range_call for child in ast.walk(target)):
+                return ast.unparse(target)
+    return ast.unparse(range_call)
+
+
+def _message(node: ast.expr) -> str:
+    """Log message with f-string placeholders shown as {...}"""
+    if isinstance(node, ast.JoinedStr):
+        return "".join(
+            part.value if isinstance(part, ast.Constant) else "{" + ast.unparse(part.value) + "}"
+            for part in node.values
+        )
+    value = _literal(node)
+    return value if isinstance(value, str) else ast.unparse(node)
+
+
+def _call_name(node: ast.expr) -> str:
+    """Dotted name of a call's function ("app.route", "time.sleep"), "" if not a plain name"""
+    if not isinstance(node, ast.Call):
+        return ""
+    parts = []
+    func = node.func
+    while isinstance(func, ast.Attribute):
+        parts.append(func.attr)
+        func = func.value
+    if isinstance(func, ast.Name):
+        parts.append(func.id)
+        return ".".join(reversed(parts))
+    return ""
+
+
+def _keyword(call: ast.Call, name: str) -> Optional[ast.expr]:
+    for keyword in call.keywords:
+        if keyword.arg == name:
+            return keyword.value
+    return None
+
+
+def _literal(node: ast.expr) -> Any:
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        return ast.unparse(node)
@@ -1,498 +1,398 @@
+import json
 import os
+import shlex
 import time
-from typing import Dict, Any, Optional
-from e2b_code_interpreter import Sandbox
+import zlib
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 
+from services.sandbox_backends import SandboxBackend, E2BSandboxBackend
+from services.timeseries import resample_timelines, combine_latency_timelines, to_columnar, distribution
+from services.recovery import RecoveryAnalyzer
+from services.phases import phase_boundaries, summarize_phases, combine_phases
+from services.probes import check_condition, wait_for_http_ready
+
 logger = logging.getLogger(__name__)
 
+# Files written by the metrics monitor inside the sandbox
+METRICS_FILE = "/tmp/metrics_timeseries.csv"
+MONITOR_PID_FILE = "/tmp/monitor_metrics.pid"
+
+# /proc sampler that produces METRICS_FILE
+METRICS_SAMPLER_SOURCE = Path(__file__).resolve().parents[1] / "sandbox_scripts" / "metrics_sampler.py"
+METRICS_SAMPLER_PATH = "/tmp/metrics_sampler.py"
+
+# Default seconds between metrics samples
+DEFAULT_METRICS_INTERVAL = 1.0
+
+# Log levels the sampler counts (<level>_count / <level>_delta timeline fields)
+LOG_LEVELS = ("error", "warning", "exception")
+
+# Async HTTP load generator used by the chaos scripts, and the JSON lines it writes
+LOADGEN_SOURCE = Path(__file__).resolve().parents[1] / "sandbox_scripts" / "loadgen.py"
+LOADGEN_PATH = "/tmp/loadgen.py"
+LOADGEN_FILE = "/tmp/loadgen.jsonl"
+LOADGEN_PID_FILE = "/tmp/loadgen.pid"
+
+# Current experiment phase (baseline, fault, recovery), read by the sampler and load generator
+PHASE_FILE = "/tmp/chaos_phase"
+
+# Script that runs the load and steps through the phases around the scenario script
+PHASES_SCRIPT_PATH = "/tmp/chaos_phases.sh"
+
+# Default seconds of steady load before the fault and after it is removed
+DEFAULT_PHASES = {"baseline_seconds": 10, "recovery_seconds": 10}
+
+# Time allowed for scenario scripts to set up and tear down faults beyond `duration`
+FAULT_OVERRUN_SECONDS = 30
+
+# Sandbox lifetime kept beyond the chaos script's timeout, to stop the monitor and collect logs and load results
+SANDBOX_TIMEOUT_MARGIN = 120
+
+# Default load during each scenario: endpoint weights and a rate profile
+# (requests per second), overridable with config["load"]
+SCENARIO_LOAD = {
+    "network_delay": {"weights": {"/api/data": 2, "/api/heavy": 1}, "profile": {"rate": 3.0}},
+    "memory_pressure": {"weights": {"/api/data": 1, "/api/heavy": 1, "/api/memory": 1}, "profile": {"rate": 3.0}},
+    "disk_full": {"weights": {"/api/data": 1, "/api/heavy": 1}, "profile": {"rate": 2.0}},
+    # Steady /api/data traffic with a burst of CPU-heavy requests in the middle of the fault
+    "process_kill": {
+        "weights": {"/api/data": 3, "/api/heavy": 1},
+        "profile": {"shape": "spike", "rate": 1.0, "peak_rate": 5.0, "spike_duration": 3.0}
+    },
+    "dependency_failure": {"weights": {"/api/data": 10, "/api/heavy": 1}, "profile": {"rate": 1.1}}
+}
+
+# Stops fault helpers started by the chaos scripts and removes their leftovers
+CHAOS_CLEANUP_COMMAND = (
+    # Bracketed patterns keep pkill from matching this command line itself
+    "pkill -f '/tmp/[m]emory_hog.py'; pkill -f '/tmp/[d]isk_filler.py'; "
+    # TERM lets the load generator write its final bucket and summary
+    "pkill -TERM -f '/tmp/[l]oadgen.py'; pkill -f '/tmp/[c]haos_'; "
+    "rm -f /tmp/fillfile_* /tmp/test_write_*.tmp; "
+    "tc qdisc del dev eth0 root netem 2>/dev/null; true"
+)
 
-class E2BManager:
-    """Manages E2B sandbox lifecycle and chaos experiments"""
-    
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        self.sandbox: Optional[Sandbox] = None
-        
-    def create_sandbox(self, max_retries: int = 3) -> str:
-        """Create a new E2B sandbox with retry logic"""
-        last_error = None
-        
-        for attempt in range(max_retries):
-            try:
-                logger.info(f"Creating E2B sandbox... (attempt {attempt + 1}/{max_retries})")
-                
-                # Create sandbox using the constructor (not .create() method)
-                # Pass api_key directly to the Sandbox constructor
-                self.sandbox = Sandbox(
-                    api_key=self.api_key,
-                    timeout=120  # Timeout in seconds for code interpreter
-                )
-                logger.info(f"Sandbox created successfully: {self.sandbox.sandbox_id}")
-                return self.sandbox.sandbox_id
-                
-            except Exception as e:
-                last_error = e
-                logger.warning(f"Sandbox creation attempt {attempt + 1} failed: {e}")
-                
-                # Clean up failed sandbox if it exists
-                if self.sandbox:
-                    try:
-                        self.sandbox.kill()
-                    except:
-                        pass
-                    self.sandbox = None
-                
-                # Don't retry on the last attempt
-                if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
-                    logger.info(f"Waiting {wait_time}s before retry...")
-                    time.sleep(wait_time)
-        
-        # All retries failed
-        logger.error(f"Failed to create sandbox after {max_retries} attempts: {last_error}")
-        raise Exception(f"Sandbox creation failed after {max_retries} attempts: {last_error}")
-    
-    def deploy_test_app(self, image: str = "chaoslab-test-app:latest") -> bool:
-        """Deploy Flask test app in sandbox"""
-        if not self.sandbox:
-            raise RuntimeError("Sandbox not created")
-        
-        try:
-            logger.info("Deploying test app in sandbox...")
-            
-            # Install Python and Flask (using sudo for permissions)
-            logger.info("Installing Python and Flask...")
-            self.sandbox.commands.run("sudo apt-get update")
-            self.sandbox.commands.run("sudo apt-get install -y python3 python3-pip curl")
-            
-            # Create Flask app using files.write() API
-            logger.info("Creating Flask app...")
-            self.sandbox.files.write(
-                "/home/user/app.py",
-                self._get_test_app_code()
-            )
-            
-            # Install Flask
-            self.sandbox.commands.run("pip3 install flask --break-system-packages")
-            
-            # Start Flask app in background
-            logger.info("Starting Flask app...")
-            self.sandbox.commands.run(
-                "cd /home/user && nohup python3 app.py > /tmp/flask.log 2>&1 &",
-                background=True
-            )
-            
-            # Wait for app to start
-            time.sleep(5)
-            
-            # Verify app is running
-            try:
-                result = self.sandbox.commands.run("curl -s http://localhost:5000/health")
-                if "healthy" in result.stdout:
-                    logger.info("Test app deployed and verified successfully")
-                else:
-                    logger.warning("App started but health check failed")
-            except Exception as e:
-                logger.warning(f"Health check failed: {e}, but continuing...")
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to deploy test app: {e}")
-            raise
-    
-    def run_chaos_script(self, scenario: str, config: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute chaos script and collect metrics with time-series data"""
-        if not self.sandbox:
-            raise RuntimeError("Sandbox not created")
-        
-        try:
-            logger.info(f"Running chaos scenario: {scenario}")
-            
-            # Get chaos script
-            script = self._get_chaos_script(scenario, config)
-            duration = config.get("duration", 60)
-            
-            # Write script to sandbox using files.write()
-            script_path = f"/tmp/chaos_{scenario}.sh"
-            self.sandbox.files.write(script_path, script)
-            
-            # Make executable
-            self.sandbox.commands.run(f"chmod +x {script_path}")
-            
-            # Create metrics collection script for background monitoring
-            monitor_script = self._create_metrics_monitor_script(duration)
-            self.sandbox.files.write("/tmp/monitor_metrics.sh", monitor_script)
-            self.sandbox.commands.run("chmod +x /tmp/monitor_metrics.sh")
-            
-            # Start metrics monitoring in background
-            logger.info("Starting metrics monitoring...")
-            self.sandbox.commands.run(
-                "bash /tmp/monitor_metrics.sh &",
-                background=True
-            )
-            
-            # Give monitor time to start
-            time.sleep(2)
-            
-            # Run chaos script with extended timeout
-            script_timeout = duration + 30
-            logger.info(f"Executing chaos script (timeout: {script_timeout}s)...")
-            result = self.sandbox.commands.run(
-                f"bash {script_path}",
-                timeout=script_timeout
-            )
-            
-            # Wait a moment for final metrics to be written
-            time.sleep(3)
-            
-            # Collect time-series metrics
-            metrics = self._collect_timeseries_metrics()
-            
-            logger.info("Chaos script completed")
-            return metrics
-            
-        except Exception as e:
-            logger.error(f"Failed to run chaos script: {e}")
-            raise
-    
-    def _create_metrics_monitor_script(self, duration: int) -> str:
-        """Create a script that monitors metrics over time"""
-        return f'''#!/bin/bash
-# Monitor metrics every 5 seconds for the duration of the experiment
-METRICS_FILE="/tmp/metrics_timeseries.csv"
-echo "time_offset,cpu_percent,memory_percent,error_count" > $METRICS_FILE
-
-START_TIME=$(date +%s)
-END_TIME=$((START_TIME + {duration}))
-
-while [ $(date +%s) -lt $END_TIME ]; do
-    CURRENT_TIME=$(date +%s)
-    TIME_OFFSET=$((CURRENT_TIME - START_TIME))
-    
-    # Get CPU usage - try multiple methods for reliability
-    CPU_USAGE=""
-    
-    # Method 1: Try mpstat (most accurate)
-    if command -v mpstat &> /dev/null; then
-        CPU_USAGE=$(mpstat 1 1 2>/dev/null | awk '/Average/ {{print 100 - $NF}}' | head -1)
-    fi
-    
-    # Method 2: Use top with better parsing (fallback)
-    if [ -z "$CPU_USAGE" ] || [ "$CPU_USAGE" = "0.00" ]; then
-        # Run top twice to get accurate reading (first run is often inaccurate)
-        CPU_LINE=$(top -bn2 -d 0.5 2>/dev/null | grep "Cpu(s)" | tail -1)
-        if [ -n "$CPU_LINE" ]; then
-            # Try to extract idle percentage - handle different top formats
-            CPU_IDLE=$(echo "$CPU_LINE" | grep -oP '\\d+\\.\\d+(?=\\s*id)' | head -1)
-            if [ -z "$CPU_IDLE" ]; then
-                # Alternative parsing for different top output format
-                CPU_IDLE=$(echo "$CPU_LINE" | sed -n 's/.*,\\s*\\([0-9.]*\\)\\s*id.*/\\1/p')
-            fi
-            if [ -n "$CPU_IDLE" ]; then
-                CPU_USAGE=$(echo "$CPU_IDLE" | awk '{{printf "%.2f", 100 - $1}}')
-            fi
-        fi
-    fi
-    
-    # Method 3: Use /proc/stat as last resort
-    if [ -z "$CPU_USAGE" ] || [ "$CPU_USAGE" = "0.00" ]; then
-        # Read CPU stats from /proc/stat
-        if [ -f /tmp/cpu_prev ]; then
-            read prev_total prev_idle < /tmp/cpu_prev
-            cpu_line=$(head -1 /proc/stat)
-            cpu_values=($cpu_line)
-            idle=${{cpu_values[4]}}
-            total=0
-            for value in "${{cpu_values[@]:1}}"; do
-                total=$((total + value))
-            done
-            
-            diff_idle=$((idle - prev_idle))
-            diff_total=$((total - prev_total))
-            if [ $diff_total -gt 0 ]; then
-                CPU_USAGE=$(awk "BEGIN {{printf \\"%.2f\\", 100 * (1 - $diff_idle / $diff_total)}}")
-            fi
-            
-            echo "$total $idle" > /tmp/cpu_prev
-        else
-            # First run - initialize
-            cpu_line=$(head -1 /proc/stat)
-            cpu_values=($cpu_line)
-            idle=${{cpu_values[4]}}
-            total=0
-            for value in "${{cpu_values[@]:1}}"; do
-                total=$((total + value))
-            done
-            echo "$total $idle" > /tmp/cpu_prev
-            CPU_USAGE="5.0"
-        fi
-    fi
+# Per-instance summary fields kept for parallel runs
+INSTANCE_SUMMARY_FIELDS = (
+    "cpu_peak", "memory_peak", "error_count", "recovery_time_seconds", "latency_p95", "aborted", "abort_reason"
+)
+
+# Summary fields whose spread across instances is reported
+DISTRIBUTION_FIELDS = ("cpu_peak", "memory_peak", "error_count", "recovery_time_seconds", "latency_p95")
+
+# Application log written by the test app
+APP_LOG_PATH = "/tmp/flask_app.log"
+APP_LOGS_COMMAND = f"cat {APP_LOG_PATH} 2>/dev/null || echo 'No logs'"
+
+# The log is gzipped in the sandbox so only compressed bytes are transferred
+APP_LOG_ARCHIVE = "/tmp/flask_app.log.gz"
+ARCHIVE_APP_LOG_COMMAND = f"gzip -c {APP_LOG_PATH} > {APP_LOG_ARCHIVE}"
+
+# Load generator buckets and summary (empty if it did not run)
+LOADGEN_RESULTS_COMMAND = f"cat {LOADGEN_FILE} 2>/dev/null || true"
+
+# Test app baked into the sandbox template (WORKDIR of test-app/Dockerfile)
+TEMPLATE_APP_PATH = "/app/app.py"
+
+# Test app source deployed into sandboxes without the template
+TEST_APP_SOURCE = Path(__file__).resolve().parents[2] / "test-app" / "app.py"
+
+
+class ExperimentScripts:
+    """
+    Scripts run inside the sandbox and summaries of what they collect
+
+    Shared by E2BManager and AsyncE2BManager; nothing here calls the sandbox.
+    """
     
-    # Ensure CPU_USAGE is not empty and is a valid number
-    if [ -z "$CPU_USAGE" ] || ! [[ "$CPU_USAGE" =~ ^[0-9]+\\.?[0-9]*$ ]]; then
-        CPU_USAGE="5.0"
-    fi
+    def _get_metrics_sampler_code(self) -> str:
+        """Source of the /proc metrics sampler run inside the sandbox"""
+        return METRICS_SAMPLER_SOURCE.read_text()
     
-    # Get memory usage percentage
-    MEM_USAGE=$(free | grep Mem | awk '{{printf "%.2f", ($3/$2) * 100.0}}')
+    def _metrics_sampler_command(self, duration: int, interval: float) -> str:
+        """Command that starts the sampler in the background"""
+        return (
+            f"python3 {METRICS_SAMPLER_PATH} --output {METRICS_FILE} --pid-file {MONITOR_PID_FILE} "
+            f"--duration {duration} --interval {interval} --app-log {APP_LOG_PATH} "
+            f"--phase-file {PHASE_FILE} &"
+        )
     
-    # Count errors in Flask logs so far
-    ERROR_COUNT=$(grep -c "ERROR" /tmp/flask_app.log 2>/dev/null || echo "0")
+    def _get_loadgen_code(self) -> str:
+        """Source of the HTTP load generator run inside the sandbox"""
+        return LOADGEN_SOURCE.read_text()
     
-    # Append to CSV
-    echo "$TIME_OFFSET,$CPU_USAGE,$MEM_USAGE,$ERROR_COUNT" >> $METRICS_FILE
+    @staticmethod
+    def _phase_seconds(config: Dict[str, Any]) -> Tuple[int, int]:
+        """Lengths of the baseline and recovery phases"""
+        phases = {**DEFAULT_PHASES, **{k: v for k, v in (config.get("phases") or {}).items() if v is not None}}
+        return phases["baseline_seconds"], phases["recovery_seconds"]
     
-    sleep 5
-done
-
-# Cleanup
-rm -f /tmp/cpu_prev
-'''
-
-    def _collect_timeseries_metrics(self) -> Dict[str, Any]:
-        """Collect time-series metrics from monitoring script"""
-        if not self.sandbox:
-            raise RuntimeError("Sandbox not created")
+    def _get_phases_script(self, scenario: str, config: Dict[str, Any], script_path: str) -> str:
+        """
+        Script running the experiment phases around the scenario script
         
-        try:
-            # Get Flask app logs
-            logs_result = self.sandbox.commands.run("cat /tmp/flask_app.log 2>/dev/null || echo 'No logs'")
-            logs = logs_result.stdout
-            
-            # Get time-series metrics CSV
-            metrics_csv = self.sandbox.commands.run("cat /tmp/metrics_timeseries.csv 2>/dev/null || echo ''")
-            
-            timeline = []
-            cpu_peak = 0.0
-            memory_peak = 0.0
-            error_count = 0
-            recovery_time = None
-            
-            if metrics_csv.stdout:
-                lines = metrics_csv.stdout.strip().split('\n')
-                # Skip header
-                for line in lines[1:]:
-                    if line.strip():
-                        try:
-                            parts = line.split(',')
-                            # Validate we have all 4 parts before accessing them
-                            if len(parts) < 4:
-                                logger.warning(f"Skipping incomplete metrics line: {line}")
-                                continue
-                            
-                            time_offset = int(parts[0])
-                            cpu = float(parts[1])
-                            memory = float(parts[2])
-                            errors = int(parts[3])
-                            
-                            timeline.append({
-                                "time_offset": time_offset,
-                                "cpu": round(cpu, 2),
-                                "memory": round(memory, 2),
-                                "error_count": errors
-                            })
-                            
-                            # Track peaks
-                            cpu_peak = max(cpu_peak, cpu)
-                            memory_peak = max(memory_peak, memory)
-                            error_count = max(error_count, errors)
-                            
-                            # Calculate recovery time (when CPU/memory drop back to reasonable levels)
-                            if recovery_time is None and time_offset > 10:
-                                if cpu < 30 and memory < 50 and timeline[-1].get('cpu', 100) > 50:
-                                    recovery_time = time_offset
-                        except (IndexError, ValueError) as e:
-                            logger.warning(f"Failed to parse metrics line: {line}, error: {e}")
-                            continue
-            
-            # If no timeline data, create a minimal one
-            if not timeline:
-                logger.warning("No timeline data collected, using minimal fallback")
-                timeline = [
-                    {"time_offset": 0, "cpu": 5.0, "memory": 20.0, "error_count": 0},
-                    {"time_offset": 30, "cpu": 10.0, "memory": 25.0, "error_count": 0}
-                ]
-                cpu_peak = 10.0
-                memory_peak = 25.0
-            
-            # Count actual errors in logs
-            actual_error_count = logs.count("ERROR") + logs.count("Exception")
-            
-            return {
-                "timeline": timeline,
-                "cpu_peak": round(cpu_peak, 2),
-                "memory_peak": round(memory_peak, 2),
-                "error_count": actual_error_count,
-                "recovery_time_seconds": recovery_time,
-                "logs": logs,
-                "timestamp": time.time()
-            }
-            
-        except Exception as e:
-            logger.error(f"Failed to collect timeseries metrics: {e}")
-            return {
-                "timeline": [{"time_offset": 0, "cpu": 0.0, "memory": 0.0, "error_count": 0}],
-                "cpu_peak": 0.0,
-                "memory_peak": 0.0,
-                "error_count": 0,
-                "recovery_time_seconds": None,
-                "logs": str(e),
-                "timestamp": time.time()
-            }
+        The load generator runs throughout: `baseline_seconds` of steady load,
+        then the scenario script injects (and removes) the fault, then
+        `recovery_seconds` of load on the recovered app. Every phase change
+        is written to PHASE_FILE so samples and latency buckets are tagged.
+        """
+        duration = config.get("duration", 60)
+        baseline_seconds, recovery_seconds = self._phase_seconds(config)
+        loadgen = self._loadgen_command(
+            scenario,
+            config,
+            baseline_seconds + duration + recovery_seconds + FAULT_OVERRUN_SECONDS,
+            fault_start=baseline_seconds
+        )
+        return f"""#!/bin/bash
+echo baseline > {PHASE_FILE}
+{loadgen} > /tmp/loadgen.log 2>&1 &
+LOADGEN_PID=$!
+
+echo "Baseline: {baseline_seconds}s of steady load"
+sleep {baseline_seconds}
+
+echo fault > {PHASE_FILE}
+bash {script_path}
+
+echo recovery > {PHASE_FILE}
+echo "Recovery: {recovery_seconds}s of steady load"
+sleep {recovery_seconds}
+
+# TERM lets the load generator write its final bucket and summary
+kill -TERM $LOADGEN_PID 2>/dev/null || true
+wait $LOADGEN_PID 2>/dev/null || true
+"""
     
-    def _collect_metrics(self) -> Dict[str, Any]:
-        """Collect system metrics and logs from sandbox"""
-        if not self.sandbox:
-            raise RuntimeError("Sandbox not created")
+    def _loadgen_command(
+        self,
+        scenario: str,
+        config: Dict[str, Any],
+        duration: float,
+        fault_start: float = 0.0
+    ) -> str:
+        """Command running the load generator for up to `duration` seconds (in the foreground)"""
+        scenario_load = SCENARIO_LOAD.get(scenario, SCENARIO_LOAD["network_delay"])
+        load = config.get("load") or {}
+        mode = load.get("mode", "open")
+        weights = load.get("weights") or scenario_load["weights"]
         
-        try:
-            # Get CPU usage
-            cpu_result = self.sandbox.commands.run("top -bn1 | grep 'Cpu(s)' | awk '{print $2}'")
-            cpu_usage = float(cpu_result.stdout.strip().replace('%', '')) if cpu_result.stdout else 0.0
-            
-            # Get memory usage
-            mem_result = self.sandbox.commands.run("free | grep Mem | awk '{print ($3/$2) * 100.0}'")
-            mem_usage = float(mem_result.stdout.strip()) if mem_result.stdout else 0.0
-            
-            # Get Flask app logs
-            logs_result = self.sandbox.commands.run("cat /tmp/flask_app.log 2>/dev/null || echo 'No logs'")
-            logs = logs_result.stdout
-            
-            # Count errors in logs
-            error_count = logs.count("ERROR") + logs.count("Exception")
-            
-            return {
-                "cpu_usage": cpu_usage,
-                "memory_usage": mem_usage,
-                "logs": logs,
-                "error_count": error_count,
-                "timestamp": time.time()
-            }
-            
-        except Exception as e:
-            logger.error(f"Failed to collect metrics: {e}")
-            return {
-                "cpu_usage": 0.0,
-                "memory_usage": 0.0,
-                "logs": str(e),
-                "error_count": 0,
-                "timestamp": time.time()
-            }
-    
-    def run_parallel_experiments(self, scenario: str, config: Dict[str, Any], num_instances: int) -> Dict[str, Any]:
-        """Run experiments in parallel across multiple E2B sandboxes and average the results"""
-        import concurrent.futures
-        import copy
+        command = (
+            f"python3 {LOADGEN_PATH} --url http://localhost:5000 "
+            f"--endpoints {','.join(f'{path}={weight:g}' for path, weight in weights.items())} "
+            f"--output {LOADGEN_FILE} --pid-file {LOADGEN_PID_FILE} --duration {duration} "
+            f"--mode {mode} --timeout {load.get('timeout', 10.0)} "
+            f"--bucket {load.get('bucket_seconds', 1.0)} --phase-file {PHASE_FILE}"
+        )
+        if mode == "closed":
+            return f"{command} --concurrency {load.get('concurrency', 4)}"
+        
+        if load.get("profile"):
+            profile = load["profile"]
+        elif load.get("rate"):
+            profile = {"rate": load["rate"]}
+        else:
+            profile = scenario_load["profile"]
+        profile = {key: value for key, value in profile.items() if value is not None}
+        if profile.get("shape") == "spike" and "spike_start" not in profile:
+            # Spike in the middle of the fault rather than of the whole run
+            profile["spike_start"] = fault_start + config.get("duration", 60) / 2
+        return f"{command} --profile {shlex.quote(json.dumps(profile))}"
+    
+    @staticmethod
+    def _gunzip_chunks(chunks) -> str:
+        """Decode a gzip stream given as an iterable of byte chunks"""
+        decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        parts = [decompressor.decompress(chunk) for chunk in chunks]
+        parts.append(decompressor.flush())
+        return b"".join(parts).decode(errors="replace")
+    
+    def _summarize_timeseries(
+        self,
+        timeline: List[Dict[str, Any]],
+        logs: str,
+        load_output: str = "",
+        recovery_config: Optional[Dict[str, Any]] = None,
+        start_time: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Peaks, recovery, error count and request latency for a collected run
+
+        `start_time` is the wall-clock time of the timeline's offset 0; the
+        latency buckets are rebased onto it so both streams share one clock.
+        """
+        cpu_peak = max((point["cpu"] for point in timeline), default=0.0)
+        memory_peak = max((point["memory"] for point in timeline), default=0.0)
+        load = self._summarize_load(load_output, start_time)
         
-        logger.info(f"Starting {num_instances} parallel experiments")
+        # Degradation onset and time-to-recover per metric against the baseline phase
+        fault_start = phase_boundaries(timeline).get("fault", 0.0)
+        recovery = RecoveryAnalyzer.from_config(recovery_config, fault_start).analyze(timeline, load["latency_timeline"])
         
-        # Create separate E2B managers for each instance
-        def run_single_instance(instance_num: int) -> Dict[str, Any]:
+        # If no timeline data, create a minimal one
+        if not timeline:
+            logger.warning("No timeline data collected, using minimal fallback")
+            timeline = [
+                {"time_offset": 0, "cpu": 5.0, "memory": 20.0, "error_count": 0},
+                {"time_offset": 30, "cpu": 10.0, "memory": 25.0, "error_count": 0}
+            ]
+            cpu_peak = 10.0
+            memory_peak = 25.0
+        
+        # Per-level record totals counted incrementally by the sampler
+        last_point = timeline[-1]
+        log_levels = {
+            level: last_point[f"{level}_count"]
+            for level in LOG_LEVELS
+            if f"{level}_count" in last_point
+        }
+        
+        return {
+            "timeline": timeline,
+            "cpu_peak": round(cpu_peak, 2),
+            "memory_peak": round(memory_peak, 2),
+            # ERROR and CRITICAL records, tracebacks included in the record they belong to
+            "error_count": log_levels.get("error", 0),
+            "log_levels": log_levels,
+            "recovery_time_seconds": recovery["recovery_time_seconds"],
+            "recovery": recovery,
+            "phases": summarize_phases(timeline, load["load"]),
+            **load,
+            "logs": logs,
+            "timestamp": time.time()
+        }
+    
+    @staticmethod
+    def _summarize_load(output: str, start_time: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Latency buckets, run summary and p95 from the load generator output
+
+        The load generator starts its clock a little after the metrics
+        sampler. With `start_time` (wall-clock time of the timeline's offset
+        0) the bucket offsets are shifted onto the timeline's clock, using
+        the load generator's own recorded start.
+        """
+        buckets = []
+        summary = None
+        load_start = None
+        for line in output.splitlines():
+            if not line.strip():
+                continue
             try:
-                logger.info(f"Instance {instance_num + 1}/{num_instances}: Creating sandbox")
-                instance_manager = E2BManager(self.api_key)
-                instance_manager.create_sandbox()
-                instance_manager.deploy_test_app()
-                
-                logger.info(f"Instance {instance_num + 1}/{num_instances}: Running chaos script")
-                metrics = instance_manager.run_chaos_script(scenario, config)
-                
-                logger.info(f"Instance {instance_num + 1}/{num_instances}: Cleaning up")
-                instance_manager.cleanup()
-                
-                return metrics
-            except Exception as e:
-                logger.error(f"Instance {instance_num + 1}/{num_instances} failed: {e}")
-                return None
-        
-        # Run experiments in parallel
-        all_metrics = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=num_instances) as executor:
-            futures = [executor.submit(run_single_instance, i) for i in range(num_instances)]
-            for future in concurrent.futures.as_completed(futures):
-                result = future.result()
-                if result:
-                    all_metrics.append(result)
+                record = json.loads(line)
+            except ValueError:
+                logger.warning(f"Skipping malformed load generator line: {line[:200]}")
+                continue
+            record_type = record.pop("type", None)
+            if record_type == "summary":
+                summary = record
+            elif record_type == "start":
+                load_start = record.get("start_time")
+            else:
+                buckets.append(record)
         
-        if not all_metrics:
-            raise Exception("All parallel experiments failed")
+        if start_time is not None and load_start is not None:
+            shift = load_start - start_time
+            for bucket in buckets:
+                bucket["time_offset"] = round(bucket["time_offset"] + shift, 3)
+        elif buckets:
+            logger.warning("Load generator and metrics start times unknown; latency offsets are not aligned")
         
-        logger.info(f"Successfully completed {len(all_metrics)}/{num_instances} experiments")
+        latency_p95 = None
+        if summary is None:
+            if output.strip():
+                logger.warning("Load generator did not write a summary")
+        elif summary["requests"] + summary.get("dropped", 0) - summary["status"].get("connect_error", 0) > 0:
+            latency_p95 = summary["latency_ms"]["p95"]
         
-        # Average the metrics
-        return self._average_metrics(all_metrics)
+        return {
+            "latency_p95": latency_p95,
+            "latency_timeline": buckets,
+            "load": summary
+        }
+    
+    @staticmethod
+    def _failed_timeseries(timeline: List[Dict[str, Any]], error: Exception) -> Dict[str, Any]:
+        """Metrics of a run whose results could not be collected, keeping any live timeline"""
+        return {
+            "timeline": timeline or [{"time_offset": 0, "cpu": 0.0, "memory": 0.0, "error_count": 0}],
+            "cpu_peak": 0.0,
+            "memory_peak": 0.0,
+            "error_count": 0,
+            "recovery_time_seconds": None,
+            "latency_p95": None,
+            "logs": str(error),
+            "timestamp": time.time()
+        }
     
-    def _average_metrics(self, all_metrics: list) -> Dict[str, Any]:
+    def _average_metrics(
+        self,
+        all_metrics: list,
+        recovery_config: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """Average metrics from multiple experiment runs"""
         if not all_metrics:
             return {}
         
-        # Get the longest timeline
-        max_timeline_length = max(len(m.get("timeline", [])) for m in all_metrics)
+        # Align the instances' timelines in time rather than by sample index
+        averaged_timeline = resample_timelines([m.get("timeline", []) for m in all_metrics])
+        latency_timeline = combine_latency_timelines([m.get("latency_timeline") or [] for m in all_metrics])
         
-        # Average timeline data point by point
-        averaged_timeline = []
-        for i in range(max_timeline_length):
-            time_offset = None
-            cpu_values = []
-            memory_values = []
-            error_values = []
-            
-            for metrics in all_metrics:
-                timeline = metrics.get("timeline", [])
-                if i < len(timeline):
-                    point = timeline[i]
-                    if time_offset is None:
-                        time_offset = point.get("time_offset", i * 5)
-                    cpu_values.append(point.get("cpu", 0))
-                    memory_values.append(point.get("memory", 0))
-                    error_values.append(point.get("error_count", 0))
-            
-            if cpu_values:
-                averaged_timeline.append({
-                    "time_offset": time_offset,
-                    "cpu": round(sum(cpu_values) / len(cpu_values), 2),
-                    "memory": round(sum(memory_values) / len(memory_values), 2),
-                    "error_count": round(sum(error_values) / len(error_values))
-                })
-        
-        # Average peak values
-        cpu_peaks = [m.get("cpu_peak", 0) for m in all_metrics]
-        memory_peaks = [m.get("memory_peak", 0) for m in all_metrics]
-        error_counts = [m.get("error_count", 0) for m in all_metrics]
+        # Recovery of the combined run (the per-instance spread is in `distribution`)
+        fault_start = phase_boundaries(averaged_timeline).get("fault", 0.0)
+        recovery = RecoveryAnalyzer.from_config(recovery_config, fault_start).analyze(averaged_timeline, latency_timeline)
+        
+        # Per-instance results with their own (columnar) series
+        instances = []
+        for i, metrics in enumerate(all_metrics):
+            instance = {"instance": metrics.get("instance", i + 1)}
+            instance.update({field: metrics.get(field) for field in INSTANCE_SUMMARY_FIELDS})
+            instance["series"] = to_columnar(metrics.get("timeline", []))
+            instances.append(instance)
+        
+        # Spread of the headline metrics across instances
+        distributions = {
+            field: distribution([instance[field] for instance in instances])
+            for field in DISTRIBUTION_FIELDS
+        }
         
         # Combine logs
         combined_logs = "\n\n=== COMBINED LOGS FROM ALL INSTANCES ===\n\n"
-        for i, metrics in enumerate(all_metrics):
-            combined_logs += f"\n--- Instance {i + 1} ---\n"
-            combined_logs += metrics.get("logs", "")[:500]  # Limit log size
+        for instance, metrics in zip(instances, all_metrics):
+            combined_logs += f"\n--- Instance {instance['instance']} ---\n"
+            combined_logs += metrics.get("logs", "")
+        
+        def mean(field: str, digits: Optional[int] = 2):
+            stats = distributions[field]
+            return round(stats["mean"], digits) if stats else None
         
         return {
             "timeline": averaged_timeline,
-            "cpu_peak": round(sum(cpu_peaks) / len(cpu_peaks), 2),
-            "memory_peak": round(sum(memory_peaks) / len(memory_peaks), 2),
-            "error_count": round(sum(error_counts) / len(error_counts)),
-            "recovery_time_seconds": None,  # Average recovery time doesn't make sense
+            "cpu_peak": mean("cpu_peak"),
+            "memory_peak": mean("memory_peak"),
+            "error_count": mean("error_count", None),
+            # The typical instance's recovery; the spread is in `distribution`
+            "recovery_time_seconds": distributions["recovery_time_seconds"]["p50"] if distributions["recovery_time_seconds"] else None,
+            "latency_p95": mean("latency_p95"),
+            "latency_timeline": latency_timeline,
+            "recovery": recovery,
+            "instances": instances,
+            "distribution": distributions,
+            "phases": combine_phases([m.get("phases") for m in all_metrics]),
             "logs": combined_logs,
             "timestamp": all_metrics[0].get("timestamp"),
             "num_instances": len(all_metrics)
         }
     
-    def cleanup(self):
-        """Destroy sandbox and cleanup resources"""
-        if self.sandbox:
-            try:
-                logger.info(f"Destroying sandbox: {self.sandbox.sandbox_id}")
-                self.sandbox.kill()  # Use kill() for code interpreter SDK
-                self.sandbox = None
-                logger.info("Sandbox destroyed successfully")
-            except Exception as e:
-                logger.error(f"Failed to destroy sandbox: {e}")
-    
     def _get_test_app_code(self) -> str:
-        """Get Flask test app code"""
+        """Get Flask test app code (same app as the sandbox template)"""
+        try:
+            return TEST_APP_SOURCE.read_text()
+        except OSError as e:
+            logger.warning(f"Could not read {TEST_APP_SOURCE}: {e}, using minimal app")
+        
         return """
 from flask import Flask, jsonify
 import time
@@ -554,17 +454,8 @@ echo "Starting network delay chaos..."
 # Add network latency (requires root, may fail in some sandboxes)
 tc qdisc add dev eth0 root netem delay 300ms 2>/dev/null || echo "Network delay simulation skipped (requires root)"
 
-# Make concurrent requests to test app to generate load
-for i in {{1..{duration}}}; do
-    # Make 3 concurrent requests to generate CPU load
-    curl -s http://localhost:5000/api/data > /dev/null &
-    curl -s http://localhost:5000/api/heavy > /dev/null &
-    curl -s http://localhost:5000/api/data > /dev/null &
-    sleep 1
-done
-
-# Wait for background jobs to complete
-wait
+# Hold the delay while the load generator measures request latency
+sleep {duration}
 
 # Remove network delay
 tc qdisc del dev eth0 root netem 2>/dev/null || true
@@ -667,14 +558,8 @@ MEMORY_PID=$!
 # Give it time to allocate memory (faster now - just 3 seconds)
 sleep 3
 
-# Make requests while under memory pressure
-for i in {{1..{duration}}}; do
-    curl -s http://localhost:5000/api/data > /dev/null &
-    curl -s http://localhost:5000/api/heavy > /dev/null &
-    # Also hit memory endpoint to add more pressure
-    curl -s http://localhost:5000/api/memory > /dev/null &
-    sleep 1
-done
+# Hold the pressure while the load generator hits the app (including the memory endpoint)
+sleep {duration}
 
 # Kill memory hog (don't wait for it to finish naturally)
 kill $MEMORY_PID 2>/dev/null || true
@@ -777,14 +662,10 @@ sleep 10
 echo "=== Disk Usage After Initial Fill ==="
 df -h /tmp
 
-# Make requests while disk is full
+# Keep writing while disk is full and the load generator hits the app
 for i in {{1..{duration}}}; do
-    curl -s http://localhost:5000/api/data > /dev/null &
-    curl -s http://localhost:5000/api/heavy > /dev/null &
-    
     # Try to write logs (will fail when disk is full)
     echo "Test log entry $i" >> /tmp/test_writes.log 2>/dev/null || true
-    
     sleep 1
 done
 
@@ -808,22 +689,8 @@ echo "Disk full chaos completed"
             "process_kill": f"""#!/bin/bash
 echo "Starting process kill chaos..."
 
-# Make requests and periodically stress the system
-for i in {{1..{duration}}}; do
-    # Every 15 seconds, create CPU spike
-    if [ $((i % 15)) -eq 0 ]; then
-        # Create CPU load burst
-        for j in {{1..5}}; do
-            curl -s http://localhost:5000/api/heavy > /dev/null &
-        done
-    fi
-    
-    curl -s http://localhost:5000/api/data > /dev/null &
-    sleep 1
-done
-
-# Wait for background jobs
-wait
+# The load profile spikes CPU-heavy requests in the middle of this phase
+sleep {duration}
 
 echo "Process kill chaos completed"
 """,
@@ -833,21 +700,164 @@ echo "Starting dependency failure chaos..."
 # Block DNS temporarily (requires root, may fail)
 echo "127.0.0.1 fake-database.local" >> /etc/hosts 2>/dev/null || true
 
-# Make requests with some CPU load
-for i in {{1..{duration}}}; do
-    curl -s http://localhost:5000/api/data > /dev/null &
-    # Every 10 seconds, add heavy load
-    if [ $((i % 10)) -eq 0 ]; then
-        curl -s http://localhost:5000/api/heavy > /dev/null &
-    fi
-    sleep 1
-done
-
-# Wait for background jobs
-wait
+# Hold the broken dependency while the load generator hits the app
+sleep {duration}
 
 echo "Dependency failure chaos completed"
 """
         }
         
         return scripts.get(scenario, scripts["network_delay"])
+
+
+class E2BManager(ExperimentScripts):
+    """
+    Manages E2B sandbox lifecycle with the synchronous SDK
+
+    Provisions sandboxes (create, deploy, health, timeout) for the warm
+    pool's worker threads. Experiments run through AsyncE2BManager, its
+    async sibling; both build the pipeline from ExperimentScripts.
+    """
+    
+    def __init__(self, api_key: str, backend: Optional[SandboxBackend] = None):
+        """
+        Args:
+            api_key: E2B API key
+            backend: Sandbox backend; defaults to remote E2B sandboxes
+        """
+        self.api_key = api_key
+        self.backend = backend or E2BSandboxBackend(api_key)
+        self.sandbox = None  # Sandbox handle created by self.backend
+        
+    def create_sandbox(self, max_retries: int = 3) -> str:
+        """Create a new E2B sandbox with retry logic"""
+        last_error = None
+        
+        for attempt in range(max_retries):
+            try:
+                logger.info(f"Creating {self.backend.name} sandbox... (attempt {attempt + 1}/{max_retries})")
+                
+                self.sandbox = self.backend.create(
+                    timeout=120  # Timeout in seconds for code interpreter
+                )
+                logger.info(f"Sandbox created successfully: {self.sandbox.sandbox_id}")
+                return self.sandbox.sandbox_id
+                
+            except Exception as e:
+                last_error = e
+                logger.warning(f"Sandbox creation attempt {attempt + 1} failed: {e}")
+                
+                # Clean up failed sandbox if it exists
+                if self.sandbox:
+                    try:
+                        self.sandbox.kill()
+                    except:
+                        pass
+                    self.sandbox = None
+                
+                # Don't retry on the last attempt
+                if attempt < max_retries - 1:
+                    wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
+                    logger.info(f"Waiting {wait_time}s before retry...")
+                    time.sleep(wait_time)
+        
+        # All retries failed
+        logger.error(f"Failed to create sandbox after {max_retries} attempts: {last_error}")
+        raise Exception(f"Sandbox creation failed after {max_retries} attempts: {last_error}")
+    
+    def deploy_test_app(self) -> bool:
+        """Deploy Flask test app in sandbox"""
+        if not self.sandbox:
+            raise RuntimeError("Sandbox not created")
+        
+        try:
+            if self._has_prebaked_app():
+                # Template already contains dependencies and the app
+                logger.info("Starting prebaked test app from template...")
+                self.sandbox.commands.run(
+                    f"cd {os.path.dirname(TEMPLATE_APP_PATH)} && nohup python3 app.py > /tmp/flask.log 2>&1 &",
+                    background=True
+                )
+                if wait_for_http_ready(self.sandbox, timeout=30):
+                    logger.info("Test app deployed and verified successfully")
+                else:
+                    logger.warning("App started but health check failed, but continuing...")
+                return True
+            
+            logger.info("Deploying test app in sandbox...")
+            
+            if self.backend.requires_provisioning:
+                # Install Python and Flask (using sudo for permissions)
+                logger.info("Installing Python and Flask...")
+                self.sandbox.commands.run("sudo apt-get update")
+                self.sandbox.commands.run("sudo apt-get install -y python3 python3-pip curl")
+            
+            # Create Flask app using files.write() API
+            logger.info("Creating Flask app...")
+            self.sandbox.files.write(
+                "/home/user/app.py",
+                self._get_test_app_code()
+            )
+            
+            if self.backend.requires_provisioning:
+                # Install Flask
+                self.sandbox.commands.run("pip3 install flask --break-system-packages")
+            
+            # Start Flask app in background
+            logger.info("Starting Flask app...")
+            self.sandbox.commands.run(
+                "cd /home/user && nohup python3 app.py > /tmp/flask.log 2>&1 &",
+                background=True
+            )
+            
+            # Wait for app to answer /health
+            if wait_for_http_ready(self.sandbox, timeout=30):
+                logger.info("Test app deployed and verified successfully")
+            else:
+                logger.warning("App started but health check failed, but continuing...")
+            
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to deploy test app: {e}")
+            raise
+    
+    def _has_prebaked_app(self) -> bool:
+        """Whether the sandbox was created from the prebaked test app template"""
+        if not getattr(self.backend, "template_id", None):
+            return False
+        try:
+            return check_condition(self.sandbox, f"[ -f {TEMPLATE_APP_PATH} ]")
+        except Exception as e:
+            logger.warning(f"Could not check for prebaked app: {e}")
+            return False
+    
+    def check_health(self) -> bool:
+        """Check that the sandbox is alive and the test app answers /health"""
+        if not self.sandbox:
+            return False
+        
+        try:
+            result = self.sandbox.commands.run("curl -s http://localhost:5000/health", timeout=10)
+            return "healthy" in result.stdout
+        except Exception as e:
+            logger.warning(f"Health check failed: {e}")
+            return False
+    
+    def extend_timeout(self, seconds: int):
+        """Keep the sandbox alive for at least `seconds` from now"""
+        if not self.sandbox:
+            raise RuntimeError("Sandbox not created")
+        
+        self.sandbox.set_timeout(seconds)
+    
+    def cleanup(self):
+        """Destroy sandbox and cleanup resources"""
+        if self.sandbox:
+            try:
+                logger.info(f"Destroying sandbox: {self.sandbox.sandbox_id}")
+                self.sandbox.kill()  # Use kill() for code interpreter SDK
+                self.sandbox = None
+                logger.info("Sandbox destroyed successfully")
+            except Exception as e:
+                logger.error(f"Failed to destroy sandbox: {e}")
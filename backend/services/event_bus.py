@@ -0,0 +1,210 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Subscription:
+    """A subscriber's queue; `overflowed` is set when an event had to be dropped"""
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+
+class ExperimentEventBus:
+    """
+    Fans out experiment progress events to live subscribers (SSE streams)
+
+    Events are published by the experiment pipelines, which run as tasks on
+    the server event loop (publish() is also safe from other threads), and
+    delivered to asyncio queues on that loop. Every event gets the experiment's next
+    sequence number, which the SSE stream sends as its id. Each experiment
+    keeps a bounded history so viewers that connect or reconnect (with
+    Last-Event-ID) receive the events they missed; histories of finished
+    experiments are kept for the last `closed_retention` experiments.
+
+    When the events a viewer missed are no longer all in the history (or
+    the experiment is unknown, e.g. after a restart), the viewer gets a
+    single `reset` event built by the caller's `snapshot` instead, so it
+    knows to replace its state rather than silently miss events. Snapshots
+    are awaited outside the bus's lock, so they may read the database.
+    """
+
+    def __init__(self, history_size: int = 1000, queue_size: int = 1000, closed_retention: int = 256):
+        self.history_size = history_size
+        self.queue_size = queue_size
+        self.closed_retention = closed_retention
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Dict[str, List[_Subscription]] = {}
+        self._history: Dict[str, Deque[Tuple[int, str, Dict[str, Any]]]] = {}
+        self._sequence: Dict[str, int] = {}
+        self._closed: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        """Set the event loop subscribers are served on"""
+        self._loop = loop
+
+    def publish(self, experiment_id: str, event_type: str, data: Dict[str, Any]):
+        """Publish an event (safe to call from any thread)"""
+        with self._lock:
+            event = (self._next_sequence(experiment_id), event_type, data)
+            self._history.setdefault(experiment_id, deque(maxlen=self.history_size)).append(event)
+            subscriptions = list(self._subscribers.get(experiment_id, []))
+
+        if subscriptions and self._loop:
+            self._loop.call_soon_threadsafe(self._deliver, subscriptions, event)
+
+    def close(self, experiment_id: str):
+        """Signal end of stream to subscribers; the history is kept for late viewers"""
+        with self._lock:
+            subscriptions = list(self._subscribers.get(experiment_id, []))
+            self._mark_closed(experiment_id)
+
+        if subscriptions and self._loop:
+            self._loop.call_soon_threadsafe(self._deliver, subscriptions, None)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    async def subscribe(
+        self,
+        experiment_id: str,
+        last_event_id: int = 0,
+        heartbeat: float = 15,
+        snapshot: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None,
+        finished: bool = False
+    ) -> AsyncIterator[Optional[Tuple[int, str, Dict[str, Any]]]]:
+        """
+        Yield past events newer than `last_event_id`, then live events until close()
+
+        If events after `last_event_id` were evicted from the history, or
+        the bus does not know the experiment although the viewer has seen
+        events of it (or it is `finished`), a `reset` event with
+        the awaited `snapshot()` as data replaces them. The reset's id is
+        taken before the snapshot is read, so live events after it are still
+        delivered (the snapshot may already include some of them). The same
+        happens when this viewer's queue overflowed. Yields None when no event arrived for
+        `heartbeat` seconds so the caller can send keepalives and check for
+        disconnects. Returns at once for experiments that already finished.
+        """
+        subscription = _Subscription(self.queue_size)
+        with self._lock:
+            backlog = self._catch_up(experiment_id, last_event_id, snapshot, finished)
+            ended = experiment_id in self._closed
+            if not ended:
+                self._subscribers.setdefault(experiment_id, []).append(subscription)
+
+        try:
+            backlog = await self._with_snapshot(backlog, snapshot)
+            last_sequence = last_event_id
+            for event in backlog:
+                last_sequence = event[0]
+                yield event
+            if ended:
+                return
+
+            while True:
+                if subscription.overflowed:
+                    # Events were dropped for this viewer: catch up from the history
+                    with self._lock:
+                        subscription.overflowed = False
+                        while not subscription.queue.empty():
+                            subscription.queue.get_nowait()
+                        missed = self._catch_up(experiment_id, last_sequence, snapshot, False)
+                        ended = experiment_id in self._closed
+                    missed = await self._with_snapshot(missed, snapshot)
+                    for event in missed:
+                        last_sequence = event[0]
+                        yield event
+                    if ended:
+                        return
+                    continue
+
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event is None:
+                    return
+                # Skip events already sent as part of the backlog
+                if event[0] <= last_sequence:
+                    continue
+                last_sequence = event[0]
+                yield event
+        finally:
+            with self._lock:
+                subscriptions = self._subscribers.get(experiment_id, [])
+                if subscription in subscriptions:
+                    subscriptions.remove(subscription)
+                if not subscriptions:
+                    self._subscribers.pop(experiment_id, None)
+
+    def _next_sequence(self, experiment_id: str, after: int = 0) -> int:
+        """Next event id of an experiment, above `after` (caller holds the lock)"""
+        sequence = max(self._sequence.get(experiment_id, 0), after) + 1
+        self._sequence[experiment_id] = sequence
+        return sequence
+
+    def _mark_closed(self, experiment_id: str):
+        """Remember a finished experiment, forgetting the oldest beyond closed_retention (caller holds the lock)"""
+        self._closed[experiment_id] = None
+        self._closed.move_to_end(experiment_id)
+        while len(self._closed) > self.closed_retention:
+            evicted, _ = self._closed.popitem(last=False)
+            self._history.pop(evicted, None)
+            self._sequence.pop(evicted, None)
+
+    def _catch_up(
+        self,
+        experiment_id: str,
+        after: int,
+        snapshot: Optional[Callable[[], Awaitable[Dict[str, Any]]]],
+        finished: bool
+    ) -> List[Tuple[int, str, Optional[Dict[str, Any]]]]:
+        """
+        Events a viewer that has seen up to `after` needs next (caller holds the lock)
+
+        A reset is returned without data; _with_snapshot fills it in once the lock is released.
+        """
+        history = self._history.get(experiment_id) or []
+        known = experiment_id in self._sequence
+        evicted = bool(history) and history[0][0] > after + 1
+        unknown = not known and (after > 0 or finished)
+        if snapshot and (evicted or unknown):
+            if unknown and finished:
+                self._mark_closed(experiment_id)
+            return [(self._next_sequence(experiment_id, after), "reset", None)]
+        return [event for event in history if event[0] > after]
+
+    @staticmethod
+    async def _with_snapshot(
+        events: List[Tuple[int, str, Optional[Dict[str, Any]]]],
+        snapshot: Optional[Callable[[], Awaitable[Dict[str, Any]]]]
+    ) -> List[Tuple[int, str, Dict[str, Any]]]:
+        """Events with the data of a reset event taken from `snapshot`"""
+        if events and events[0][1] == "reset" and events[0][2] is None:
+            return [(events[0][0], "reset", await snapshot())]
+        return events
+
+    @staticmethod
+    def _deliver(subscriptions: List[_Subscription], event):
+        for subscription in subscriptions:
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow viewer: drop the event rather than block the pipeline; it catches up later
+                subscription.overflowed = True
+                logger.warning("Dropping event for slow subscriber")
+
+
+def format_sse(sequence: int, event_type: str, data: Dict[str, Any]) -> str:
+    """Encode an event in Server-Sent Events wire format"""
+    return f"id: {sequence}\nevent: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
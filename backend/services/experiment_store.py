@@ -0,0 +1,524 @@
+import gzip
+import json
+import logging
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence
+
+from services.log_index import build_blocks, block_may_match, line_matches, parse_lines
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS experiments (
+    id TEXT PRIMARY KEY,
+    scenario TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    config TEXT,
+    sandbox_id TEXT,
+    num_instances INTEGER,
+    grafana_url TEXT,
+    error TEXT,
+    raw_metrics TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_experiments_status ON experiments(status);
+CREATE INDEX IF NOT EXISTS idx_experiments_created_at ON experiments(created_at);
+
+CREATE TABLE IF NOT EXISTS timeline_points (
+    experiment_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    time_offset REAL NOT NULL,
+    cpu REAL,
+    memory REAL,
+    error_count INTEGER,
+    extra TEXT,
+    PRIMARY KEY (experiment_id, seq)
+);
+
+CREATE TABLE IF NOT EXISTS analysis (
+    experiment_id TEXT PRIMARY KEY,
+    summary TEXT,
+    severity TEXT,
+    metrics TEXT,
+    recommendations TEXT,
+    timeline TEXT,
+    prompt TEXT,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS instance_results (
+    experiment_id TEXT NOT NULL,
+    instance INTEGER NOT NULL,
+    summary TEXT,
+    series BLOB,
+    PRIMARY KEY (experiment_id, instance)
+);
+
+-- Plain-text logs of experiments stored before log_blocks existed
+CREATE TABLE IF NOT EXISTS experiment_logs (
+    experiment_id TEXT PRIMARY KEY,
+    logs TEXT
+);
+
+-- Logs in gzip blocks of consecutive lines; the other columns index each block
+CREATE TABLE IF NOT EXISTS log_blocks (
+    experiment_id TEXT NOT NULL,
+    block INTEGER NOT NULL,
+    first_line INTEGER NOT NULL,
+    line_count INTEGER NOT NULL,
+    context_time TEXT,
+    context_level TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    levels TEXT,
+    data BLOB NOT NULL,
+    PRIMARY KEY (experiment_id, block)
+);
+CREATE INDEX IF NOT EXISTS idx_log_blocks_first_line ON log_blocks(experiment_id, first_line);
+"""
+
+# Experiment columns that update() may set
+UPDATABLE_FIELDS = ("status", "progress", "sandbox_id", "num_instances", "grafana_url", "error")
+
+# Metrics stored in their own tables rather than in experiments.raw_metrics
+DETACHED_METRICS = ("timeline", "logs", "instances")
+
+# Timeline fields stored in their own columns; anything else goes to `extra`
+TIMELINE_COLUMNS = ("time_offset", "cpu", "memory", "error_count")
+
+# log_blocks columns read to plan a query (everything but the data)
+LOG_BLOCK_COLUMNS = (
+    "block", "first_line", "line_count", "context_time", "context_level", "start_time", "end_time", "levels"
+)
+
+
+class ExperimentStore:
+    """
+    Persistent experiment storage backed by SQLite (WAL mode)
+
+    Experiment records are cached in a bounded LRU so status polling is served
+    from memory; timelines, analyses and logs live only in the database and
+    are read on demand. All methods are thread-safe.
+    """
+
+    def __init__(self, db_path: str, cache_size: int = 256):
+        """
+        Initialize experiment store
+
+        Args:
+            db_path: SQLite database file (created if missing)
+            cache_size: Number of experiment records kept in memory
+        """
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        self._conn.commit()
+        logger.info(f"Experiment store opened at {db_path}")
+
+    def _migrate(self):
+        """Add the columns that databases created by earlier versions lack"""
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(analysis)")}
+        if "prompt" not in columns:
+            self._conn.execute("ALTER TABLE analysis ADD COLUMN prompt TEXT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # Experiment records
+
+    def create(self, experiment_id: str, scenario: str, config: Dict[str, Any], status: str):
+        """Insert a new experiment record"""
+        now = datetime.now()
+        record = {
+            "id": experiment_id,
+            "scenario": scenario,
+            "config": config,
+            "status": status,
+            "progress": 0,
+            "sandbox_id": None,
+            "num_instances": None,
+            "grafana_url": None,
+            "error": None,
+            "raw_metrics": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO experiments (id, scenario, status, progress, config, created_at, updated_at) "
+                "VALUES (?, ?, ?, 0, ?, ?, ?)",
+                (experiment_id, scenario, status, json.dumps(config), now.isoformat(), now.isoformat())
+            )
+            self._conn.commit()
+            self._cache_put(record)
+        return dict(record)
+
+    def update(self, experiment_id: str, **fields):
+        """Update experiment columns (see UPDATABLE_FIELDS)"""
+        unknown = set(fields) - set(UPDATABLE_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot update experiment fields: {sorted(unknown)}")
+        if not fields:
+            return
+
+        now = datetime.now()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE experiments SET {columns}, updated_at = ? WHERE id = ?",
+                (*fields.values(), now.isoformat(), experiment_id)
+            )
+            self._conn.commit()
+            record = self._cache.get(experiment_id)
+            if record:
+                record.update(fields)
+                record["updated_at"] = now
+
+    def get(self, experiment_id: str) -> Optional[Dict[str, Any]]:
+        """Get an experiment record (without timeline, analysis or logs)"""
+        with self._lock:
+            record = self._cache.get(experiment_id)
+            if record:
+                self._cache.move_to_end(experiment_id)
+                return dict(record)
+
+            row = self._conn.execute("SELECT * FROM experiments WHERE id = ?", (experiment_id,)).fetchone()
+            if not row:
+                return None
+            record = self._row_to_record(row)
+            self._cache_put(record)
+            return dict(record)
+
+    def list_experiments(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent experiments first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM experiments ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._row_to_record(row) for row in rows]
+
+    def fail_incomplete(self, reason: str, statuses: List[str]) -> int:
+        """Mark experiments left in `statuses` (e.g. by a restart) as failed"""
+        placeholders = ", ".join("?" for _ in statuses)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE experiments SET status = 'failed', error = ?, updated_at = ? "
+                f"WHERE status IN ({placeholders})",
+                (reason, datetime.now().isoformat(), *statuses)
+            )
+            self._conn.commit()
+            self._cache.clear()
+        return cursor.rowcount
+
+    # Metrics, timeline and logs
+
+    def save_metrics(self, experiment_id: str, metrics: Dict[str, Any]):
+        """Store collected metrics: timeline, logs and per-instance results go to their own tables"""
+        summary = {k: v for k, v in metrics.items() if k not in DETACHED_METRICS}
+        with self._lock:
+            self._conn.execute(
+                "UPDATE experiments SET raw_metrics = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(summary, default=str), datetime.now().isoformat(), experiment_id)
+            )
+            self._replace_timeline(experiment_id, metrics.get("timeline", []))
+            self._replace_instances(experiment_id, metrics.get("instances") or [])
+            self._replace_logs(experiment_id, metrics.get("logs") or "")
+            self._conn.commit()
+            record = self._cache.get(experiment_id)
+            if record:
+                record["raw_metrics"] = summary
+
+    def append_timeline_points(self, experiment_id: str, points: List[Dict[str, Any]]):
+        """Append a batch of live samples to the experiment timeline in one transaction"""
+        if not points:
+            return
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(MAX(seq), -1) + 1 FROM timeline_points WHERE experiment_id = ?",
+                (experiment_id,)
+            ).fetchone()
+            self._insert_points(experiment_id, points, start_seq=row[0])
+            self._conn.commit()
+
+    def get_timeline(self, experiment_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM timeline_points WHERE experiment_id = ? ORDER BY seq",
+                (experiment_id,)
+            ).fetchall()
+        timeline = []
+        for row in rows:
+            point = {column: row[column] for column in TIMELINE_COLUMNS}
+            if point["time_offset"] is not None and float(point["time_offset"]).is_integer():
+                point["time_offset"] = int(point["time_offset"])
+            if row["extra"]:
+                point.update(json.loads(row["extra"]))
+            timeline.append(point)
+        return timeline
+
+    def get_logs(self, experiment_id: str) -> Optional[str]:
+        """Full application logs (None if none were stored)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM log_blocks WHERE experiment_id = ? ORDER BY block", (experiment_id,)
+            ).fetchall()
+            if rows:
+                return "".join(gzip.decompress(row["data"]).decode(errors="replace") for row in rows)
+            row = self._conn.execute(
+                "SELECT logs FROM experiment_logs WHERE experiment_id = ?", (experiment_id,)
+            ).fetchone()
+        return row["logs"] if row else None
+
+    def query_logs(
+        self,
+        experiment_id: str,
+        offset: int = 0,
+        limit: int = 500,
+        levels: Optional[Sequence[str]] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        search: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Log lines matching the filters, starting at line number `offset`
+
+        The block holding `offset` is found through the line index, and blocks
+        whose level counts or time range rule them out are skipped without
+        being read, so only candidate blocks are decompressed. Returns up to
+        `limit` lines ({line, time, level, text}), the log's `total_lines`
+        and `next_offset`, the line to continue scanning from (None once the
+        end of the logs is reached). Returns None if no metrics were saved for
+        the experiment; empty logs give an empty page.
+        """
+        search = search.lower() if search else None
+        with self._lock:
+            # Seek: the last block starting at or before `offset` (via idx_log_blocks_first_line)
+            start = self._conn.execute(
+                "SELECT MAX(block), (SELECT MAX(first_line + line_count) FROM log_blocks WHERE experiment_id = ?) "
+                "FROM log_blocks WHERE experiment_id = ? AND first_line <= ?",
+                (experiment_id, experiment_id, offset)
+            ).fetchone()
+            if start[1] is None:
+                if self._migrate_legacy_logs(experiment_id):
+                    return self.query_logs(experiment_id, offset, limit, levels, since, until, search)
+                # Saved metrics with empty logs store no blocks
+                if not self._metrics_saved(experiment_id):
+                    return None
+                return {"total_lines": 0, "offset": offset, "lines": [], "next_offset": None}
+            block_start, total = start
+            blocks = self._conn.execute(
+                f"SELECT {', '.join(LOG_BLOCK_COLUMNS)} FROM log_blocks "
+                "WHERE experiment_id = ? AND block >= ? ORDER BY block",
+                (experiment_id, block_start or 0)
+            ).fetchall()
+
+        lines: List[Dict[str, Any]] = []
+        next_offset = None
+        for row in blocks:
+            block = {**dict(row), "levels": json.loads(row["levels"] or "{}")}
+            if not block_may_match(block, levels, since, until):
+                continue
+            text = gzip.decompress(self._log_block_data(experiment_id, block["block"])).decode(errors="replace")
+            block_lines = text.split("\n")[:block["line_count"]]
+            parsed = parse_lines(block_lines, block["context_time"], block["context_level"])
+            for number, (line, (time, level)) in enumerate(zip(block_lines, parsed), start=block["first_line"]):
+                if number < offset or not line_matches(line, time, level, levels, since, until, search):
+                    continue
+                lines.append({"line": number, "time": time, "level": level, "text": line})
+                if len(lines) == limit:
+                    next_offset = number + 1 if number + 1 < total else None
+                    break
+            if next_offset is not None:
+                break
+
+        return {"total_lines": total, "offset": offset, "lines": lines, "next_offset": next_offset}
+
+    def get_instances(
+        self,
+        experiment_id: str,
+        include_series: bool = False,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Per-instance results of a parallel run, ordered by instance number
+
+        Series are columnar ({field: [values]}) and only decoded when
+        `include_series` is set; `fields` limits them to some columns.
+        """
+        columns = "instance, summary, series" if include_series else "instance, summary"
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {columns} FROM instance_results WHERE experiment_id = ? ORDER BY instance",
+                (experiment_id,)
+            ).fetchall()
+
+        instances = []
+        for row in rows:
+            instance = {"instance": row["instance"], **json.loads(row["summary"] or "{}")}
+            if include_series:
+                series = json.loads(zlib.decompress(row["series"])) if row["series"] else {}
+                if fields:
+                    series = {k: v for k, v in series.items() if k == "time_offset" or k in fields}
+                instance["series"] = series
+            instances.append(instance)
+        return instances
+
+    # Analysis
+
+    def save_analysis(self, experiment_id: str, analysis: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analysis "
+                "(experiment_id, summary, severity, metrics, recommendations, timeline, prompt, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    experiment_id,
+                    analysis.get("summary"),
+                    analysis.get("severity"),
+                    json.dumps(analysis.get("metrics", {}), default=str),
+                    json.dumps(analysis.get("recommendations", []), default=str),
+                    json.dumps(analysis.get("timeline", []), default=str),
+                    json.dumps(analysis.get("prompt"), default=str),
+                    datetime.now().isoformat()
+                )
+            )
+            self._conn.commit()
+
+    def get_analysis(self, experiment_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM analysis WHERE experiment_id = ?", (experiment_id,)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            "summary": row["summary"],
+            "severity": row["severity"],
+            "metrics": json.loads(row["metrics"] or "{}"),
+            "recommendations": json.loads(row["recommendations"] or "[]"),
+            "timeline": json.loads(row["timeline"] or "[]"),
+            "prompt": json.loads(row["prompt"] or "null")
+        }
+
+    # Internals
+
+    def _replace_timeline(self, experiment_id: str, timeline: List[Dict[str, Any]]):
+        self._conn.execute("DELETE FROM timeline_points WHERE experiment_id = ?", (experiment_id,))
+        self._insert_points(experiment_id, timeline, start_seq=0)
+
+    def _replace_instances(self, experiment_id: str, instances: List[Dict[str, Any]]):
+        self._conn.execute("DELETE FROM instance_results WHERE experiment_id = ?", (experiment_id,))
+        rows = []
+        for instance in instances:
+            summary = {k: v for k, v in instance.items() if k not in ("instance", "series")}
+            # Compact JSON, compressed: long numeric series shrink several-fold
+            series = json.dumps(instance.get("series", {}), separators=(",", ":"), default=str)
+            rows.append((
+                experiment_id,
+                instance["instance"],
+                json.dumps(summary, default=str),
+                zlib.compress(series.encode())
+            ))
+        self._conn.executemany(
+            "INSERT INTO instance_results (experiment_id, instance, summary, series) VALUES (?, ?, ?, ?)",
+            rows
+        )
+
+    def _replace_logs(self, experiment_id: str, logs: str):
+        """Store logs as indexed gzip blocks (the line index is built once, here)"""
+        self._conn.execute("DELETE FROM experiment_logs WHERE experiment_id = ?", (experiment_id,))
+        self._conn.execute("DELETE FROM log_blocks WHERE experiment_id = ?", (experiment_id,))
+        self._conn.executemany(
+            f"INSERT INTO log_blocks (experiment_id, {', '.join(LOG_BLOCK_COLUMNS)}, data) "
+            f"VALUES (?, {', '.join('?' for _ in LOG_BLOCK_COLUMNS)}, ?)",
+            [
+                (experiment_id, *(json.dumps(b[c]) if c == "levels" else b[c] for c in LOG_BLOCK_COLUMNS), b["data"])
+                for b in build_blocks(logs)
+            ]
+        )
+
+    def _migrate_legacy_logs(self, experiment_id: str) -> bool:
+        """Move plain-text logs from experiment_logs into log_blocks; False if there are none"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT logs FROM experiment_logs WHERE experiment_id = ?", (experiment_id,)
+            ).fetchone()
+            if not row:
+                return False
+            self._replace_logs(experiment_id, row["logs"] or "")
+            self._conn.commit()
+        return True
+
+    def _metrics_saved(self, experiment_id: str) -> bool:
+        """Whether save_metrics has run for the experiment (it stores logs alongside)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT raw_metrics IS NOT NULL FROM experiments WHERE id = ?", (experiment_id,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def _log_block_data(self, experiment_id: str, block: int) -> bytes:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM log_blocks WHERE experiment_id = ? AND block = ?", (experiment_id, block)
+            ).fetchone()
+        return row["data"]
+
+    def _insert_points(self, experiment_id: str, points: List[Dict[str, Any]], start_seq: int):
+        rows = []
+        for seq, point in enumerate(points, start=start_seq):
+            extra = {k: v for k, v in point.items() if k not in TIMELINE_COLUMNS}
+            rows.append((
+                experiment_id,
+                seq,
+                point.get("time_offset", 0),
+                point.get("cpu"),
+                point.get("memory"),
+                point.get("error_count"),
+                json.dumps(extra, default=str) if extra else None
+            ))
+        self._conn.executemany(
+            "INSERT INTO timeline_points (experiment_id, seq, time_offset, cpu, memory, error_count, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def _cache_put(self, record: Dict[str, Any]):
+        self._cache[record["id"]] = record
+        self._cache.move_to_end(record["id"])
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    def _row_to_record(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "scenario": row["scenario"],
+            "config": json.loads(row["config"] or "{}"),
+            "status": row["status"],
+            "progress": row["progress"],
+            "sandbox_id": row["sandbox_id"],
+            "num_instances": row["num_instances"],
+            "grafana_url": row["grafana_url"],
+            "error": row["error"],
+            "raw_metrics": json.loads(row["raw_metrics"]) if row["raw_metrics"] else None,
+            "created_at": datetime.fromisoformat(row["created_at"]),
+            "updated_at": datetime.fromisoformat(row["updated_at"])
+        }
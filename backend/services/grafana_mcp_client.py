@@ -110,7 +110,7 @@ class GrafanaMCPClient:
 **Peak CPU:** {metrics.get('cpu_peak', 0):.1f}%  
 **Peak Memory:** {metrics.get('memory_peak', 0):.1f}%  
 **Errors:** {metrics.get('error_count', 0)}  
-**Recovery Time:** {metrics.get('recovery_time_seconds') or 'N/A'}s  
+**Recovery Time:** {self._recovery_time_text(metrics)}  
 **Data Points:** {len(timeline)} samples  
 **Instances:** {metrics.get('num_instances', 1)} {'(averaged across parallel runs)' if metrics.get('num_instances', 1) > 1 else ''}
 
@@ -253,7 +253,7 @@ class GrafanaMCPClient:
                 cpu_bar = "█" * int(cpu / 2) + "░" * (50 - int(cpu / 2))
                 mem_bar = "█" * int(mem / 2) + "░" * (50 - int(mem / 2))
                 
-                chart += f"{time_offset:3d}s │ CPU {cpu:5.1f}% │{cpu_bar[:25]}│\n"
+                chart += f"{time_offset:3.0f}s │ CPU {cpu:5.1f}% │{cpu_bar[:25]}│\n"
                 chart += f"     │ MEM {mem:5.1f}% │{mem_bar[:25]}│\n"
                 chart += "     │" + "─" * 35 + "│\n"
             
@@ -279,12 +279,27 @@ class GrafanaMCPClient:
                 # Color indicator
                 indicator = "🟢" if errors == 0 else ("🟡" if errors < 5 else "🔴")
                 
-                chart += f"{time_offset:3d}s │ {errors:2d} {indicator} │{bar}\n"
+                chart += f"{time_offset:3.0f}s │ {errors:2d} {indicator} │{bar}\n"
             
             chart += "```\n"
             chart += "\n🟢 No Errors  🟡 Some Errors  🔴 Many Errors"
             return chart
     
+    @staticmethod
+    def _recovery_time_text(metrics: Dict[str, Any]) -> str:
+        """Recovery time in seconds, or "Not degraded"/"N/A" when there is none"""
+        recovery_time = metrics.get('recovery_time_seconds')
+        if recovery_time is not None:
+            return f"{recovery_time}s"
+        return "Not degraded" if metrics.get('recovery_status') == "not_degraded" else "N/A"
+    
+    @staticmethod
+    def _recovery_rating(metrics: Dict[str, Any]) -> str:
+        recovery_time = metrics.get('recovery_time_seconds')
+        if recovery_time is None:
+            return '🟢 Stayed Within Baseline' if metrics.get('recovery_status') == "not_degraded" else 'No Recovery'
+        return '🟢 Fast' if recovery_time < 10 else ('🟡 Moderate' if recovery_time < 30 else '🔴 Slow')
+    
     def _build_timeseries_csv(self, timeline: list, experiment_timestamp: float = None) -> str:
         """Build CSV content for time-series graph with proper timestamps"""
         import time
@@ -298,7 +313,7 @@ class GrafanaMCPClient:
         csv = "time,CPU,Memory\n"
         for point in timeline:
             offset = point.get("time_offset", 0)
-            timestamp = base_time + (offset * 1000)  # Convert to milliseconds
+            timestamp = base_time + int(offset * 1000)  # Convert to milliseconds
             cpu = point.get("cpu", 0)
             mem = point.get("memory", 0)
             csv += f"{timestamp},{cpu:.1f},{mem:.1f}\n"
@@ -318,7 +333,7 @@ class GrafanaMCPClient:
         csv = "time,Errors\n"
         for point in timeline:
             offset = point.get("time_offset", 0)
-            timestamp = base_time + (offset * 1000)
+            timestamp = base_time + int(offset * 1000)
             errors = point.get("error_count", 0)
             csv += f"{timestamp},{errors}\n"
         
@@ -469,9 +484,9 @@ class GrafanaMCPClient:
                     "gridPos": {"h": 6, "w": 6, "x": 18, "y": 24},
                     "options": {
                         "mode": "markdown",
-                        "content": f"""# {metrics.get('recovery_time_seconds') if metrics.get('recovery_time_seconds') is not None else 'N/A'}{'s' if metrics.get('recovery_time_seconds') is not None else ''}
+                        "content": f"""# {self._recovery_time_text(metrics)}
 
-{'🟢 Fast' if metrics.get('recovery_time_seconds') and metrics.get('recovery_time_seconds') < 10 else ('🟡 Moderate' if metrics.get('recovery_time_seconds') and metrics.get('recovery_time_seconds') < 30 else ('🔴 Slow' if metrics.get('recovery_time_seconds') else 'No Recovery'))}
+{self._recovery_rating(metrics)}
 """
                     }
                 }
@@ -1,51 +1,22 @@
+import asyncio
 import json
 import logging
-from typing import Dict, Any
-from groq import Groq
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from groq import AsyncGroq, Groq
+
+from services.analysis_cache import AnalysisCache
+from services.code_context import CodeContext
+from services.e2b_manager import SCENARIO_LOAD
+from services.log_templates import cluster_logs, render_templates
+from services.prompt_builder import DEFAULT_PROMPT_TOKENS, build_prompt, render_timeline, truncate_lines
 
 logger = logging.getLogger(__name__)
 
+# Sampling settings of the analysis request (part of the cache key)
+COMPLETION_PARAMETERS = {"temperature": 0.3, "max_tokens": 1000, "response_format": {"type": "json_object"}}
 
-class GroqAnalyzer:
-    """Analyzes experiment logs using Groq LLM"""
-    
-    def __init__(self, api_key: str, model: str = "mixtral-8x7b-32768"):
-        self.client = Groq(api_key=api_key)
-        self.model = model
-    
-    def analyze_experiment(
-        self, 
-        scenario: str, 
-        metrics: Dict[str, Any], 
-        logs: str
-    ) -> Dict[str, Any]:
-        """
-        Analyze experiment results and extract structured insights
-        
-        Args:
-            scenario: Chaos scenario that was run
-            metrics: Raw metrics collected from sandbox (includes timeline)
-            logs: Application logs
-            
-        Returns:
-            Structured analysis with summary, metrics, recommendations, and timeline
-        """
-        try:
-            logger.info(f"Analyzing experiment with Groq: {scenario}")
-            
-            # Get codebase context
-            codebase_context = self._get_codebase_context()
-            
-            # Create analysis prompt
-            prompt = self._create_analysis_prompt(scenario, metrics, logs, codebase_context)
-            
-            # Call Groq API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are an expert chaos engineering analyst specializing in application resilience and reliability.
+SYSTEM_PROMPT = """You are an expert chaos engineering analyst specializing in application resilience and reliability.
 
 Your role is to analyze chaos experiment results and provide actionable insights that help developers improve their systems.
 
@@ -97,7 +68,7 @@ ANALYSIS GUIDELINES:
    - Suggest concrete code changes based on what you observe
    - Be prioritized based on the chaos scenario and observed metrics
 
-5. **Timeline**: Use the EXACT timeline data provided - do not modify or create fake data
+5. **Timeline**: Base your analysis on the EXACT timeline data provided - do not invent data points
 
 Return ONLY valid JSON with this structure:
 {
@@ -109,7 +80,6 @@ Return ONLY valid JSON with this structure:
     "recovery_time_seconds": float or null,
     "latency_p95": float or null
   },
-  "timeline": [exact timeline data from input],
   "severity": "low" | "medium" | "high",
   "recommendations": [
     "Hyper-specific recommendation referencing actual endpoint/function/code pattern",
@@ -118,50 +88,258 @@ Return ONLY valid JSON with this structure:
     "Fourth recommendation tailored to the application"
   ]
 }"""
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=1000,
-                response_format={"type": "json_object"}
+
+
+class GroqAnalyzer:
+    """Analyzes experiment logs using Groq LLM"""
+    
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "mixtral-8x7b-32768",
+        cache: Optional[AnalysisCache] = None,
+        prompt_tokens: int = DEFAULT_PROMPT_TOKENS,
+        code_context: Optional[CodeContext] = None,
+        deadline_seconds: float = 60.0,
+        hedge_after_seconds: Optional[float] = None,
+        max_concurrent_calls: int = 4
+    ):
+        """
+        Initialize analyzer
+
+        Args:
+            cache: Analyses of earlier identical requests, reused instead of calling Groq
+            prompt_tokens: Size budget of the analysis prompt, shared by timeline, logs and code
+            code_context: Parsed source of the app under test, shown to the model
+            deadline_seconds: Time an async analysis may take before the fallback analysis is used
+            hedge_after_seconds: Send a second, hedged request when the first takes longer (None disables)
+            max_concurrent_calls: Groq requests in flight at once across all async analyses
+        """
+        self.client = Groq(api_key=api_key)
+        self.async_client = AsyncGroq(api_key=api_key, timeout=deadline_seconds)
+        self.model = model
+        self.cache = cache
+        self.prompt_tokens = prompt_tokens
+        self.code_context = code_context
+        self.deadline_seconds = deadline_seconds
+        self.hedge_after_seconds = hedge_after_seconds
+        self.max_concurrent_calls = max_concurrent_calls
+        self._semaphore = asyncio.Semaphore(max_concurrent_calls)
+
+        self._in_flight = 0
+        self._calls = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+        self._hedged = 0
+        self._hedge_wins = 0
+        self._deadline_misses = 0
+        self._failures = 0
+    
+    def analyze_experiment(
+        self, 
+        scenario: str, 
+        metrics: Dict[str, Any], 
+        logs: str
+    ) -> Dict[str, Any]:
+        """
+        Analyze experiment results and extract structured insights
+        
+        Args:
+            scenario: Chaos scenario that was run
+            metrics: Raw metrics collected from sandbox (includes timeline)
+            logs: Application logs
+            
+        Returns:
+            Structured analysis with summary, metrics, recommendations, timeline
+            (the measured one) and the prompt size
+        """
+        prompt_size = None
+        try:
+            logger.info(f"Analyzing experiment with Groq: {scenario}")
+            prompt, prompt_size, cache_key, cached = self._prepare(scenario, metrics, logs)
+            if cached is not None:
+                return self._with_measurements(cached, metrics, prompt_size)
+            
+            # Call Groq API
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=self._messages(prompt),
+                **COMPLETION_PARAMETERS
             )
             
             # Parse response
             result = json.loads(response.choices[0].message.content)
+            if cache_key:
+                self.cache.put(cache_key, result)
             
             logger.info("Analysis completed successfully")
-            return result
+            return self._with_measurements(result, metrics, prompt_size)
             
         except Exception as e:
             logger.error(f"Failed to analyze experiment: {e}")
             # Return fallback analysis
-            return self._fallback_analysis(scenario, metrics)
+            return self._with_measurements(self._fallback_analysis(scenario, metrics), metrics, prompt_size)
     
-    def _get_codebase_context(self) -> str:
-        """Read test app code to provide context for analysis"""
+    async def aanalyze_experiment(
+        self,
+        scenario: str,
+        metrics: Dict[str, Any],
+        logs: str
+    ) -> Dict[str, Any]:
+        """
+        analyze_experiment on the event loop, bounded by the deadline
+
+        Prompt building and the cache run in a worker thread. The Groq call
+        uses AsyncGroq, waits for one of the `max_concurrent_calls` slots
+        shared by all analyses and may be hedged (see _hedged_completion).
+        When the whole analysis (slot wait included) exceeds
+        `deadline_seconds`, or Groq fails, the fallback analysis is returned.
+        """
+        prompt_size = None
         try:
-            with open('test-app/app.py', 'r') as f:
-                code = f.read()
+            logger.info(f"Analyzing experiment with Groq: {scenario}")
+            prompt, prompt_size, cache_key, cached = await asyncio.to_thread(self._prepare, scenario, metrics, logs)
+            if cached is not None:
+                return self._with_measurements(cached, metrics, prompt_size)
             
-            # Add a summary of key endpoints for emphasis
-            summary = """
-# KEY ENDPOINTS IN THIS APPLICATION:
-# - /health: Health check endpoint
-# - /api/data: Data retrieval with random 0.1-0.5s delay and 10% error rate
-# - /api/heavy: CPU-intensive operation (sum of 100k squared numbers)
-# - /api/memory: Memory-intensive operation (allocates 1M item list)
-# - /api/database: Simulates DB queries with 0.05-0.2s latency and 5% failure rate
-# - /api/network: Simulates network calls with 0.1-0.3s latency
-# - /api/stress: Combined CPU, memory, and I/O stress test
-
-"""
-            return summary + code
+            content = await asyncio.wait_for(self._hedged_completion(prompt), timeout=self.deadline_seconds)
+            result = json.loads(content)
+            if cache_key:
+                await asyncio.to_thread(self.cache.put, cache_key, result)
+            
+            logger.info("Analysis completed successfully")
+            return self._with_measurements(result, metrics, prompt_size)
+            
+        except asyncio.TimeoutError:
+            self._deadline_misses += 1
+            logger.warning(f"Groq analysis missed its {self.deadline_seconds}s deadline")
         except Exception as e:
-            logger.warning(f"Could not read test app code: {e}")
-            return "# Test app code not available"
+            self._failures += 1
+            logger.error(f"Failed to analyze experiment: {e}")
+        return self._with_measurements(self._fallback_analysis(scenario, metrics), metrics, prompt_size)
+    
+    async def aclose(self):
+        await self.async_client.close()
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Concurrency, latency, hedging and deadline counters of async Groq calls"""
+        return {
+            "max_concurrent_calls": self.max_concurrent_calls,
+            "in_flight": self._in_flight,
+            "calls": self._calls,
+            "avg_latency_seconds": round(self._total_latency / self._calls, 3) if self._calls else 0.0,
+            "max_latency_seconds": round(self._max_latency, 3),
+            "hedged": self._hedged,
+            "hedge_wins": self._hedge_wins,
+            "deadline_misses": self._deadline_misses,
+            "failures": self._failures
+        }
+    
+    def _prepare(
+        self,
+        scenario: str,
+        metrics: Dict[str, Any],
+        logs: str
+    ) -> Tuple[str, Dict[str, Any], Optional[str], Optional[Dict[str, Any]]]:
+        """Prompt, its size, cache key and cached analysis (None on a miss or without a cache)"""
+        # Code behind the endpoints the load hit, most requested first (the endpoint
+        # summary comes before it, so it survives truncation)
+        weights = (metrics.get("load") or {}).get("weights") or SCENARIO_LOAD.get(scenario, {}).get("weights")
+        endpoints = sorted(weights, key=weights.get, reverse=True) if weights else None
+        codebase_context = (
+            self.code_context.prompt_text(endpoints) if self.code_context else "# Test app code not available"
+        )
+        
+        # Create analysis prompt
+        prompt, prompt_size = self._create_analysis_prompt(scenario, metrics, logs, codebase_context)
+        
+        # Identical requests (same model, settings and prompts) reuse the earlier analysis
+        cache_key = cached = None
+        if self.cache:
+            cache_key = self.cache.make_key(self.model, SYSTEM_PROMPT, prompt, **COMPLETION_PARAMETERS)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Using cached analysis {cache_key[:12]}")
+        return prompt, prompt_size, cache_key, cached
+    
+    @staticmethod
+    def _messages(prompt: str) -> List[Dict[str, str]]:
+        return [
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    async def _hedged_completion(self, prompt: str) -> str:
+        """
+        Content of the first successful Groq response
+
+        When the first request has not answered after `hedge_after_seconds`
+        and a call slot is free, an identical second request is sent and
+        whichever succeeds first wins; the other is cancelled. Hedges are
+        never queued for a slot, so they do not add load when Groq is busy.
+        """
+        first = asyncio.create_task(self._acomplete(prompt))
+        pending = {first}
+        try:
+            if self.hedge_after_seconds:
+                done, pending = await asyncio.wait(pending, timeout=self.hedge_after_seconds)
+                if not done and not self._semaphore.locked():
+                    self._hedged += 1
+                    logger.info(f"Groq request slower than {self.hedge_after_seconds}s, sending a hedged request")
+                    pending.add(asyncio.create_task(self._acomplete(prompt)))
+                else:
+                    pending = pending | done
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self._hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _acomplete(self, prompt: str) -> str:
+        """One AsyncGroq request, holding a call slot while in flight"""
+        async with self._semaphore:
+            self._in_flight += 1
+            started = time.monotonic()
+            try:
+                response = await self.async_client.chat.completions.create(
+                    model=self.model,
+                    messages=self._messages(prompt),
+                    **COMPLETION_PARAMETERS
+                )
+            finally:
+                self._in_flight -= 1
+            latency = time.monotonic() - started
+            self._calls += 1
+            self._total_latency += latency
+            self._max_latency = max(self._max_latency, latency)
+        return response.choices[0].message.content
+    
+    @staticmethod
+    def _with_measurements(
+        analysis: Dict[str, Any],
+        metrics: Dict[str, Any],
+        prompt_size: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Analysis with the measured timeline (the prompt only shows a sample of it) and the prompt size"""
+        analysis = dict(analysis)
+        if metrics.get("timeline"):
+            analysis["timeline"] = metrics["timeline"]
+        analysis["prompt"] = prompt_size
+        return analysis
     
     def _create_analysis_prompt(
         self, 
@@ -169,8 +347,13 @@ Return ONLY valid JSON with this structure:
         metrics: Dict[str, Any], 
         logs: str,
         codebase_context: str = ""
-    ) -> str:
-        """Create detailed analysis prompt with timeline data and codebase context"""
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Create detailed analysis prompt with timeline data and codebase context
+
+        The timeline, logs and code share the analyzer's prompt token budget
+        (see build_prompt). Returns the prompt and its size.
+        """
         timeline_summary = "No timeline data available"
         if metrics.get('timeline'):
             timeline_summary = f"{len(metrics['timeline'])} data points collected over {metrics['timeline'][-1].get('time_offset', 0)}s"
@@ -185,7 +368,27 @@ Return ONLY valid JSON with this structure:
         }
         
         context = scenario_context.get(scenario, "Application was subjected to chaos conditions")
+        timeline = metrics.get('timeline', [])
         
+        return build_prompt(
+            lambda sections: self._format_prompt(scenario, context, metrics, timeline_summary, sections),
+            {
+                "timeline": lambda budget: render_timeline(timeline, budget),
+                "logs": lambda budget: render_templates(cluster_logs(logs), budget),
+                "code": lambda budget: truncate_lines(codebase_context, budget)
+            },
+            self.prompt_tokens
+        )
+    
+    def _format_prompt(
+        self,
+        scenario: str,
+        context: str,
+        metrics: Dict[str, Any],
+        timeline_summary: str,
+        sections: Dict[str, str]
+    ) -> str:
+        """Analysis prompt around the rendered timeline, logs and code sections"""
         return f"""
 CHAOS EXPERIMENT ANALYSIS
 
@@ -196,20 +399,23 @@ METRICS COLLECTED:
 - Peak CPU Usage: {metrics.get('cpu_peak', 0):.2f}%
 - Peak Memory Usage: {metrics.get('memory_peak', 0):.2f}%
 - Total Errors: {metrics.get('error_count', 0)}
-- Recovery Time: {metrics.get('recovery_time_seconds', 'Not measured')} seconds
+- Recovery Time: {self._describe_recovery_time(metrics)}
+- Recovery By Metric: {self._describe_recovery(metrics.get('recovery'))}
+- Request Latency p95: {f"{metrics['latency_p95']} ms" if metrics.get('latency_p95') is not None else 'Not measured'}
+- Requests: {self._describe_load(metrics.get('load'))}
+- Phases Vs Baseline: {self._describe_phases(metrics.get('phases'))}
 - Timeline: {timeline_summary}
 - Instances: {metrics.get('num_instances', 1)} {'(averaged across parallel runs)' if metrics.get('num_instances', 1) > 1 else ''}
 
 TIMELINE DATA (showing progression):
-{str(metrics.get('timeline', [])[:5])}
-... ({len(metrics.get('timeline', []))} total data points)
+{sections['timeline']}
 
-APPLICATION LOGS (sample):
-{logs[:1000]}
+APPLICATION LOGS (lines grouped into templates with variable parts masked; [level xcount, first..last seen, from the first log record]):
+{sections['logs']}
 
 APPLICATION CODE BEING TESTED:
 ```python
-{codebase_context[:3000]}
+{sections['code']}
 ```
 
 ANALYSIS REQUIREMENTS:
@@ -231,6 +437,75 @@ Every recommendation must reference specific code elements from the application
 Focus on insights that help developers improve resilience. Be hyper-specific and reference actual metrics AND code patterns.
 """
     
+    @staticmethod
+    def _describe_load(load: Dict[str, Any]) -> str:
+        """One-line summary of the load generator results"""
+        if not load:
+            return "Not measured"
+        latency = load.get("latency_ms", {})
+        profile = load.get("profile") or {}
+        shape = f"{profile.get('shape', 'constant')} load profile, " if profile else f"{load.get('concurrency')} concurrent workers, "
+        return (
+            f"{shape}{load.get('requests', 0)} sent, {load.get('errors', 0)} errors, {load.get('timeouts', 0)} timeouts; "
+            f"latency p50 {latency.get('p50')} ms, p99 {latency.get('p99')} ms, max {latency.get('max')} ms"
+        )
+    
+    @staticmethod
+    def _describe_phases(phases: Dict[str, Any]) -> str:
+        """One-line summary of the fault and recovery phases against the baseline phase"""
+        if not phases or not phases.get("deltas"):
+            return "Not measured"
+        labels = {
+            "cpu_mean": "mean CPU",
+            "memory_mean": "mean memory",
+            "throughput_rps": "throughput",
+            "request_error_rate": "request error rate",
+            "latency_p95": "latency p95"
+        }
+        parts = []
+        for phase, deltas in phases["deltas"].items():
+            changes = [
+                f"{label} {deltas[field]['absolute']:+g}"
+                + (f" ({deltas[field]['percent']:+g}%)" if deltas[field]["percent"] is not None else "")
+                for field, label in labels.items()
+                if field in deltas
+            ]
+            if changes:
+                parts.append(f"{phase}: " + ", ".join(changes))
+        return "; ".join(parts) or "Not measured"
+    
+    @staticmethod
+    def _describe_recovery_time(metrics: Dict[str, Any]) -> str:
+        """Overall time-to-recover, or why there is none"""
+        seconds = metrics.get("recovery_time_seconds")
+        status = (metrics.get("recovery") or {}).get("status")
+        if seconds is not None:
+            return f"{seconds} seconds"
+        if status == "not_degraded":
+            return "Not applicable, no metric degraded"
+        if status == "not_recovered":
+            return "Did not recover before the run ended"
+        return "Not measured"
+    
+    @staticmethod
+    def _describe_recovery(recovery: Dict[str, Any]) -> str:
+        """One-line summary of per-metric degradation and recovery"""
+        if not recovery:
+            return "Not measured"
+        parts = []
+        for metric, result in recovery.get("metrics", {}).items():
+            status = result.get("status")
+            if status == "recovered":
+                parts.append(
+                    f"{metric} degraded at {result['onset_at']}s (baseline {result['baseline']}, peak {result['peak']}), "
+                    f"recovered after {result['time_to_recover']}s"
+                )
+            elif status == "not_recovered":
+                parts.append(f"{metric} degraded at {result['onset_at']}s (peak {result['peak']}) and did not recover")
+            elif status == "not_degraded":
+                parts.append(f"{metric} stayed within baseline")
+        return "; ".join(parts) or "Not measured"
+    
     def _fallback_analysis(self, scenario: str, metrics: Dict[str, Any]) -> Dict[str, Any]:
         """Provide fallback analysis if Groq fails, using actual collected metrics"""
         logger.warning("Using fallback analysis")
@@ -239,6 +514,7 @@ Focus on insights that help developers improve resilience. Be hyper-specific and
         memory_peak = metrics.get('memory_peak', 0)
         errors = metrics.get('error_count', 0)
         recovery_time = metrics.get('recovery_time_seconds')
+        recovery_status = (metrics.get('recovery') or {}).get('status')
         timeline = metrics.get('timeline', [])
         
         # Determine severity based on actual metrics
@@ -248,16 +524,23 @@ Focus on insights that help developers improve resilience. Be hyper-specific and
         elif errors > 5 or cpu_peak > 60 or memory_peak > 60:
             severity = "medium"
         
+        if recovery_time is not None:
+            recovery = f"Recovered in {recovery_time} seconds."
+        elif recovery_status == "not_recovered":
+            recovery = "Did not recover before the run ended."
+        else:
+            recovery = "System remained stable."
+        
         return {
             "summary": f"Application experienced {scenario.replace('_', ' ')} scenario. "
                       f"Recorded {errors} errors with peak CPU at {cpu_peak:.1f}% and memory at {memory_peak:.1f}%. "
-                      f"{'Recovered in ' + str(recovery_time) + ' seconds.' if recovery_time else 'System remained stable.'}",
+                      f"{recovery}",
             "metrics": {
                 "cpu_peak": cpu_peak,
                 "memory_peak": memory_peak,
                 "error_count": errors,
-                "recovery_time_seconds": recovery_time or 0.0,
-                "latency_p95": None
+                "recovery_time_seconds": recovery_time,
+                "latency_p95": metrics.get('latency_p95')
             },
             "timeline": timeline if timeline else [
                 {"time_offset": 0, "cpu": 5.0, "memory": 20.0, "error_count": 0},
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ExperimentJobRunner:
+    """
+    Runs experiment pipelines as background jobs with bounded concurrency
+
+    Jobs are coroutine functions run as tasks on the caller's event loop;
+    a semaphore limits how many run at once and the rest wait in FIFO order.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        """
+        Initialize job runner
+
+        Args:
+            max_workers: Maximum number of experiment pipelines running at once.
+                Jobs submitted beyond this limit wait in FIFO order.
+        """
+        self.max_workers = max_workers
+        self._jobs: Dict[str, asyncio.Task] = {}
+        self._running = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._waiting: List[str] = []
+        self._closed = False
+
+    def submit(self, job_id: str, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> asyncio.Task:
+        """
+        Schedule a job; returns immediately with its task
+
+        Must be called from the event loop.
+        """
+        if not asyncio.iscoroutinefunction(fn):
+            raise TypeError(f"Job {job_id}: {fn!r} is not a coroutine function")
+        if self._closed:
+            raise RuntimeError("cannot schedule new jobs after shutdown")
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def run():
+            self._waiting.append(job_id)
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self._waiting.remove(job_id)
+            self._running += 1
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                # The job is expected to record its own failure state
+                logger.error(f"Job {job_id} raised an unhandled error: {e}")
+                raise
+            finally:
+                self._running -= 1
+                self._semaphore.release()
+
+        task = asyncio.create_task(run(), name=f"experiment-job-{job_id}")
+        task.add_done_callback(lambda _: self._jobs.pop(job_id, None))
+        self._jobs[job_id] = task
+
+        logger.info(f"Job {job_id} submitted ({self.stats()['queued']} queued)")
+        return task
+
+    def is_active(self, job_id: str) -> bool:
+        """Whether a job is queued or running"""
+        return job_id in self._jobs
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """1-based position of a job waiting for a worker slot"""
+        if job_id in self._waiting:
+            return self._waiting.index(job_id) + 1
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        """Current worker pool utilisation"""
+        return {
+            "max_workers": self.max_workers,
+            "running": self._running,
+            "queued": len(self._jobs) - self._running
+        }
+
+    def shutdown(self):
+        """Stop accepting jobs and cancel queued and running ones"""
+        logger.info("Shutting down experiment job runner...")
+        self._closed = True
+        for task in list(self._jobs.values()):
+            task.cancel()
+
+    async def ashutdown(self):
+        """shutdown(), then wait for cancelled jobs to run their cleanup"""
+        tasks = list(self._jobs.values())
+        self.shutdown()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,112 @@
+import gzip
+import re
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+
+# Lines per compressed block; a query decompresses only the blocks it reads
+LOG_BLOCK_LINES = 1000
+
+# gzip level for stored blocks (6 is gzip's default speed/size trade-off)
+LOG_COMPRESSION_LEVEL = 6
+
+# Test app log format: "2024-01-01 12:00:00,123 - LEVEL - message"
+LOG_LINE_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - ([A-Z]+) - ")
+
+# Time format of log lines; these strings sort chronologically
+LOG_TIME_FORMAT = "%Y-%m-%d %H:%M:%S,%f"
+
+
+def parse_lines(
+    lines: Sequence[str],
+    time: Optional[str] = None,
+    level: Optional[str] = None
+) -> Iterator[Tuple[Optional[str], Optional[str]]]:
+    """
+    (time, level) of each line
+
+    Lines without a log record header (tracebacks, multi-line messages)
+    belong to the record before them and inherit its time and level;
+    `time` and `level` are the record in effect before the first line.
+    """
+    for line in lines:
+        match = LOG_LINE_PATTERN.match(line)
+        if match:
+            time, level = match.groups()
+        yield time, level
+
+
+def build_blocks(logs: str, block_lines: int = LOG_BLOCK_LINES) -> List[Dict[str, Any]]:
+    """
+    Split logs into gzip-compressed blocks of `block_lines` lines with their index entries
+
+    Each block records its first line number, line count, the record time
+    and level in effect at its start (so it can be parsed on its own), the
+    time range it covers and its line count per level. Blocks hold the exact
+    original bytes, so concatenating them gives back the logs.
+    """
+    # Only "\n" ends a line (str.splitlines would also split on \r, \x0c, ...)
+    lines = [line + "\n" for line in logs.split("\n")]
+    if lines[-1] == "\n":
+        lines.pop()
+    else:
+        lines[-1] = lines[-1][:-1]
+    blocks = []
+    time = level = None
+    for first_line in range(0, len(lines), block_lines):
+        chunk = lines[first_line:first_line + block_lines]
+        context_time, context_level = time, level
+        levels: Dict[str, int] = {}
+        times = []
+        for time, level in parse_lines(chunk, time, level):
+            if level:
+                levels[level] = levels.get(level, 0) + 1
+            if time:
+                times.append(time)
+        blocks.append({
+            "block": len(blocks),
+            "first_line": first_line,
+            "line_count": len(chunk),
+            "context_time": context_time,
+            "context_level": context_level,
+            "start_time": times[0] if times else None,
+            "end_time": times[-1] if times else None,
+            "levels": levels,
+            "data": gzip.compress("".join(chunk).encode(), compresslevel=LOG_COMPRESSION_LEVEL, mtime=0)
+        })
+    return blocks
+
+
+def block_may_match(
+    block: Dict[str, Any],
+    levels: Optional[Sequence[str]] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None
+) -> bool:
+    """Whether a block can hold matching lines, judged from its index entry alone"""
+    if levels and not any(block["levels"].get(level) for level in levels):
+        return False
+    if since and (block["end_time"] is None or block["end_time"] < since):
+        return False
+    if until and (block["start_time"] is None or block["start_time"] > until):
+        return False
+    return True
+
+
+def line_matches(
+    text: str,
+    time: Optional[str],
+    level: Optional[str],
+    levels: Optional[Sequence[str]] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    search: Optional[str] = None
+) -> bool:
+    """Whether one line passes the level, time range and substring filters (`search` in lower case)"""
+    if levels and level not in levels:
+        return False
+    if since and (time is None or time < since):
+        return False
+    if until and (time is None or time > until):
+        return False
+    if search and search not in text.lower():
+        return False
+    return True
@@ -0,0 +1,126 @@
+import io
+import re
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from services.log_index import LOG_LINE_PATTERN, LOG_TIME_FORMAT
+from services.prompt_builder import CHARS_PER_TOKEN
+
+# Variable parts of a log message, replaced in order by placeholders
+MASKS = (
+    (re.compile(r"\[\d{2}/\w{3}/\d{4} \d{2}:\d{2}:\d{2}\]"), "<TS>"),                 # werkzeug access log
+    (re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?"), "<TS>"),
+    (re.compile(r"\b[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}\b"), "<ID>"),  # UUID
+    (re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"), "<IP>"),
+    (re.compile(r"\b0x[0-9a-fA-F]+\b"), "<HEX>"),
+    (re.compile(r"(?<![0-9A-Za-z])(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{8,}(?![0-9A-Za-z])"), "<ID>"),
+    (re.compile(r"(?<!\w)-?\d+(?:\.\d+)?"), "<NUM>"),
+)
+
+# Order in which templates of each level are offered to the prompt
+LEVEL_PRIORITY = {"CRITICAL": 0, "ERROR": 1, "WARNING": 2}
+
+
+def mask_message(message: str) -> str:
+    """Message with timestamps, ids, addresses and numbers replaced by placeholders"""
+    for pattern, placeholder in MASKS:
+        message = pattern.sub(placeholder, message)
+    return message.strip()
+
+
+def cluster_logs(logs: str) -> Dict[str, Any]:
+    """
+    Group log lines into templates in a single pass
+
+    Each line's message (without the record header) is masked into a
+    template. Lines without a header (tracebacks, multi-line messages) are
+    templated on their own but take the time and level of the record they
+    belong to. Returns the line count, lines per level, and per (level,
+    template) the count and the first and last record time.
+    """
+    templates: Dict[tuple, Dict[str, Any]] = {}
+    levels: Dict[str, int] = {}
+    start_time = time = level = None
+    lines = 0
+
+    for raw in io.StringIO(logs):
+        lines += 1
+        line = raw.rstrip("\r\n")
+        match = LOG_LINE_PATTERN.match(line)
+        if match:
+            time, level = match.groups()
+            start_time = start_time or time
+        message = line[match.end():] if match else line
+        if not message.strip():
+            continue
+        key = (level, mask_message(message))
+        entry = templates.get(key)
+        if entry is None:
+            entry = templates[key] = {
+                "template": key[1],
+                "level": level,
+                "count": 0,
+                "first_time": time,
+                "last_time": time
+            }
+        entry["count"] += 1
+        entry["last_time"] = time
+        if level:
+            levels[level] = levels.get(level, 0) + 1
+
+    return {
+        "lines": lines,
+        "levels": levels,
+        "start_time": start_time,
+        "templates": list(templates.values())
+    }
+
+
+def render_templates(clusters: Dict[str, Any], token_budget: int = 600) -> str:
+    """
+    Most significant templates as prompt text, within `token_budget` tokens
+
+    Templates are ordered by level (CRITICAL, ERROR, WARNING, then the rest)
+    and then by count. Times are offsets from the first log record, so runs
+    that log the same things render the same text.
+    """
+    if not clusters["templates"]:
+        return "No log lines"
+
+    templates = sorted(
+        clusters["templates"],
+        key=lambda t: (LEVEL_PRIORITY.get(t["level"], len(LEVEL_PRIORITY)), -t["count"], t["first_time"] or "")
+    )
+    levels = ", ".join(f"{level} {count}" for level, count in sorted(clusters["levels"].items()))
+    header = f"{clusters['lines']} lines in {len(templates)} templates ({levels or 'no levels'})"
+
+    # Room is kept for the closing "... omitted" line
+    budget = token_budget * CHARS_PER_TOKEN - len(header) - 80
+    rendered = [header]
+    shown = 0
+    for template in templates:
+        first = _offset(clusters["start_time"], template["first_time"])
+        last = _offset(clusters["start_time"], template["last_time"])
+        span = first if first == last else f"{first}..{last}"
+        line = f"[{template['level'] or '-'} x{template['count']}, {span}] {template['template']}"
+        if len(line) + 1 > budget:
+            if shown:
+                break
+            # The most significant template is always shown, truncated if need be
+            line = line[:max(budget, 80)]
+        rendered.append(line)
+        budget -= len(line) + 1
+        shown += 1
+
+    if shown < len(templates):
+        remaining = sum(t["count"] for t in templates[shown:])
+        rendered.append(f"... {len(templates) - shown} more templates ({remaining} lines) omitted")
+    return "\n".join(rendered)
+
+
+def _offset(start: Optional[str], time: Optional[str]) -> str:
+    """Seconds from `start` to `time` as "+12s" ("?" if either is unknown)"""
+    if not start or not time:
+        return "?"
+    delta = datetime.strptime(time, LOG_TIME_FORMAT) - datetime.strptime(start, LOG_TIME_FORMAT)
+    return f"+{delta.total_seconds():.0f}s"
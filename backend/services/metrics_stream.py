@@ -0,0 +1,194 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Any, List, Optional
+
+from services.phases import PHASES
+
+logger = logging.getLogger(__name__)
+
+# CSV column -> timeline field
+COLUMN_FIELDS = {
+    "time_offset": "time_offset",
+    "cpu_percent": "cpu",
+    "memory_percent": "memory",
+    "error_count": "error_count"
+}
+
+# Fields compared against abort thresholds
+ABORT_FIELDS = ("cpu", "memory", "error_count")
+
+
+def parse_metrics_row(columns: List[str], line: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse one monitor CSV row into a timeline point
+
+    Known columns are renamed to the timeline schema; any additional numeric
+    columns are kept under their CSV name (`*_count`/`*_delta` as integers).
+    The `phase` index becomes the phase name. Returns None for incomplete rows.
+    """
+    parts = line.strip().split(',')
+    if len(parts) < len(columns):
+        return None
+
+    point: Dict[str, Any] = {}
+    for column, raw in zip(columns, parts):
+        field = COLUMN_FIELDS.get(column, column)
+        value = float(raw)
+        if field == "phase":
+            point[field] = PHASES[int(value)] if 0 <= value < len(PHASES) else None
+        elif field in ("time_offset", "error_count") or column.endswith(("_count", "_delta")):
+            point[field] = int(value) if value.is_integer() else round(value, 3)
+        else:
+            point[field] = round(value, 2)
+    return point
+
+
+class AsyncMetricsStreamCollector:
+    """
+    Tails the sandbox metrics CSV while an experiment runs (AsyncSandbox)
+
+    Every `interval` seconds the collector fetches only the bytes appended
+    since the last poll (`tail -c +offset`), parses complete rows into the
+    timeline and reports the new points of each poll in one `on_samples`
+    call, so they can be stored as a batch. When a point crosses one of the
+    `abort_thresholds` (cpu/memory percent, error_count), `on_abort` is
+    awaited once with the reason. Both callbacks are coroutine functions.
+    `# key=value` lines before the CSV header are kept in `metadata`.
+    """
+
+    def __init__(
+        self,
+        sandbox,
+        path: str,
+        interval: float = 2.0,
+        on_samples: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+        abort_thresholds: Optional[Dict[str, float]] = None,
+        on_abort: Optional[Callable[[str], Awaitable[None]]] = None,
+        max_chunk_bytes: int = 256 * 1024
+    ):
+        self.sandbox = sandbox
+        self.path = path
+        self.interval = interval
+        self.on_samples = on_samples
+        self.abort_thresholds = {k: v for k, v in (abort_thresholds or {}).items() if v is not None}
+        self.on_abort = on_abort
+        self.max_chunk_bytes = max_chunk_bytes
+
+        self.timeline: List[Dict[str, Any]] = []
+        self.columns: Optional[List[str]] = None
+        self.metadata: Dict[str, str] = {}
+        self.offset = 0
+        self.abort_reason: Optional[str] = None
+
+        self._poll_lock = asyncio.Lock()
+        self._stop_event = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def aborted(self) -> bool:
+        return self.abort_reason is not None
+
+    @property
+    def start_time(self) -> Optional[float]:
+        """Wall-clock time of time_offset 0, as written by the sampler"""
+        value = self.metadata.get("start_time")
+        return float(value) if value else None
+
+    def start(self):
+        """Start tailing in a background task on the running loop"""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> List[Dict[str, Any]]:
+        """Stop tailing, read whatever is left in the file and return the timeline"""
+        self._stop_event.set()
+        if self._task:
+            # Let an in-flight poll (and abort callback) finish
+            await self._task
+        # Drain until the file has no more complete rows
+        while await self.poll_once() > 0:
+            pass
+        return self.timeline
+
+    async def poll_once(self) -> int:
+        """Fetch and parse newly appended rows; returns the number of new points"""
+        async with self._poll_lock:
+            result = await self.sandbox.commands.run(self._tail_command(), timeout=30)
+            points = self._consume(result.stdout)
+            if points:
+                await self._emit(points)
+            for point in points:
+                if self._check_thresholds(point) and self.on_abort:
+                    try:
+                        await self.on_abort(self.abort_reason)
+                    except Exception as e:
+                        logger.error(f"Abort callback failed: {e}")
+            return len(points)
+
+    def _tail_command(self) -> str:
+        return f"tail -c +{self.offset + 1} {self.path} 2>/dev/null | head -c {self.max_chunk_bytes} || true"
+
+    def _consume(self, chunk: str) -> List[Dict[str, Any]]:
+        """Parse the complete rows of a fetched chunk and advance the offset"""
+        if not chunk:
+            return []
+
+        # Only consume complete lines; a partial last row is re-read next time
+        end = chunk.rfind("\n")
+        if end < 0:
+            return []
+        complete = chunk[:end + 1]
+        self.offset += len(complete.encode())
+
+        points = []
+        for line in complete.splitlines():
+            if not line.strip():
+                continue
+            if self.columns is None:
+                if line.startswith("#"):
+                    key, _, value = line[1:].partition("=")
+                    self.metadata[key.strip()] = value.strip()
+                else:
+                    self.columns = [c.strip() for c in line.split(',')]
+                continue
+            try:
+                point = parse_metrics_row(self.columns, line)
+            except ValueError as e:
+                logger.warning(f"Failed to parse metrics line: {line}, error: {e}")
+                continue
+            if point is None:
+                logger.warning(f"Skipping incomplete metrics line: {line}")
+                continue
+            self.timeline.append(point)
+            points.append(point)
+        return points
+
+    async def _emit(self, points: List[Dict[str, Any]]):
+        if self.on_samples:
+            try:
+                await self.on_samples(points)
+            except Exception as e:
+                logger.warning(f"Sample callback failed: {e}")
+
+    def _check_thresholds(self, point: Dict[str, Any]) -> bool:
+        """Record the abort reason; returns True only when this point triggers the abort"""
+        if self.aborted:
+            return False
+        for field in ABORT_FIELDS:
+            threshold = self.abort_thresholds.get(field)
+            if threshold is not None and point.get(field, 0) >= threshold:
+                self.abort_reason = f"{field} reached {point[field]} (threshold {threshold}) at {point.get('time_offset')}s"
+                logger.warning(f"Aborting experiment: {self.abort_reason}")
+                return True
+        return False
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self.interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.poll_once()
+            except Exception as e:
+                logger.warning(f"Metrics poll failed: {e}")
@@ -0,0 +1,164 @@
+import logging
+from typing import Dict, Any, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Experiment phases in run order
+PHASES = ("baseline", "fault", "recovery")
+
+# Stats that count events; combined across instances by summing (`status` holds counts per
+# status code). All other numeric stats (offsets, rates, means, latencies) are averaged.
+COUNT_FIELDS = ("samples", "log_errors", "requests", "errors", "timeouts", "sent", "dropped", "status")
+
+# Phase stats compared against the baseline phase
+DELTA_FIELDS = (
+    "cpu_mean", "cpu_max", "memory_mean", "memory_max", "log_error_rate",
+    "throughput_rps", "request_error_rate", "latency_p50", "latency_p95", "latency_p99"
+)
+
+
+def phase_boundaries(timeline: Sequence[Dict[str, Any]]) -> Dict[str, float]:
+    """Offset of the first sample in each phase that occurs in the timeline"""
+    boundaries: Dict[str, float] = {}
+    for point in timeline:
+        phase = point.get("phase")
+        if phase and phase not in boundaries:
+            boundaries[phase] = point["time_offset"]
+    return boundaries
+
+
+def summarize_phases(
+    timeline: Sequence[Dict[str, Any]],
+    load_summary: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Per-phase host, log and request stats with deltas against the baseline
+
+    Host and log stats come from the timeline points tagged with each phase;
+    request stats from the load generator's per-phase totals. A delta is
+    reported for every DELTA_FIELDS stat present in both the phase and the
+    baseline, as an absolute difference and (for a non-zero baseline) a
+    percentage. Returns None when the timeline carries no phases.
+    """
+    boundaries = phase_boundaries(timeline)
+    if not boundaries:
+        return None
+
+    load_phases = (load_summary or {}).get("phases") or {}
+    phases: Dict[str, Dict[str, Any]] = {}
+    for phase in PHASES:
+        points = [p for p in timeline if p.get("phase") == phase]
+        stats = _timeline_stats(points, timeline) if points else {}
+        if phase in load_phases:
+            stats.update(_load_stats(load_phases[phase]))
+        if stats:
+            phases[phase] = stats
+
+    baseline = phases.get("baseline", {})
+    deltas = {
+        phase: _deltas(stats, baseline)
+        for phase, stats in phases.items()
+        if phase != "baseline" and baseline
+    }
+
+    return {
+        "boundaries": boundaries,
+        "phases": phases,
+        "deltas": deltas
+    }
+
+
+def combine_phases(results: List[Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """Phase stats and deltas across the instances of a parallel run (see combine_stats)"""
+    results = [r for r in results if r]
+    if not results:
+        return None
+    return combine_stats(results)
+
+
+def combine_stats(values: List[Any], counted: bool = False) -> Any:
+    """
+    Combine nested stats of several instances key by key
+
+    Numbers under COUNT_FIELDS are summed; every other number is averaged.
+    Keys missing from some instances use the others; for anything else
+    (labels) the first instance's value is kept.
+    """
+    present = [v for v in values if v is not None]
+    if not present:
+        return None
+    if all(isinstance(v, dict) for v in present):
+        keys = []
+        for v in present:
+            keys.extend(k for k in v if k not in keys)
+        return {
+            key: combine_stats([v.get(key) for v in present], counted or key in COUNT_FIELDS)
+            for key in keys
+        }
+    numbers = [v for v in present if isinstance(v, (int, float)) and not isinstance(v, bool)]
+    if len(numbers) == len(present):
+        if counted:
+            return sum(numbers)
+        return round(sum(numbers) / len(numbers), 4)
+    return present[0]
+
+
+def _timeline_stats(points: List[Dict[str, Any]], timeline: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Span, CPU/memory mean and max, and ERROR log lines per second of one phase's samples"""
+    start = points[0]["time_offset"]
+    # A phase lasts until the next phase's first sample (or the last sample of the run)
+    following = [p["time_offset"] for p in timeline if p["time_offset"] > points[-1]["time_offset"]]
+    end = following[0] if following else points[-1]["time_offset"]
+
+    if all("error_delta" in p for p in points):
+        errors = sum(p["error_delta"] for p in points)
+    else:
+        index = list(timeline).index(points[0])
+        before = timeline[index - 1].get("error_count", 0) if index else 0
+        errors = points[-1].get("error_count", 0) - before
+
+    cpu = [p["cpu"] for p in points if p.get("cpu") is not None]
+    memory = [p["memory"] for p in points if p.get("memory") is not None]
+    span = end - start
+    return {
+        "start": start,
+        "end": end,
+        "samples": len(points),
+        "cpu_mean": round(sum(cpu) / len(cpu), 2) if cpu else None,
+        "cpu_max": round(max(cpu), 2) if cpu else None,
+        "memory_mean": round(sum(memory) / len(memory), 2) if memory else None,
+        "memory_max": round(max(memory), 2) if memory else None,
+        "log_errors": errors,
+        "log_error_rate": round(errors / span, 3) if span > 0 else None
+    }
+
+
+def _load_stats(load: Dict[str, Any]) -> Dict[str, Any]:
+    """Throughput, request error share and latency percentiles of one phase's requests"""
+    requests = load.get("requests", 0)
+    failed = load.get("errors", 0) + load.get("timeouts", 0)
+    # Timed out and dropped requests are in the latency histogram; connection failures are not
+    recorded = requests + load.get("dropped", 0) - load.get("status", {}).get("connect_error", 0)
+    latency = load.get("latency_ms", {}) if recorded > 0 else {}
+    return {
+        "requests": requests,
+        "dropped": load.get("dropped", 0),
+        "throughput_rps": load.get("throughput_rps"),
+        "request_error_rate": round(failed / requests, 4) if requests else None,
+        "latency_p50": latency.get("p50"),
+        "latency_p95": latency.get("p95"),
+        "latency_p99": latency.get("p99")
+    }
+
+
+def _deltas(stats: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Dict[str, Optional[float]]]:
+    deltas = {}
+    for field in DELTA_FIELDS:
+        value, reference = stats.get(field), baseline.get(field)
+        if value is None or reference is None:
+            continue
+        deltas[field] = {
+            "absolute": round(value - reference, 4),
+            "percent": round(100.0 * (value - reference) / abs(reference), 1) if reference else None
+        }
+    return deltas
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+def wait_until(
+    check: Callable[[], bool],
+    timeout: float,
+    description: str,
+    initial_delay: float = 0.05,
+    max_delay: float = 1.0,
+    backoff: float = 2.0
+) -> bool:
+    """
+    Poll `check` with exponential backoff until it returns True or the deadline passes
+
+    Returns:
+        True if the condition was met before the deadline
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    delay = initial_delay
+    attempts = 0
+
+    while True:
+        attempts += 1
+        try:
+            if check():
+                logger.info(f"{description}: ready after {time.monotonic() - start:.2f}s ({attempts} probes)")
+                return True
+        except Exception as e:
+            logger.debug(f"{description}: probe failed: {e}")
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logger.warning(f"{description}: not ready after {timeout}s ({attempts} probes)")
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * backoff, max_delay)
+
+
+def check_condition(sandbox, condition: str) -> bool:
+    """Evaluate a shell condition in the sandbox without raising on false"""
+    result = sandbox.commands.run(f"if {condition}; then echo yes; else echo no; fi", timeout=10)
+    return result.stdout.strip() == "yes"
+
+
+def wait_for_http_ready(
+    sandbox,
+    url: str = "http://localhost:5000/health",
+    expect: str = "healthy",
+    timeout: float = 30
+) -> bool:
+    """Wait until `url` inside the sandbox answers with a body containing `expect`"""
+    def check() -> bool:
+        result = sandbox.commands.run(f"curl -s --max-time 2 {url} || true", timeout=10)
+        return expect in result.stdout
+
+    return wait_until(check, timeout, f"HTTP {url}")
+
+
+# Async variants for AsyncSandbox handles
+
+
+async def async_wait_until(
+    check: Callable[[], Awaitable[bool]],
+    timeout: float,
+    description: str,
+    initial_delay: float = 0.05,
+    max_delay: float = 1.0,
+    backoff: float = 2.0
+) -> bool:
+    """Coroutine version of wait_until; `check` is a coroutine function"""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    deadline = start + timeout
+    delay = initial_delay
+    attempts = 0
+
+    while True:
+        attempts += 1
+        try:
+            if await check():
+                logger.info(f"{description}: ready after {loop.time() - start:.2f}s ({attempts} probes)")
+                return True
+        except Exception as e:
+            logger.debug(f"{description}: probe failed: {e}")
+
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            logger.warning(f"{description}: not ready after {timeout}s ({attempts} probes)")
+            return False
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * backoff, max_delay)
+
+
+async def async_check_condition(sandbox, condition: str) -> bool:
+    result = await sandbox.commands.run(f"if {condition}; then echo yes; else echo no; fi", timeout=10)
+    return result.stdout.strip() == "yes"
+
+
+async def async_wait_for_http_ready(
+    sandbox,
+    url: str = "http://localhost:5000/health",
+    expect: str = "healthy",
+    timeout: float = 30
+) -> bool:
+    async def check() -> bool:
+        result = await sandbox.commands.run(f"curl -s --max-time 2 {url} || true", timeout=10)
+        return expect in result.stdout
+
+    return await async_wait_until(check, timeout, f"HTTP {url}")
+
+
+async def async_wait_for_file_content(sandbox, path: str, timeout: float = 10) -> bool:
+    return await async_wait_until(
+        lambda: async_check_condition(sandbox, f"[ -s {path} ]"), timeout, f"File {path}"
+    )
+
+
+async def async_wait_for_process_exit(sandbox, pid_file: str, timeout: float = 10) -> bool:
+    return await async_wait_until(
+        lambda: async_check_condition(sandbox, f"! kill -0 $(cat {pid_file} 2>/dev/null) 2>/dev/null"),
+        timeout,
+        f"Exit of process in {pid_file}"
+    )
@@ -0,0 +1,132 @@
+import logging
+import math
+from typing import Callable, Dict, Any, Sequence, Tuple
+
+from services.timeseries import downsample_lttb
+
+logger = logging.getLogger(__name__)
+
+# Rough prompt size estimate
+CHARS_PER_TOKEN = 4
+
+# Default size of the analysis prompt (user message) in tokens
+DEFAULT_PROMPT_TOKENS = 4000
+
+# Share of the tokens left after the fixed prompt text, per section
+SECTION_SHARES = {"logs": 0.2, "timeline": 0.3, "code": 0.5}
+
+# Timeline columns shown to the model, in order (those present in the timeline)
+TIMELINE_COLUMNS = ("time_offset", "cpu", "memory", "error_count", "phase")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def build_prompt(
+    assemble: Callable[[Dict[str, str]], str],
+    sections: Dict[str, Callable[[int], str]],
+    token_budget: int = DEFAULT_PROMPT_TOKENS,
+    shares: Dict[str, float] = SECTION_SHARES
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Prompt whose variable sections share a fixed token budget
+
+    `assemble` turns the rendered sections into the prompt; `sections` maps
+    each section name to a renderer that must fit the token budget it is
+    given. The text outside the sections is measured first and the rest of
+    the budget is split by `shares`. Sections are rendered smallest share
+    first, and whatever a section leaves unused goes to those after it, so
+    the prompt stays the same size however long the experiment ran.
+
+    Returns the prompt and its size: total and fixed tokens, and the budget
+    and tokens used per section.
+    """
+    fixed_tokens = estimate_tokens(assemble({name: "" for name in sections}))
+    remaining = max(token_budget - fixed_tokens, 0)
+    pending = sorted(sections, key=lambda name: shares.get(name, 0))
+
+    rendered: Dict[str, str] = {}
+    usage: Dict[str, Dict[str, int]] = {}
+    while pending:
+        name = pending.pop(0)
+        weight = sum(shares.get(other, 0) for other in pending) + shares.get(name, 0)
+        budget = int(remaining * shares.get(name, 0) / weight) if weight else 0
+        rendered[name] = sections[name](budget)
+        tokens = estimate_tokens(rendered[name])
+        usage[name] = {"budget": budget, "tokens": tokens}
+        remaining = max(remaining - tokens, 0)
+
+    prompt = assemble(rendered)
+    size = {
+        "budget": token_budget,
+        "tokens": estimate_tokens(prompt),
+        "fixed_tokens": fixed_tokens,
+        "sections": usage
+    }
+    logger.info(
+        f"Prompt is ~{size['tokens']} tokens (budget {token_budget}): "
+        + ", ".join(f"{name} {u['tokens']}/{u['budget']}" for name, u in usage.items())
+    )
+    return prompt, size
+
+
+def render_timeline(timeline: Sequence[Dict[str, Any]], token_budget: int) -> str:
+    """
+    Timeline as CSV rows within `token_budget` tokens
+
+    When every sample does not fit, the timeline is downsampled with LTTB
+    to as many points as fit, keeping peaks and recovery rather than the
+    first few samples.
+    """
+    if not timeline:
+        return "No timeline data available"
+
+    columns = [c for c in TIMELINE_COLUMNS if any(c in p for p in timeline)]
+    header = ",".join(columns)
+    rows = [_timeline_row(point, columns) for point in timeline]
+    note = f"({len(timeline)} samples)"
+    # Room is kept for a longer note once downsampled
+    budget = token_budget * CHARS_PER_TOKEN - len(header) - 80
+
+    used = sum(len(row) + 1 for row in rows)
+    points = len(timeline)
+    while used > budget and points > 2:
+        # Start from the count that fits at the mean row length, then shrink until it does
+        points = min(points - 1, max(2, int(points * budget / used)))
+        sampled = downsample_lttb(timeline, points)
+        rows = [_timeline_row(point, columns) for point in sampled]
+        used = sum(len(row) + 1 for row in rows)
+        note = f"({len(sampled)} of {len(timeline)} samples, downsampled keeping peaks and turning points)"
+
+    return "\n".join([note, header] + rows)
+
+
+def truncate_lines(text: str, token_budget: int, marker: str = "# ... {count} more lines not shown") -> str:
+    """Leading whole lines of `text` within `token_budget` tokens, then `marker` with the number left out"""
+    budget = token_budget * CHARS_PER_TOKEN
+    if len(text) <= budget:
+        return text
+
+    lines = text.splitlines()
+    budget -= len(marker) + 8
+    kept = 0
+    for line in lines:
+        if len(line) + 1 > budget:
+            break
+        budget -= len(line) + 1
+        kept += 1
+    return "\n".join(lines[:kept] + [marker.format(count=len(lines) - kept)])
+
+
+def _timeline_row(point: Dict[str, Any], columns: Sequence[str]) -> str:
+    values = []
+    for column in columns:
+        value = point.get(column)
+        if value is None:
+            values.append("")
+        elif isinstance(value, float):
+            values.append(f"{value:g}")
+        else:
+            values.append(str(value))
+    return ",".join(values)
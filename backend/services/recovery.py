@@ -0,0 +1,209 @@
+import logging
+from typing import Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Default tolerance bands. A sample is degraded when it exceeds the baseline
+# median by more than max(relative * baseline, absolute, BASELINE_STD_FACTOR * baseline std).
+DEFAULT_TOLERANCES = {
+    "cpu": {"relative": 0.25, "absolute": 15.0},            # percentage points
+    "memory": {"relative": 0.10, "absolute": 5.0},          # percentage points
+    "error_rate": {"relative": 0.5, "absolute": 0.5},       # errors per second
+    "latency_p95": {"relative": 0.5, "absolute": 50.0}      # milliseconds
+}
+
+BASELINE_STD_FACTOR = 3.0
+
+# Error rate is counted over a trailing window, so single log lines don't read as outages
+ERROR_RATE_WINDOW = 5.0
+
+
+class RecoveryAnalyzer:
+    """
+    Degradation onset and time-to-recover per metric
+
+    For each metric (CPU, memory, error rate, request latency p95) a baseline
+    is taken from the samples before `fault_start`, or from the first
+    `baseline_seconds` of the run when there are none. A sample is degraded
+    when it is above the baseline's tolerance band. Onset is the first
+    degraded sample at or after `fault_start`; recovery is the first sample
+    after it that is back in the band and stays there for `hold_seconds`
+    (or until the end of the run). All per-sample work is vectorized with
+    NumPy.
+    """
+
+    def __init__(
+        self,
+        baseline_seconds: float = 5.0,
+        hold_seconds: float = 5.0,
+        tolerances: Optional[Dict[str, Dict[str, Optional[float]]]] = None,
+        fault_start: float = 0.0
+    ):
+        """
+        Initialize recovery analyzer
+
+        Args:
+            baseline_seconds: Length of the fallback baseline window at the start of the run
+            hold_seconds: How long a metric must stay in band to count as recovered
+            tolerances: Per-metric overrides of DEFAULT_TOLERANCES (`relative`, `absolute`)
+            fault_start: Offset in seconds at which the fault is injected
+        """
+        self.baseline_seconds = baseline_seconds
+        self.hold_seconds = hold_seconds
+        self.fault_start = fault_start
+        self.tolerances = {metric: dict(band) for metric, band in DEFAULT_TOLERANCES.items()}
+        for metric, band in (tolerances or {}).items():
+            self.tolerances.setdefault(metric, {"relative": 0.0, "absolute": 0.0})
+            self.tolerances[metric].update({k: v for k, v in (band or {}).items() if v is not None})
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]], fault_start: float = 0.0) -> "RecoveryAnalyzer":
+        """Build from an experiment's `recovery` config (may be None)"""
+        config = config or {}
+        return cls(
+            baseline_seconds=config.get("baseline_seconds", 5.0),
+            hold_seconds=config.get("hold_seconds", 5.0),
+            tolerances=config.get("tolerances"),
+            fault_start=fault_start
+        )
+
+    def analyze(
+        self,
+        timeline: Sequence[Dict[str, Any]],
+        latency_timeline: Optional[Sequence[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Recovery of every metric with data, plus the overall status and recovery time
+
+        The overall status is "not_recovered" if any metric degraded and never
+        recovered, "recovered" if some degraded and all recovered, and
+        "not_degraded" (or "insufficient_data" without any metric) otherwise.
+        The overall time is the slowest metric's time-to-recover, and None
+        unless the status is "recovered".
+        """
+        results = {
+            metric: self.analyze_series(t, x, self.tolerances[metric])
+            for metric, (t, x) in self._series(timeline, latency_timeline).items()
+        }
+
+        degraded = [r for r in results.values() if r["status"] in ("recovered", "not_recovered")]
+        overall = None
+        if any(r["status"] == "not_recovered" for r in degraded):
+            status = "not_recovered"
+        elif degraded:
+            status = "recovered"
+            overall = max(r["time_to_recover"] for r in degraded)
+        elif any(r["status"] == "not_degraded" for r in results.values()):
+            status = "not_degraded"
+        else:
+            status = "insufficient_data"
+
+        return {
+            "status": status,
+            "recovery_time_seconds": overall,
+            "fault_start": self.fault_start,
+            "hold_seconds": self.hold_seconds,
+            "metrics": results
+        }
+
+    def analyze_series(self, t: np.ndarray, x: np.ndarray, tolerance: Dict[str, float]) -> Dict[str, Any]:
+        """Baseline, band, onset and recovery of one metric sampled at offsets `t`"""
+        known = ~np.isnan(x)
+        t, x = t[known], x[known]
+        order = np.argsort(t, kind="stable")
+        t, x = t[order], x[order]
+        if t.size < 2:
+            return {"status": "insufficient_data"}
+
+        baseline_mask = t < self.fault_start
+        baseline_source = "pre_fault"
+        if baseline_mask.sum() < 2:
+            baseline_mask = t < t[0] + self.baseline_seconds
+            baseline_source = "initial_window"
+        baseline = x[baseline_mask]
+        level = float(np.median(baseline))
+        band = max(
+            tolerance.get("relative", 0.0) * abs(level),
+            tolerance.get("absolute", 0.0),
+            BASELINE_STD_FACTOR * float(baseline.std())
+        )
+        threshold = level + band
+
+        result: Dict[str, Any] = {
+            "baseline": round(level, 2),
+            "threshold": round(threshold, 2),
+            "baseline_source": baseline_source
+        }
+
+        degraded = x > threshold
+        onsets = np.flatnonzero(degraded & (t >= self.fault_start))
+        if not onsets.size:
+            result.update(status="not_degraded", time_to_recover=None)
+            return result
+        onset = onsets[0]
+
+        # Offset of the next degraded sample at or after each index (inf if none)
+        next_degraded = np.minimum.accumulate(np.where(degraded, t, np.inf)[::-1])[::-1]
+        stable = ~degraded & ((next_degraded - t >= self.hold_seconds) | np.isinf(next_degraded))
+        stable[:onset + 1] = False
+        recoveries = np.flatnonzero(stable)
+
+        end = recoveries[0] if recoveries.size else t.size
+        peak = onset + int(np.argmax(x[onset:end]))
+        # Time spent above the band: each degraded sample holds until the next one
+        durations = np.diff(t[onset:end], append=t[end] if end < t.size else t[-1])
+        result.update(
+            onset_at=round(float(t[onset]), 3),
+            peak=round(float(x[peak]), 2),
+            peak_at=round(float(t[peak]), 3),
+            degraded_seconds=round(float(durations[degraded[onset:end]].sum()), 3)
+        )
+
+        if not recoveries.size:
+            result.update(status="not_recovered", time_to_recover=None)
+            return result
+
+        result.update(
+            status="recovered",
+            recovered_at=round(float(t[end]), 3),
+            time_to_recover=round(float(t[end] - t[onset]), 3)
+        )
+        return result
+
+    @staticmethod
+    def _series(
+        timeline: Sequence[Dict[str, Any]],
+        latency_timeline: Optional[Sequence[Dict[str, Any]]]
+    ) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """(offsets, values) per metric; missing samples are NaN"""
+        series: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+        if timeline:
+            t = np.asarray([p.get("time_offset", np.nan) for p in timeline], dtype=float)
+            for metric in ("cpu", "memory"):
+                series[metric] = (t, np.asarray([p.get(metric, np.nan) for p in timeline], dtype=float))
+
+            # Errors per second over the trailing ERROR_RATE_WINDOW
+            if all("error_delta" in p for p in timeline):
+                cumulative = np.cumsum([p["error_delta"] for p in timeline], dtype=float)
+            else:
+                counts = np.asarray([p.get("error_count", 0) or 0 for p in timeline], dtype=float)
+                cumulative = counts - counts[0]
+            window_start = np.searchsorted(t, t - ERROR_RATE_WINDOW, side="right")
+            before_window = np.where(window_start > 0, cumulative[np.maximum(window_start - 1, 0)], 0.0)
+            span = np.clip(t - t[0], 1.0, ERROR_RATE_WINDOW)
+            series["error_rate"] = (t, (cumulative - before_window) / span)
+
+        if latency_timeline:
+            t = np.asarray([b["time_offset"] for b in latency_timeline], dtype=float)
+            # Buckets that recorded no latency (no requests, or only connection failures) have none to compare
+            recorded = np.asarray([
+                b.get("requests", 0) + b.get("dropped", 0) - b.get("status", {}).get("connect_error", 0) > 0
+                for b in latency_timeline
+            ])
+            p95 = np.asarray([b.get("latency_ms", {}).get("p95", np.nan) for b in latency_timeline], dtype=float)
+            series["latency_p95"] = (t, np.where(recorded, p95, np.nan))
+
+        return series
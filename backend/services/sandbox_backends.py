@@ -0,0 +1,443 @@
+import asyncio
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import uuid
+import logging
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Any, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class SandboxBackend(ABC):
+    """
+    Creates sandboxes for experiments
+
+    A sandbox handle exposes the subset of the E2B SDK used by E2BManager:
+    `sandbox_id`, `files.write/read`, `commands.run` (foreground and
+    `background=True`), `set_timeout` and `kill`. Async handles (for
+    AsyncE2BManager) expose the same API with coroutine methods. A backend
+    must implement create, acreate and aconnect to be instantiated.
+    """
+
+    name = "base"
+
+    # Whether sandboxes start without python3/curl/Flask and need them installed
+    requires_provisioning = True
+
+    def check_configured(self):
+        """Raise ValueError if the backend cannot create sandboxes (e.g. missing credentials)"""
+
+    @abstractmethod
+    def create(self, timeout: int = 120):
+        """Create a new sandbox and return its handle"""
+
+    @abstractmethod
+    async def acreate(self, timeout: int = 120):
+        """Create a new sandbox and return an async handle"""
+
+    @abstractmethod
+    async def aconnect(self, sandbox):
+        """Return an async handle to a sandbox created with create()"""
+
+
+class E2BSandboxBackend(SandboxBackend):
+    """
+    Remote E2B sandboxes
+
+    When `template_id` is set, sandboxes are created from the prebaked
+    template built by build_template.py (python3, curl, Flask and the test app
+    installed). If the template does not exist, the default template
+    is used and E2BManager falls back to installing everything at deploy time.
+    """
+
+    name = "e2b"
+
+    def __init__(self, api_key: str, template_id: Optional[str] = None):
+        self.api_key = api_key
+        self.template_id = template_id
+        self._template_missing = False
+
+    def check_configured(self):
+        if not self.api_key:
+            raise ValueError("E2B backend requires E2B_API_KEY")
+
+    def create(self, timeout: int = 120):
+        from e2b_code_interpreter import Sandbox, NotFoundException, TemplateException
+
+        self.check_configured()
+        if self.template_id and not self._template_missing:
+            try:
+                return Sandbox(template=self.template_id, api_key=self.api_key, timeout=timeout)
+            except (NotFoundException, TemplateException) as e:
+                logger.warning(
+                    f"Sandbox template {self.template_id} unavailable ({e}), "
+                    f"falling back to default template with runtime install"
+                )
+                self._template_missing = True
+
+        # Create sandbox using the constructor (not .create() method)
+        return Sandbox(api_key=self.api_key, timeout=timeout)
+
+    async def acreate(self, timeout: int = 120):
+        from e2b_code_interpreter import AsyncSandbox, NotFoundException, TemplateException
+
+        self.check_configured()
+        if self.template_id and not self._template_missing:
+            try:
+                return await AsyncSandbox.create(template=self.template_id, api_key=self.api_key, timeout=timeout)
+            except (NotFoundException, TemplateException) as e:
+                logger.warning(
+                    f"Sandbox template {self.template_id} unavailable ({e}), "
+                    f"falling back to default template with runtime install"
+                )
+                self._template_missing = True
+
+        return await AsyncSandbox.create(api_key=self.api_key, timeout=timeout)
+
+    async def aconnect(self, sandbox):
+        from e2b_code_interpreter import AsyncSandbox
+
+        return await AsyncSandbox.connect(sandbox.sandbox_id, api_key=self.api_key)
+
+
+class LocalCommandExitException(Exception):
+    """Raised when a local command exits non-zero (mirrors E2B CommandExitException)"""
+
+    def __init__(self, stdout: str, stderr: str, exit_code: int):
+        super().__init__(f"Command exited with code {exit_code}: {stderr.strip()[:200]}")
+        self.stdout = stdout
+        self.stderr = stderr
+        self.exit_code = exit_code
+        self.error = stderr
+
+
+class LocalCommandResult:
+    """Result of a finished local command"""
+
+    def __init__(self, stdout: str, stderr: str, exit_code: int):
+        self.stdout = stdout
+        self.stderr = stderr
+        self.exit_code = exit_code
+        self.error = None
+
+
+class LocalCommandHandle:
+    """Handle to a background local command"""
+
+    def __init__(self, process: subprocess.Popen, stdout: List[str], stderr: List[str], readers: List[threading.Thread]):
+        self._process = process
+        self._stdout = stdout
+        self._stderr = stderr
+        self._readers = readers
+
+    @property
+    def pid(self) -> int:
+        return self._process.pid
+
+    def wait(self, on_pty=None, on_stdout=None, on_stderr=None) -> LocalCommandResult:
+        exit_code = self._process.wait()
+        for reader in self._readers:
+            reader.join(timeout=5)
+        stdout, stderr = "".join(self._stdout), "".join(self._stderr)
+        if exit_code != 0:
+            raise LocalCommandExitException(stdout, stderr, exit_code)
+        return LocalCommandResult(stdout, stderr, exit_code)
+
+    def kill(self) -> bool:
+        return _kill_process_group(self._process)
+
+
+def _kill_process_group(process: subprocess.Popen) -> bool:
+    """Kill a process started in its own session together with its children"""
+    # The session leader may have exited already (e.g. `nohup app &`) while
+    # its children are still running in the process group
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        return False
+    process.wait()
+    return True
+
+
+def _process_group_alive(process: subprocess.Popen) -> bool:
+    process.poll()  # Reap the leader if it has exited
+    try:
+        os.killpg(process.pid, 0)
+    except (ProcessLookupError, PermissionError):
+        return False
+    return True
+
+
+class LocalFiles:
+    """Filesystem API of a local sandbox"""
+
+    def __init__(self, sandbox: "LocalSandbox"):
+        self._sandbox = sandbox
+
+    def write(self, path: str, data: Union[str, bytes], **kwargs):
+        local_path = self._sandbox.translate(path)
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        if isinstance(data, str):
+            # Scripts and app code reference sandbox paths and the app port
+            with open(local_path, "w") as f:
+                f.write(self._sandbox.translate(data))
+        else:
+            with open(local_path, "wb") as f:
+                f.write(data)
+
+    def read(self, path: str, format: str = "text", **kwargs) -> Union[str, bytes, Iterator[bytes]]:
+        local_path = self._sandbox.translate(path)
+        if format == "text":
+            with open(local_path, "r") as f:
+                return f.read()
+        if format == "bytes":
+            with open(local_path, "rb") as f:
+                return f.read()
+        return self._stream(local_path)
+
+    @staticmethod
+    def _stream(local_path: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        with open(local_path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+
+class LocalCommands:
+    """Command API of a local sandbox: runs bash with sandbox paths remapped"""
+
+    def __init__(self, sandbox: "LocalSandbox"):
+        self._sandbox = sandbox
+
+    def run(
+        self,
+        cmd: str,
+        background: Optional[bool] = None,
+        envs: Optional[Dict[str, str]] = None,
+        cwd: Optional[str] = None,
+        on_stdout: Optional[Callable[[str], None]] = None,
+        on_stderr: Optional[Callable[[str], None]] = None,
+        timeout: Optional[float] = 60,
+        **kwargs
+    ):
+        env = dict(self._sandbox.env)
+        env.update(envs or {})
+        process = subprocess.Popen(
+            ["bash", "-c", self._sandbox.translate(cmd)],
+            cwd=self._sandbox.translate(cwd) if cwd else self._sandbox.home,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=True
+        )
+        self._sandbox.track(process)
+
+        stdout: List[str] = []
+        stderr: List[str] = []
+        readers = [
+            self._start_reader(process.stdout, stdout, on_stdout),
+            self._start_reader(process.stderr, stderr, on_stderr)
+        ]
+        handle = LocalCommandHandle(process, stdout, stderr, readers)
+
+        if timeout:
+            timer = threading.Timer(timeout, handle.kill)
+            timer.daemon = True
+            timer.start()
+            process_done = threading.Thread(target=lambda: (process.wait(), timer.cancel()), daemon=True)
+            process_done.start()
+
+        if background:
+            return handle
+        return handle.wait()
+
+    @staticmethod
+    def _start_reader(stream, sink: List[str], callback: Optional[Callable[[str], None]]) -> threading.Thread:
+        def read():
+            for line in iter(stream.readline, ""):
+                sink.append(line)
+                if callback:
+                    try:
+                        callback(line)
+                    except Exception as e:
+                        logger.warning(f"Output callback failed: {e}")
+            stream.close()
+
+        reader = threading.Thread(target=read, daemon=True)
+        reader.start()
+        return reader
+
+
+class LocalSandbox:
+    """
+    Sandbox stand-in that runs commands as local processes
+
+    Each sandbox gets its own root directory; `/home/user`, `/tmp` and
+    `/etc/hosts` in commands, paths and written text files are remapped into
+    it, and the test app port 5000 is remapped to a free local port, so the
+    unmodified chaos and monitor scripts can run side by side.
+    """
+
+    _PATH_PATTERN = re.compile(r"(?<![\w./-])(/home/user|/tmp|/etc/hosts)(?![\w.-])")
+    _PORT_PATTERN = re.compile(r"(localhost:|port=)5000\b")
+
+    def __init__(self, base_dir: Optional[str] = None):
+        self.sandbox_id = f"local-{uuid.uuid4().hex[:8]}"
+        self.root = tempfile.mkdtemp(prefix=f"chaoslab-{self.sandbox_id}-", dir=base_dir)
+        self.home = os.path.join(self.root, "home", "user")
+        for directory in (self.home, os.path.join(self.root, "tmp"), os.path.join(self.root, "etc")):
+            os.makedirs(directory, exist_ok=True)
+        self.port = _find_free_port()
+        self.env = dict(os.environ)
+        # Prefer the backend's interpreter so `python3` has Flask available
+        self.env["PATH"] = os.path.dirname(sys.executable) + os.pathsep + self.env.get("PATH", "")
+        self.env["HOME"] = self.home
+        self.env["TMPDIR"] = os.path.join(self.root, "tmp")
+        self.files = LocalFiles(self)
+        self.commands = LocalCommands(self)
+        self._processes: List[subprocess.Popen] = []
+        self._lock = threading.Lock()
+
+    def translate(self, text: str) -> str:
+        """Remap sandbox paths and the app port into this sandbox"""
+        text = self._PATH_PATTERN.sub(lambda m: self.root + m.group(1), text)
+        return self._PORT_PATTERN.sub(lambda m: f"{m.group(1)}{self.port}", text)
+
+    def track(self, process: subprocess.Popen):
+        with self._lock:
+            # Keep exited leaders whose children still run in their process group
+            self._processes = [p for p in self._processes if _process_group_alive(p)]
+            self._processes.append(process)
+
+    def set_timeout(self, timeout: int):
+        # Local sandboxes live until kill()
+        pass
+
+    def kill(self) -> bool:
+        with self._lock:
+            processes, self._processes = self._processes, []
+        for process in processes:
+            _kill_process_group(process)
+        shutil.rmtree(self.root, ignore_errors=True)
+        return True
+
+
+class AsyncLocalCommandHandle:
+    """Async view of a LocalCommandHandle"""
+
+    def __init__(self, handle: LocalCommandHandle):
+        self._handle = handle
+
+    @property
+    def pid(self) -> int:
+        return self._handle.pid
+
+    async def wait(self) -> LocalCommandResult:
+        return await asyncio.to_thread(self._handle.wait)
+
+    async def kill(self) -> bool:
+        return await asyncio.to_thread(self._handle.kill)
+
+
+class AsyncLocalFiles:
+    def __init__(self, files: LocalFiles):
+        self._files = files
+
+    async def write(self, path: str, data: Union[str, bytes], **kwargs):
+        return await asyncio.to_thread(self._files.write, path, data)
+
+    async def read(self, path: str, format: str = "text", **kwargs):
+        if format == "stream":
+            raise ValueError("Streaming reads are not supported by async local sandboxes")
+        return await asyncio.to_thread(self._files.read, path, format)
+
+
+class AsyncLocalCommands:
+    def __init__(self, commands: LocalCommands):
+        self._commands = commands
+
+    async def run(self, cmd: str, background: Optional[bool] = None, **kwargs):
+        if background:
+            # Starting a process does not block; waiting on it is done by the handle
+            return AsyncLocalCommandHandle(self._commands.run(cmd, background=True, **kwargs))
+        return await asyncio.to_thread(self._commands.run, cmd, **kwargs)
+
+
+class AsyncLocalSandbox:
+    """
+    Async view of a LocalSandbox, mirroring AsyncSandbox
+
+    Blocking process and file calls run in the default executor; this is a
+    stand-in for tests and benchmarks, not a thread-free implementation.
+    """
+
+    def __init__(self, sandbox: LocalSandbox):
+        self.sandbox = sandbox
+        self.sandbox_id = sandbox.sandbox_id
+        self.files = AsyncLocalFiles(sandbox.files)
+        self.commands = AsyncLocalCommands(sandbox.commands)
+
+    async def set_timeout(self, timeout: int):
+        self.sandbox.set_timeout(timeout)
+
+    async def kill(self) -> bool:
+        return await asyncio.to_thread(self.sandbox.kill)
+
+
+def _find_free_port() -> int:
+    import socket
+
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class LocalSandboxBackend(SandboxBackend):
+    """
+    Runs sandboxes as local processes in temporary directories
+
+    Intended for CI and benchmarking the orchestration pipeline without the
+    E2B service. Faults are real: memory and disk scenarios act on the host,
+    so run it inside a disposable container. Requires Flask installed in the
+    backend's Python environment.
+    """
+
+    name = "local"
+    requires_provisioning = False
+
+    def __init__(self, base_dir: Optional[str] = None):
+        self.base_dir = base_dir
+
+    def create(self, timeout: int = 120) -> LocalSandbox:
+        return LocalSandbox(base_dir=self.base_dir)
+
+    async def acreate(self, timeout: int = 120) -> "AsyncLocalSandbox":
+        return AsyncLocalSandbox(LocalSandbox(base_dir=self.base_dir))
+
+    async def aconnect(self, sandbox: LocalSandbox) -> "AsyncLocalSandbox":
+        return AsyncLocalSandbox(sandbox)
+
+
+def create_sandbox_backend(name: str, api_key: str = "", **options: Any) -> SandboxBackend:
+    """
+    Create a sandbox backend by name ("e2b" or "local")
+
+    A missing E2B API key is reported by check_configured() when an
+    experiment starts, so the app can still start without one.
+    """
+    if name == "e2b":
+        return E2BSandboxBackend(api_key, **options)
+    if name == "local":
+        return LocalSandboxBackend(**options)
+    raise ValueError(f"Unknown sandbox backend: {name}")
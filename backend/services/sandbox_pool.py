@@ -0,0 +1,242 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List
+
+from services.e2b_manager import E2BManager
+
+logger = logging.getLogger(__name__)
+
+
+class PooledSandbox:
+    """A provisioned sandbox waiting in the pool"""
+
+    def __init__(self, manager: E2BManager):
+        self.manager = manager
+        self.created_at = time.time()
+        self.last_checked = self.created_at
+
+
+class SandboxPool:
+    """
+    Keeps a warm pool of sandboxes with the test app already deployed
+
+    A background thread provisions sandboxes up to the target size, health
+    checks idle ones, and evicts sandboxes that sat idle longer than the TTL.
+    `acquire()` hands out a ready sandbox when one is available and falls back
+    to provisioning on demand otherwise.
+
+    The pool only relies on the synchronous manager methods `create_sandbox()`,
+    `deploy_test_app()`, `check_health()`, `extend_timeout()` and `cleanup()`,
+    so tests can pass a factory returning a local fake.
+    """
+
+    def __init__(
+        self,
+        manager_factory: Callable[[], E2BManager],
+        size: int = 2,
+        idle_ttl: float = 600,
+        health_check_interval: float = 30,
+        lease_seconds: int = 900
+    ):
+        """
+        Initialize sandbox pool
+
+        Args:
+            manager_factory: Returns a new, not yet created, sandbox manager
+            size: Number of idle sandboxes to keep provisioned
+            idle_ttl: Seconds an idle sandbox is kept before being replaced
+            health_check_interval: Seconds between health checks of idle sandboxes
+            lease_seconds: Sandbox lifetime guaranteed to the caller of acquire()
+        """
+        self.manager_factory = manager_factory
+        self.size = size
+        self.idle_ttl = idle_ttl
+        self.health_check_interval = health_check_interval
+        self.lease_seconds = lease_seconds
+
+        self._idle: List[PooledSandbox] = []
+        self._provisioning = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(size, 1),
+            thread_name_prefix="sandbox-pool"
+        )
+
+        self._hits = 0
+        self._misses = 0
+        self._evicted = 0
+        self._health_failures = 0
+        self._provision_failures = 0
+
+    def start(self):
+        """Start the background maintenance thread"""
+        if self.size <= 0 or self._thread:
+            return
+        logger.info(f"Starting sandbox pool (size={self.size}, idle_ttl={self.idle_ttl}s)")
+        self._thread = threading.Thread(target=self._maintain, name="sandbox-pool", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop maintenance and destroy all idle sandboxes
+
+        Blocks until sandboxes being provisioned have finished and been
+        destroyed too, so none outlives the pool.
+        """
+        logger.info("Stopping sandbox pool...")
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+        # Queued provisioning is cancelled; running provisioning sees _stopped and cleans up
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            entry.manager.cleanup()
+
+    def acquire(self) -> E2BManager:
+        """
+        Take a ready sandbox out of the pool
+
+        The caller owns the returned manager and must call `cleanup()` on it.
+        """
+        entry = None
+        with self._lock:
+            if self._idle:
+                # Most recently provisioned first: it has the longest remaining TTL
+                entry = self._idle.pop()
+                self._hits += 1
+            else:
+                self._misses += 1
+        self._wakeup.set()
+
+        if entry:
+            try:
+                entry.manager.extend_timeout(self.lease_seconds)
+                logger.info("Sandbox pool hit")
+                return entry.manager
+            except Exception as e:
+                logger.warning(f"Pooled sandbox is gone ({e}), provisioning a new one")
+                entry.manager.cleanup()
+        else:
+            logger.info("Sandbox pool miss, provisioning on demand")
+
+        manager = self._provision()
+        try:
+            manager.extend_timeout(self.lease_seconds)
+        except Exception:
+            manager.cleanup()
+            raise
+        return manager
+
+    def metrics(self) -> Dict[str, Any]:
+        """Pool size and hit-rate counters"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "target_size": self.size,
+                "idle": len(self._idle),
+                "provisioning": self._provisioning,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 3) if total else None,
+                "evicted": self._evicted,
+                "health_failures": self._health_failures,
+                "provision_failures": self._provision_failures
+            }
+
+    def _provision(self) -> E2BManager:
+        """Create a sandbox and deploy the test app into it"""
+        manager = self.manager_factory()
+        try:
+            manager.create_sandbox()
+            manager.deploy_test_app()
+        except Exception:
+            manager.cleanup()
+            raise
+        return manager
+
+    def _provision_into_pool(self):
+        """Provision one sandbox in the background and park it in the pool"""
+        try:
+            manager = self._provision()
+            manager.extend_timeout(int(self.idle_ttl + self.health_check_interval * 2))
+        except Exception as e:
+            logger.warning(f"Failed to provision pooled sandbox: {e}")
+            with self._lock:
+                self._provisioning -= 1
+                self._provision_failures += 1
+            return
+
+        with self._lock:
+            self._provisioning -= 1
+            stopped = self._stopped.is_set()
+            if not stopped:
+                self._idle.append(PooledSandbox(manager=manager))
+            idle = len(self._idle)
+        if stopped:
+            manager.cleanup()
+            return
+        logger.info(f"Pooled sandbox ready ({idle}/{self.size} idle)")
+
+    def _maintain(self):
+        """Background loop: evict, health check and replenish"""
+        while not self._stopped.is_set():
+            now = time.time()
+            expired: List[PooledSandbox] = []
+            to_check: List[PooledSandbox] = []
+
+            with self._lock:
+                for entry in list(self._idle):
+                    if now - entry.created_at > self.idle_ttl:
+                        self._idle.remove(entry)
+                        expired.append(entry)
+                    elif now - entry.last_checked > self.health_check_interval:
+                        to_check.append(entry)
+
+            for entry in expired:
+                logger.info("Evicting idle pooled sandbox (TTL expired)")
+                entry.manager.cleanup()
+                with self._lock:
+                    self._evicted += 1
+
+            for entry in to_check:
+                healthy = entry.manager.check_health()
+                if healthy:
+                    try:
+                        entry.manager.extend_timeout(int(self.idle_ttl + self.health_check_interval * 2))
+                    except Exception:
+                        healthy = False
+                with self._lock:
+                    if entry not in self._idle:
+                        # Handed out while we were checking it
+                        continue
+                    if healthy:
+                        entry.last_checked = time.time()
+                    else:
+                        self._idle.remove(entry)
+                        self._health_failures += 1
+                if not healthy:
+                    logger.warning("Pooled sandbox failed health check, replacing it")
+                    entry.manager.cleanup()
+
+            with self._lock:
+                deficit = self.size - len(self._idle) - self._provisioning
+                if deficit > 0:
+                    self._provisioning += deficit
+            for _ in range(max(deficit, 0)):
+                try:
+                    self._executor.submit(self._provision_into_pool)
+                except RuntimeError:
+                    # Executor shut down during stop()
+                    break
+
+            self._wakeup.wait(timeout=min(self.health_check_interval, 5))
+            self._wakeup.clear()
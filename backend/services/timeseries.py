@@ -0,0 +1,262 @@
+import logging
+from collections import Counter
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from services.phases import combine_stats
+
+logger = logging.getLogger(__name__)
+
+# Gauges reported with min/max/std bands (as `<field>_min`, `<field>_max`, `<field>_std`)
+BAND_FIELDS = ("cpu", "memory", "error_count", "load_1m", "app_cpu_percent", "app_rss_mb")
+
+# Timeline fields that are not resampled
+SKIP_FIELDS = ("time_offset", "instance")
+
+# Labels carried over from the latest sample at or before each grid point
+# (the most common one across instances)
+CATEGORICAL_FIELDS = ("phase",)
+
+
+def _is_count(field: str) -> bool:
+    return field.endswith(("_count", "_delta"))
+
+
+def common_grid(timelines: Sequence[Sequence[Dict[str, Any]]], step: Optional[float] = None) -> np.ndarray:
+    """
+    Evenly spaced offsets covering all timelines
+
+    The step defaults to the median sampling interval over all instances, so
+    the grid has about as many points as a single instance's timeline.
+    """
+    offsets = [np.asarray([p["time_offset"] for p in timeline], dtype=float) for timeline in timelines if timeline]
+    if not offsets:
+        return np.empty(0)
+
+    if step is None:
+        intervals = np.concatenate([np.diff(o) for o in offsets])
+        intervals = intervals[intervals > 0]
+        step = float(np.median(intervals)) if intervals.size else 1.0
+    step = max(round(step, 3), 0.1)
+
+    start = min(o[0] for o in offsets)
+    end = max(o[-1] for o in offsets)
+    return np.round(start + step * np.arange(int(np.floor((end - start) / step + 1e-9)) + 1), 3)
+
+
+def resample_timelines(
+    timelines: Sequence[Sequence[Dict[str, Any]]],
+    step: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    Align per-instance timelines on a common time grid and aggregate them
+
+    Each instance is linearly interpolated onto the grid within its own
+    sampled span (no extrapolation), then every grid point reports the mean
+    across the instances covering it, plus min/max/std bands for
+    BAND_FIELDS and the number of contributing `instances`. Counters
+    (`*_count`, `*_delta`) are rounded to integers; CATEGORICAL_FIELDS take
+    the most common label.
+    """
+    timelines = [sorted(t, key=lambda p: p["time_offset"]) for t in timelines if t]
+    grid = common_grid(timelines, step)
+    if not grid.size:
+        return []
+
+    fields = sorted({
+        field
+        for timeline in timelines
+        for point in timeline
+        for field, value in point.items()
+        if field not in SKIP_FIELDS and isinstance(value, (int, float)) and not isinstance(value, bool)
+    })
+
+    # values[field, instance, grid point]; NaN where an instance has no data
+    values = np.full((len(fields), len(timelines), grid.size), np.nan)
+    for i, timeline in enumerate(timelines):
+        offsets = np.asarray([p["time_offset"] for p in timeline], dtype=float)
+        covered = (grid >= offsets[0]) & (grid <= offsets[-1])
+        for f, field in enumerate(fields):
+            samples = np.asarray([p.get(field, np.nan) for p in timeline], dtype=float)
+            known = ~np.isnan(samples)
+            if known.any():
+                values[f, i, covered] = np.interp(grid[covered], offsets[known], samples[known])
+
+    # labels[field][instance][grid point]; None where an instance has no data
+    labels = {field: [[None] * grid.size for _ in timelines] for field in CATEGORICAL_FIELDS}
+    for i, timeline in enumerate(timelines):
+        offsets = np.asarray([p["time_offset"] for p in timeline], dtype=float)
+        latest = np.searchsorted(offsets, grid, side="right") - 1
+        for g in np.flatnonzero((latest >= 0) & (grid <= offsets[-1])):
+            for field in CATEGORICAL_FIELDS:
+                labels[field][i][g] = timeline[latest[g]].get(field)
+
+    present = ~np.isnan(values)
+    counts = present.sum(axis=1)
+    instances = present.any(axis=0).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        totals = np.where(present, values, 0.0).sum(axis=1)
+        mean = totals / counts
+        std = np.sqrt(np.where(present, (values - mean[:, None, :]) ** 2, 0.0).sum(axis=1) / counts)
+    minimum = np.where(present, values, np.inf).min(axis=1)
+    maximum = np.where(present, values, -np.inf).max(axis=1)
+
+    resampled = []
+    for g in np.flatnonzero(instances):
+        offset = float(grid[g])
+        point: Dict[str, Any] = {
+            "time_offset": int(offset) if offset.is_integer() else offset,
+            "instances": int(instances[g])
+        }
+        for f, field in enumerate(fields):
+            if not counts[f, g]:
+                continue
+            point[field] = _round(field, mean[f, g])
+            if field in BAND_FIELDS:
+                point[f"{field}_min"] = _round(field, minimum[f, g])
+                point[f"{field}_max"] = _round(field, maximum[f, g])
+                point[f"{field}_std"] = round(float(std[f, g]), 2)
+        for field, per_instance in labels.items():
+            votes = Counter(instance[g] for instance in per_instance if instance[g] is not None)
+            if votes:
+                point[field] = votes.most_common(1)[0][0]
+        resampled.append(point)
+
+    logger.info(
+        f"Resampled {len(timelines)} timelines onto {len(resampled)} points "
+        f"(step {float(grid[1] - grid[0]) if grid.size > 1 else 0:.3f}s)"
+    )
+    return resampled
+
+
+def combine_latency_timelines(timelines: Sequence[Sequence[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Load generator buckets of several instances, combined per time step
+
+    Every bucket goes to the nearest point of a common grid (whose step is
+    the bucket width). Buckets meeting at a point are merged with
+    combine_stats: request, error, timeout and status counts add up across
+    instances, while rates and latency percentiles are averaged (percentiles
+    cannot be merged exactly without the histograms). `instances` is the
+    number of buckets merged.
+    """
+    timelines = [sorted(t, key=lambda b: b["time_offset"]) for t in timelines if t]
+    grid = common_grid(timelines)
+    if not grid.size:
+        return []
+    step = float(grid[1] - grid[0]) if grid.size > 1 else 1.0
+
+    slots: List[List[Dict[str, Any]]] = [[] for _ in grid]
+    for timeline in timelines:
+        for bucket in timeline:
+            index = int(np.clip(np.rint((bucket["time_offset"] - grid[0]) / step), 0, grid.size - 1))
+            slots[index].append(bucket)
+
+    combined = []
+    for offset, buckets in zip(grid, slots):
+        if not buckets:
+            continue
+        bucket = combine_stats(buckets)
+        offset = float(offset)
+        bucket["time_offset"] = int(offset) if offset.is_integer() else offset
+        bucket["instances"] = len(buckets)
+        combined.append(bucket)
+    return combined
+
+
+def _round(field: str, value: float):
+    return int(round(float(value))) if _is_count(field) else round(float(value), 2)
+
+
+def to_columnar(timeline: Sequence[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """
+    Timeline as one list per field (time_offset first)
+
+    Field names are stored once instead of per point, which roughly halves
+    the JSON size of long series. Fields missing from a point are None.
+    """
+    fields: List[str] = ["time_offset"]
+    for point in timeline:
+        for field in point:
+            if field not in fields:
+                fields.append(field)
+    return {field: [point.get(field) for point in timeline] for field in fields}
+
+
+def downsample_lttb(
+    timeline: Sequence[Dict[str, Any]],
+    max_points: int,
+    fields: Sequence[str] = ("cpu", "memory", "error_count")
+) -> List[Dict[str, Any]]:
+    """
+    At most `max_points` points of a timeline, chosen to keep its shape
+
+    Largest-Triangle-Three-Buckets: the first and last points are kept and
+    every bucket in between contributes the point that forms the largest
+    triangle with the point kept before it and the mean of the next bucket,
+    so peaks, drops and recovery turns survive where plain striding would
+    skip them. Each of `fields` is scaled to its own range and their
+    triangle areas are summed, so one point serves all series.
+    """
+    n = len(timeline)
+    if n <= max_points:
+        return list(timeline)
+    if max_points < 3:
+        return [timeline[0], timeline[-1]][:max(max_points, 1)]
+
+    x = np.asarray([p["time_offset"] for p in timeline], dtype=float)
+    columns = []
+    for field in fields:
+        values = np.asarray(
+            [p[field] if p.get(field) is not None else np.nan for p in timeline], dtype=float
+        )
+        if np.all(np.isnan(values)):
+            continue
+        values = np.nan_to_num(values, nan=float(np.nanmin(values)))
+        span = float(values.max() - values.min())
+        columns.append((values - values.min()) / span if span else np.zeros(n))
+    if not columns:
+        # Nothing to preserve: spread the points evenly
+        keep = np.unique(np.linspace(0, n - 1, max_points).round().astype(int))
+        return [timeline[i] for i in keep]
+    y = np.stack(columns, axis=1)
+    x_span = float(x[-1] - x[0]) or 1.0
+    x = (x - x[0]) / x_span
+
+    # Interior points fall into max_points - 2 buckets of (nearly) equal size
+    edges = np.floor(np.linspace(1, n - 1, max_points - 1)).astype(int)
+    selected = [0]
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean(axis=0)
+        else:
+            next_x, next_y = x[n - 1], y[n - 1]
+        a = selected[-1]
+        areas = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end, None]) * (next_y - y[a])
+        ).sum(axis=1)
+        selected.append(start + int(np.argmax(areas)))
+    selected.append(n - 1)
+    return [timeline[i] for i in selected]
+
+
+def distribution(values: Sequence[Optional[float]]) -> Optional[Dict[str, float]]:
+    """Count, mean, std and percentiles of the non-missing values (None if there are none)"""
+    data = np.asarray([v for v in values if v is not None], dtype=float)
+    if not data.size:
+        return None
+    p25, p50, p75, p90 = np.percentile(data, [25, 50, 75, 90])
+    return {
+        "n": int(data.size),
+        "mean": round(float(data.mean()), 2),
+        "std": round(float(data.std()), 2),
+        "min": round(float(data.min()), 2),
+        "p25": round(float(p25), 2),
+        "p50": round(float(p50), 2),
+        "p75": round(float(p75), 2),
+        "p90": round(float(p90), 2),
+        "max": round(float(data.max()), 2)
+    }
@@ -2,32 +2,31 @@
 """
 Test script to verify metrics collection and Grafana dashboard fixes
 """
-import json
+import os
 from pathlib import Path
 
+from services.experiment_store import ExperimentStore
+
 def analyze_experiment_results():
     """Analyze stored experiment results to check data quality"""
-    results_dir = Path("experiment_results")
+    db_path = os.getenv("EXPERIMENT_DB_PATH", "experiment_results/chaoslab.db")
     
-    if not results_dir.exists():
-        print("❌ No experiment_results directory found")
+    if not Path(db_path).exists():
+        print(f"❌ No experiment database found at {db_path}")
         return
     
-    result_files = list(results_dir.glob("*.json"))
-    print(f"📊 Found {len(result_files)} experiment results\n")
+    store = ExperimentStore(db_path)
+    experiments = store.list_experiments(limit=1000)
+    print(f"📊 Found {len(experiments)} experiment results\n")
     
     issues = []
     
-    for result_file in result_files:
-        with open(result_file) as f:
-            data = json.load(f)
-        
-        exp_id = data.get("experiment_id", "unknown")
+    for data in experiments:
+        exp_id = data["id"]
         print(f"🔍 Analyzing {exp_id}...")
         
         # Check for timeline data
-        raw_metrics = data.get("raw_metrics", {})
-        timeline = raw_metrics.get("timeline", [])
+        timeline = store.get_timeline(exp_id)
         
         if not timeline:
             print(f"  ⚠️  No timeline data")
@@ -69,7 +68,7 @@ def analyze_experiment_results():
     
     # Summary
     print("=" * 60)
-    print(f"📈 Summary: {len(result_files)} experiments analyzed")
+    print(f"📈 Summary: {len(experiments)} experiments analyzed")
     if issues:
         print(f"⚠️  Found {len(issues)} issues:")
         for issue in issues:
@@ -77,6 +76,7 @@ def analyze_experiment_results():
     else:
         print("✅ All experiments have good data quality!")
     print("=" * 60)
+    store.close()
 
 if __name__ == "__main__":
     analyze_experiment_results()
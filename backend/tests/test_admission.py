@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from services.admission import SandboxAdmissionController
+
+
+def test_waiters_are_admitted_in_fifo_order_without_overtaking():
+    async def main():
+        admission = SandboxAdmissionController(max_sandboxes=3)
+        admitted = []
+
+        async def experiment(name, count, hold):
+            async with admission.slots(name, count):
+                admitted.append(name)
+                await hold.wait()
+
+        holds = {name: asyncio.Event() for name in "abc"}
+        tasks = [asyncio.create_task(experiment("a", 2, holds["a"]))]
+        await asyncio.sleep(0)
+        # "b" needs 3 and waits; "c" would fit in the free slot but must not overtake it
+        tasks.append(asyncio.create_task(experiment("b", 3, holds["b"])))
+        tasks.append(asyncio.create_task(experiment("c", 1, holds["c"])))
+        await asyncio.sleep(0)
+        assert admitted == ["a"]
+        assert (admission.queue_position("b"), admission.queue_position("c")) == (1, 2)
+
+        holds["a"].set()
+        await asyncio.sleep(0.01)
+        assert admitted == ["a", "b"] and admission.metrics()["in_use"] == 3
+        holds["b"].set()
+        holds["c"].set()
+        await asyncio.gather(*tasks)
+        assert admitted == ["a", "b", "c"]
+        assert admission.metrics()["in_use"] == 0 and admission.metrics()["admitted"] == 3
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def main():
+        admission = SandboxAdmissionController(max_sandboxes=1)
+        await admission.acquire("a", 1)
+        waiting = asyncio.create_task(admission.acquire("b", 1))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert admission.queue_depth() == 0
+        admission.release(1)
+        assert admission.metrics()["in_use"] == 0
+
+    asyncio.run(main())
+
+
+def test_requests_larger_than_the_budget_are_refused():
+    async def main():
+        admission = SandboxAdmissionController(max_sandboxes=2)
+        with pytest.raises(ValueError):
+            await admission.acquire("big", 3)
+        with pytest.raises(ValueError):
+            admission.check(0)
+        assert admission.metrics()["in_use"] == 0
+
+    asyncio.run(main())
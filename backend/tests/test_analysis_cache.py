@@ -0,0 +1,39 @@
+import time
+
+from services.analysis_cache import AnalysisCache
+
+
+def test_key_covers_everything_that_changes_the_answer():
+    key = AnalysisCache.make_key("model", "system", "user", temperature=0.3, max_tokens=1500)
+    assert key == AnalysisCache.make_key("model", "system", "user", max_tokens=1500, temperature=0.3)
+    assert key != AnalysisCache.make_key("other", "system", "user", temperature=0.3, max_tokens=1500)
+    assert key != AnalysisCache.make_key("model", "system", "user ", temperature=0.3, max_tokens=1500)
+    assert key != AnalysisCache.make_key("model", "system", "user", temperature=0.7, max_tokens=1500)
+    # Fields are delimited, so text cannot move between them and collide
+    assert AnalysisCache.make_key("model", "ab", "c") != AnalysisCache.make_key("model", "a", "bc")
+
+
+def test_entries_expire_and_least_recently_used_are_evicted(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache.db"), ttl_seconds=60, max_entries=2)
+    cache.put("a", {"summary": "a"})
+    cache.put("b", {"summary": "b"})
+    time.sleep(0.01)
+    assert cache.get("a") == {"summary": "a"}
+    cache.put("c", {"summary": "c"})
+
+    # "b" was used least recently
+    assert cache.get("b") is None
+    assert cache.get("a") and cache.get("c")
+
+    cache.ttl_seconds = 0
+    time.sleep(0.01)
+    assert cache.get("a") is None
+    metrics = cache.metrics()
+    assert (metrics["entries"], metrics["evicted"], metrics["expired"]) == (1, 1, 1)
+
+
+def test_zero_entries_disables_the_cache(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache.db"), max_entries=0)
+    cache.put("a", {"summary": "a"})
+    assert cache.get("a") is None
+    assert cache.metrics()["entries"] == 0
@@ -0,0 +1,47 @@
+import importlib
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="module")
+def main(tmp_path_factory):
+    # Settings are read when main is imported
+    directory = tmp_path_factory.mktemp("api")
+    environment = {
+        "GROQ_API_KEY": "test",
+        "SANDBOX_BACKEND": "local",
+        "MAX_CONCURRENT_SANDBOXES": "2",
+        "EXPERIMENT_DB_PATH": str(directory / "experiments.db"),
+        "ANALYSIS_CACHE_PATH": str(directory / "analysis_cache.db")
+    }
+    saved = {name: os.environ.get(name) for name in environment}
+    os.environ.update(environment)
+    try:
+        yield importlib.import_module("main")
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def test_results_include_the_saved_prompt_size(main):
+    prompt = {"budget": 4000, "tokens": 3900, "fixed_tokens": 600, "sections": {"logs": {"budget": 650, "tokens": 640}}}
+    main.store.create("exp", "network_delay", {"duration": 10}, "completed")
+    metrics = {"cpu_peak": 98.0, "memory_peak": 40.0, "error_count": 3}
+    main.store.save_analysis("exp", {"summary": "Latency rose under the delay", "severity": "high", "metrics": metrics, "prompt": prompt})
+
+    response = TestClient(main.app).get("/api/experiment/exp/results")
+    assert response.status_code == 200
+    assert response.json()["prompt"] == prompt
+
+
+def test_start_rejects_more_instances_than_the_sandbox_budget(main):
+    response = TestClient(main.app).post(
+        "/api/experiment/start", json={"scenario": "network_delay", "config": {"num_instances": 3}}
+    )
+    assert response.status_code == 400
+    assert "at most 2" in response.json()["detail"]
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from services import async_e2b_manager
+from services.async_e2b_manager import AsyncE2BManager
+from services.sandbox_backends import LocalSandboxBackend
+
+
+class FakeHandle:
+    def __init__(self):
+        self.killed = False
+
+    async def wait(self):
+        for _ in range(20):
+            if self.killed:
+                raise RuntimeError("killed")
+            await asyncio.sleep(0.01)
+
+    async def kill(self):
+        self.killed = True
+
+
+class FakeSandbox:
+    """Async sandbox whose conditions hold at once; `fail_on` makes matching commands raise"""
+
+    def __init__(self, fail_on=None):
+        self.sandbox_id = "fake"
+        self.fail_on = fail_on
+        self.handles = []
+        self.timeout = 120
+        self.files = self
+        self.commands = self
+
+    async def set_timeout(self, seconds):
+        self.timeout = seconds
+
+    async def write(self, path, data):
+        pass
+
+    async def read(self, path, format="text"):
+        raise FileNotFoundError(path)
+
+    async def run(self, cmd, background=None, **kwargs):
+        if self.fail_on and self.fail_on in cmd:
+            raise RuntimeError(f"{self.fail_on} failed")
+        if background and "chaos_phases" in cmd:
+            # Starting the script takes long enough for a threshold to trip first
+            await asyncio.sleep(0.05)
+            self.handles.append(FakeHandle())
+            return self.handles[-1]
+        return type("Result", (), {"stdout": "yes\n" if cmd.startswith("if ") else ""})()
+
+
+class FakeCollector:
+    instances = []
+
+    def __init__(self, sandbox, path, on_abort=None, abort_thresholds=None, **kwargs):
+        self.on_abort = on_abort
+        self.abort_now = bool(abort_thresholds)
+        self.abort_reason = None
+        self.start_time = None
+        self.stopped = False
+        FakeCollector.instances.append(self)
+
+    @property
+    def aborted(self):
+        return self.abort_reason is not None
+
+    def start(self):
+        if self.abort_now:
+            asyncio.get_running_loop().create_task(self._abort())
+
+    async def _abort(self):
+        self.abort_reason = "cpu above threshold"
+        await self.on_abort(self.abort_reason)
+
+    async def stop(self):
+        self.stopped = True
+        return []
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    FakeCollector.instances = []
+    monkeypatch.setattr(async_e2b_manager, "AsyncMetricsStreamCollector", FakeCollector)
+    return AsyncE2BManager("", backend=LocalSandboxBackend())
+
+
+def test_collector_stops_when_teardown_fails(manager):
+    manager.sandbox = FakeSandbox(fail_on="kill -TERM")
+    with pytest.raises(RuntimeError):
+        asyncio.run(manager.run_chaos_script("network_delay", {"duration": 10}))
+    assert FakeCollector.instances[0].stopped
+
+
+def test_abort_before_the_script_starts_stops_it_once_started(manager):
+    manager.sandbox = FakeSandbox()
+    metrics = asyncio.run(
+        manager.run_chaos_script("network_delay", {"duration": 10, "abort_thresholds": {"cpu": 90}})
+    )
+    assert manager.sandbox.handles[0].killed
+    assert metrics["aborted"] and metrics["abort_reason"] == "cpu above threshold"
+    assert FakeCollector.instances[0].stopped
+
+
+def test_sandbox_outlives_the_longest_run(manager):
+    manager.sandbox = FakeSandbox()
+    config = {"duration": 300, "phases": {"baseline_seconds": 120, "recovery_seconds": 120}}
+    asyncio.run(manager.run_chaos_script("network_delay", config))
+    # Run (with fault overrun) plus the script timeout's slack, with room to collect results
+    assert manager.sandbox.timeout > 300 + 120 + 120 + 30 + 30
@@ -0,0 +1,86 @@
+import os
+
+from services.code_context import CodeContext, extract_structure
+
+APP = '''
+import random, time
+from flask import Flask, jsonify
+
+app = Flask(__name__)
+SECRET_SETTING = "module level code"
+
+
+@app.route('/api/data')
+def get_data():
+    """Data with failures"""
+    delay = random.uniform(0.1, 0.5)
+    time.sleep(delay)
+    if random.random() < 0.1:
+        logger.error("Random error")
+        return jsonify({}), 500
+    return jsonify({})
+
+
+@app.route('/api/heavy', methods=['GET', 'POST'])
+def heavy():
+    result = sum([i ** 2 for i in range(100000)])
+    return jsonify(result)
+
+
+@app.route('/api/other')
+def other():
+    return "other body"
+
+
+@app.errorhandler(500)
+def internal_error(error):
+    return jsonify({}), 500
+'''
+
+
+def test_extract_structure_finds_routes_and_patterns():
+    structure = extract_structure(APP)
+    data, heavy, _ = structure["routes"]
+    assert data["routes"] == [{"path": "/api/data", "methods": ["GET"]}]
+    assert data["sleeps"] == ["random.uniform(0.1, 0.5)"]
+    assert data["failures"][0]["rate"] == 0.1 and data["failures"][0]["status"] == 500
+    assert data["error_logs"] == ["Random error"]
+    assert heavy["routes"][0]["methods"] == ["GET", "POST"]
+    assert heavy["large_work"] == ["sum([i ** 2 for i in range(100000)])"]
+    assert structure["error_handlers"][0]["error"] == 500
+
+
+def test_prompt_text_shows_only_relevant_views_most_requested_first(tmp_path):
+    path = tmp_path / "app.py"
+    path.write_text(APP)
+    text = CodeContext(path).prompt_text(["/api/heavy", "/api/data"])
+
+    summary, *snippets = text.split("\n\n# app.py lines ")
+    assert "/api/other" in summary
+    assert "def heavy" in snippets[0] and "def get_data" in snippets[1] and "def internal_error" in snippets[2]
+    assert "other body" not in text and "SECRET_SETTING" not in text
+    assert snippets[0].startswith("20-23\n@app.route('/api/heavy'")
+
+
+def test_prompt_text_without_endpoints_shows_every_view(tmp_path):
+    path = tmp_path / "app.py"
+    path.write_text(APP)
+    text = CodeContext(path).prompt_text()
+    assert "other body" in text and "SECRET_SETTING" not in text
+
+
+def test_file_is_parsed_once_per_version(tmp_path):
+    path = tmp_path / "app.py"
+    path.write_text(APP)
+    context = CodeContext(path)
+    context.get()
+    context.get()
+    # Touched but unchanged: re-read, not re-parsed
+    os.utime(path, ns=(1, 1))
+    context.get()
+    assert context.metrics()["parses"] == 1 and context.metrics()["hits"] == 2
+
+    path.write_text(APP + "\n# changed\n")
+    assert context.get()["source"].endswith("# changed\n")
+    assert context.metrics()["parses"] == 2
+    assert CodeContext(tmp_path / "missing.py").prompt_text() == "# Test app code not available"
@@ -0,0 +1,20 @@
+from services.e2b_manager import E2BManager
+from services.sandbox_backends import LocalSandboxBackend
+
+
+def test_error_count_is_the_samplers_record_total():
+    manager = E2BManager("", backend=LocalSandboxBackend())
+    timeline = [
+        {"time_offset": 0, "cpu": 5.0, "memory": 20.0, "error_count": 0, "warning_count": 0, "exception_count": 0},
+        {"time_offset": 1, "cpu": 9.0, "memory": 21.0, "error_count": 1, "warning_count": 1, "exception_count": 1}
+    ]
+    # One error record with a traceback, and a warning that mentions ERROR
+    logs = (
+        "2024-01-01 12:00:00,000 - ERROR - Request failed\n"
+        "Traceback (most recent call last):\n"
+        "ValueError: Exception in handler\n"
+        "2024-01-01 12:00:01,000 - WARNING - retrying after ERROR\n"
+    )
+    metrics = manager._summarize_timeseries(timeline, logs)
+    assert metrics["error_count"] == 1
+    assert metrics["log_levels"] == {"error": 1, "warning": 1, "exception": 1}
@@ -0,0 +1,112 @@
+import asyncio
+
+from services.event_bus import ExperimentEventBus, format_sse
+
+
+def collect(bus: ExperimentEventBus, experiment_id: str, **kwargs):
+    """Events a subscriber receives until the stream ends (heartbeats excluded)"""
+    async def run():
+        events = []
+        async for event in bus.subscribe(experiment_id, heartbeat=0.05, **kwargs):
+            if event is not None:
+                events.append(event)
+        return events
+    return run()
+
+
+def snapshot_of(data):
+    async def snapshot():
+        return data
+    return snapshot
+
+
+def run_with_loop(coroutine_factory):
+    async def main():
+        bus = ExperimentEventBus(history_size=3)
+        bus.bind_loop(asyncio.get_running_loop())
+        return await coroutine_factory(bus)
+    return asyncio.run(main())
+
+
+def test_events_have_increasing_ids_and_replay_after_close():
+    async def scenario(bus):
+        bus.publish("exp", "status", {"status": "running"})
+        bus.publish("exp", "sample", {"cpu": 1})
+        bus.publish("exp", "status", {"status": "completed"})
+        bus.close("exp")
+        return await collect(bus, "exp", last_event_id=1)
+
+    events = run_with_loop(scenario)
+    assert [(e[0], e[1]) for e in events] == [(2, "sample"), (3, "status")]
+
+
+def test_live_events_follow_backlog():
+    async def scenario(bus):
+        bus.publish("exp", "status", {"status": "running"})
+        task = asyncio.create_task(collect(bus, "exp"))
+        await asyncio.sleep(0.01)
+        bus.publish("exp", "sample", {"cpu": 1})
+        bus.close("exp")
+        return await task
+
+    events = run_with_loop(scenario)
+    assert [e[0] for e in events] == [1, 2]
+
+
+def test_evicted_history_sends_reset_with_new_id():
+    async def scenario(bus):
+        for i in range(5):
+            bus.publish("exp", "sample", {"cpu": i})
+        bus.close("exp")
+        # History keeps ids 3..5; a viewer that saw id 1 missed id 2
+        return await collect(bus, "exp", last_event_id=1, snapshot=snapshot_of({"status": "completed"}))
+
+    events = run_with_loop(scenario)
+    assert events == [(6, "reset", {"status": "completed"})]
+
+
+def test_events_published_while_the_snapshot_is_read_follow_the_reset():
+    async def scenario(bus):
+        for i in range(5):
+            bus.publish("exp", "sample", {"cpu": i})
+
+        async def snapshot():
+            # The pipeline keeps publishing while the snapshot reads the database
+            bus.publish("exp", "sample", {"cpu": 9})
+            bus.close("exp")
+            await asyncio.sleep(0)
+            return {"status": "running"}
+
+        return await collect(bus, "exp", last_event_id=1, snapshot=snapshot)
+
+    events = run_with_loop(scenario)
+    assert events == [(6, "reset", {"status": "running"}), (7, "sample", {"cpu": 9})]
+
+
+def test_unknown_finished_experiment_gets_reset_above_last_event_id():
+    async def scenario(bus):
+        return await collect(
+            bus, "restarted", last_event_id=42, snapshot=snapshot_of({"status": "failed"}), finished=True
+        )
+
+    events = run_with_loop(scenario)
+    assert events == [(43, "reset", {"status": "failed"})]
+
+
+def test_overflowed_subscriber_catches_up_from_history():
+    async def scenario(bus):
+        bus.queue_size = 1
+        bus.history_size = 100
+        task = asyncio.create_task(collect(bus, "exp", snapshot=snapshot_of({"status": "running"})))
+        await asyncio.sleep(0.01)
+        for i in range(5):
+            bus.publish("exp", "sample", {"cpu": i})
+        bus.close("exp")
+        return await task
+
+    events = run_with_loop(scenario)
+    assert [e[0] for e in events] == [1, 2, 3, 4, 5]
+
+
+def test_format_sse():
+    assert format_sse(7, "status", {"a": 1}) == 'id: 7\nevent: status\ndata: {"a": 1}\n\n'
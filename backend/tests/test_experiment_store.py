@@ -0,0 +1,47 @@
+import sqlite3
+
+from services.experiment_store import ExperimentStore
+
+
+def make_store(tmp_path):
+    store = ExperimentStore(str(tmp_path / "experiments.db"))
+    store.create("exp", "cpu_spike", {"duration": 10}, "running")
+    return store
+
+
+def test_timeline_batches_append_in_order(tmp_path):
+    store = make_store(tmp_path)
+    store.append_timeline_points("exp", [{"time_offset": 0, "cpu": 1.0}, {"time_offset": 1, "cpu": 2.0}])
+    store.append_timeline_points("exp", [])
+    store.append_timeline_points("exp", [{"time_offset": 2, "cpu": 3.0, "instance": 2}])
+
+    timeline = store.get_timeline("exp")
+    assert [p["time_offset"] for p in timeline] == [0, 1, 2]
+    assert timeline[2]["instance"] == 2
+
+
+def test_analysis_keeps_the_prompt_size(tmp_path):
+    store = make_store(tmp_path)
+    prompt = {"budget": 4000, "tokens": 3900, "fixed_tokens": 600, "sections": {}}
+    store.save_analysis("exp", {"summary": "ok", "severity": "low", "prompt": prompt})
+    store.save_analysis("other", {"summary": "ok", "severity": "low"})
+
+    assert store.get_analysis("exp")["prompt"] == prompt
+    assert store.get_analysis("other")["prompt"] is None
+
+
+def test_prompt_column_is_added_to_older_databases(tmp_path):
+    path = str(tmp_path / "experiments.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE analysis (experiment_id TEXT PRIMARY KEY, summary TEXT, severity TEXT, "
+        "metrics TEXT, recommendations TEXT, timeline TEXT, created_at TEXT NOT NULL)"
+    )
+    conn.execute("INSERT INTO analysis (experiment_id, summary, created_at) VALUES ('old', 'ok', 'now')")
+    conn.commit()
+    conn.close()
+
+    store = ExperimentStore(path)
+    assert store.get_analysis("old")["prompt"] is None
+    store.save_analysis("new", {"summary": "ok", "prompt": {"tokens": 10}})
+    assert store.get_analysis("new")["prompt"] == {"tokens": 10}
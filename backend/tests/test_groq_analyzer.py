@@ -0,0 +1,84 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from services.analysis_cache import AnalysisCache
+from services.groq_analyzer import GroqAnalyzer
+
+METRICS = {"cpu_peak": 90.0, "memory_peak": 40.0, "error_count": 2, "timeline": [{"time_offset": 0, "cpu": 90.0}]}
+
+
+class FakeCompletions:
+    """chat.completions of AsyncGroq answering the n-th request after delays[n] seconds"""
+
+    def __init__(self, delays):
+        self.delays = list(delays)
+        self.requests = 0
+
+    async def create(self, **kwargs):
+        delay = self.delays[self.requests]
+        self.requests += 1
+        await asyncio.sleep(delay)
+        content = json.dumps({"summary": f"answered after {delay}s", "severity": "low", "metrics": {}})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def make_analyzer(delays, **kwargs):
+    analyzer = GroqAnalyzer("test", **kwargs)
+    completions = FakeCompletions(delays)
+    analyzer.async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return analyzer, completions
+
+
+def test_slow_request_is_hedged_and_the_faster_answer_wins():
+    analyzer, completions = make_analyzer([1.0, 0.01], hedge_after_seconds=0.05)
+    analysis = asyncio.run(analyzer.aanalyze_experiment("network_delay", METRICS, ""))
+
+    assert analysis["summary"] == "answered after 0.01s"
+    assert analysis["timeline"] == METRICS["timeline"]
+    assert analysis["prompt"]["tokens"] > 0
+    assert completions.requests == 2
+    metrics = analyzer.metrics()
+    assert (metrics["hedged"], metrics["hedge_wins"], metrics["in_flight"]) == (1, 1, 0)
+
+
+def test_no_hedge_without_a_free_call_slot():
+    analyzer, completions = make_analyzer([0.1], hedge_after_seconds=0.02, max_concurrent_calls=1)
+    analysis = asyncio.run(analyzer.aanalyze_experiment("network_delay", METRICS, ""))
+
+    assert analysis["summary"] == "answered after 0.1s"
+    assert completions.requests == 1
+    assert analyzer.metrics()["hedged"] == 0
+
+
+def test_missed_deadline_returns_the_fallback_analysis():
+    analyzer, _ = make_analyzer([1.0], deadline_seconds=0.05)
+    analysis = asyncio.run(analyzer.aanalyze_experiment("network_delay", METRICS, ""))
+
+    assert analysis["metrics"]["cpu_peak"] == 90.0
+    assert analysis["severity"] == "high"
+    assert analysis["prompt"] is not None
+    assert analyzer.metrics()["deadline_misses"] == 1
+
+
+def test_identical_requests_are_answered_from_the_cache(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache.db"))
+    analyzer, completions = make_analyzer([0.01], cache=cache)
+
+    async def main():
+        first = await analyzer.aanalyze_experiment("network_delay", METRICS, "")
+        second = await analyzer.aanalyze_experiment("network_delay", METRICS, "")
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first == second
+    assert completions.requests == 1
+    assert cache.metrics()["hits"] == 1
+
+
+def test_recovery_time_is_described_by_the_recovery_status():
+    describe = GroqAnalyzer._describe_recovery_time
+    assert describe({"recovery_time_seconds": 4.0, "recovery": {"status": "recovered"}}) == "4.0 seconds"
+    assert describe({"recovery_time_seconds": None, "recovery": {"status": "not_degraded"}}) == "Not applicable, no metric degraded"
+    assert describe({"recovery_time_seconds": None, "recovery": {"status": "not_recovered"}}) == "Did not recover before the run ended"
+    assert describe({}) == "Not measured"
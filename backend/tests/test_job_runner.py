@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from services.job_runner import ExperimentJobRunner
+
+
+def test_jobs_beyond_limit_wait_in_fifo_order():
+    async def main():
+        runner = ExperimentJobRunner(max_workers=1)
+        release = asyncio.Event()
+        started = []
+
+        async def job(name):
+            started.append(name)
+            await release.wait()
+
+        tasks = [runner.submit(name, job, name) for name in ("a", "b", "c")]
+        await asyncio.sleep(0)
+        assert started == ["a"]
+        assert runner.stats() == {"max_workers": 1, "running": 1, "queued": 2}
+        assert [runner.queue_position(name) for name in ("a", "b", "c")] == [None, 1, 2]
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert started == ["a", "b", "c"]
+        assert not runner.is_active("c")
+        assert runner.stats()["running"] == 0
+
+    asyncio.run(main())
+
+
+def test_plain_functions_are_rejected():
+    async def main():
+        runner = ExperimentJobRunner()
+        with pytest.raises(TypeError):
+            runner.submit("job", lambda: None)
+
+    asyncio.run(main())
+
+
+def test_shutdown_cancels_jobs_and_refuses_new_ones():
+    async def main():
+        runner = ExperimentJobRunner(max_workers=1)
+        cleaned_up = []
+
+        async def job(name):
+            try:
+                await asyncio.sleep(60)
+            finally:
+                cleaned_up.append(name)
+
+        runner.submit("a", job, "a")
+        runner.submit("b", job, "b")
+        await asyncio.sleep(0)
+        await runner.ashutdown()
+        assert cleaned_up == ["a"]
+        assert runner.stats()["running"] == 0
+        with pytest.raises(RuntimeError):
+            runner.submit("c", job, "c")
+
+    asyncio.run(main())
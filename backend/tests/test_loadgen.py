@@ -0,0 +1,82 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from sandbox_scripts.loadgen import LatencyHistogram, LoadGenerator, RateProfile
+
+
+def test_histogram_percentiles_are_within_bucket_precision():
+    histogram = LatencyHistogram()
+    for value in range(1, 10001):
+        histogram.record(value)
+    for percentile, expected in ((50, 5000), (95, 9500), (99, 9900)):
+        assert histogram.value_at_percentile(percentile) == pytest.approx(expected, rel=2 ** -7)
+    assert histogram.value_at_percentile(100) == 10000
+    assert LatencyHistogram().value_at_percentile(99) == 0
+
+
+def test_histogram_merge_matches_recording_everything_once():
+    a, b, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for value in range(0, 5000, 7):
+        a.record(value)
+        both.record(value)
+    for value in range(100000, 200000, 997):
+        b.record(value)
+        both.record(value)
+    a.merge(b)
+    assert (a.total, a.min, a.max) == (both.total, both.min, both.max)
+    assert [a.value_at_percentile(p) for p in (50, 90, 99)] == [both.value_at_percentile(p) for p in (50, 90, 99)]
+
+
+def test_next_send_follows_constant_rate():
+    profile = RateProfile(10, rate=2.0)
+    sends, t, area = [], 0.0, 0.5
+    while (t := profile.next_send(t, 10, area=area)) is not None:
+        sends.append(t)
+        area = 0.0
+    assert len(sends) == 20
+    assert sends[0] == pytest.approx(0.25)
+    assert sends[1] - sends[0] == pytest.approx(0.5)
+
+
+def test_next_send_follows_ramp_and_stops_at_end():
+    profile = RateProfile(10, shape="ramp", rate=1.0, peak_rate=9.0)
+    sends, t = [], 0.0
+    while (t := profile.next_send(t, 10)) is not None:
+        sends.append(t)
+    # Integral of the rate over the run
+    assert len(sends) == pytest.approx(50, abs=1)
+    assert sends[1] - sends[0] > sends[-1] - sends[-2]
+    assert profile.next_send(9.99, 10) is None
+
+
+def generator(port, timeout):
+    args = SimpleNamespace(
+        url=f"http://127.0.0.1:{port}", endpoints=[("/slow", 1.0)], profile=RateProfile(1, rate=10.0),
+        timeout=timeout, max_in_flight=1
+    )
+    return LoadGenerator(args)
+
+
+def test_timeouts_and_drops_are_recorded_in_latency():
+    async def main():
+        async def hang(reader, writer):
+            await asyncio.sleep(5)
+
+        server = await asyncio.start_server(hang, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        load = generator(port, timeout=0.5)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        # Sends at 0.05s, 0.15s and 0.25s; the last two find the first outstanding
+        await load.open_loop(start, start + 0.3)
+        await asyncio.wait(list(load.in_flight))
+        server.close()
+        return load.bucket["/slow"].to_dict()
+
+    stats = asyncio.run(main())
+    assert stats["requests"] == 1 and stats["timeouts"] == 1
+    assert stats["dropped"] == 2
+    assert stats["latency_ms"]["p50"] >= 495
+    assert stats["service_ms"]["max"] >= 495
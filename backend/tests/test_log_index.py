@@ -0,0 +1,93 @@
+import gzip
+
+from services.experiment_store import ExperimentStore
+from services.log_index import LOG_BLOCK_LINES, block_may_match, build_blocks
+
+
+def log_lines(count, error_every=None):
+    lines = []
+    for i in range(count):
+        level = "ERROR" if error_every and i % error_every == 0 else "INFO"
+        lines.append(f"2024-01-01 12:{i // 60 % 60:02d}:{i % 60:02d},000 - {level} - request {i}")
+    return lines
+
+
+def test_blocks_keep_the_exact_bytes_and_carry_the_record_in_effect():
+    logs = "2024-01-01 12:00:00,000 - ERROR - boom\nTraceback (most recent call last):\r\n  x\n2024-01-01 12:00:01,000 - INFO - ok"
+    blocks = build_blocks(logs, block_lines=2)
+
+    assert "".join(gzip.decompress(b["data"]).decode() for b in blocks) == logs
+    assert [b["first_line"] for b in blocks] == [0, 2]
+    # The traceback lines belong to the ERROR record that started in the first block
+    assert blocks[0]["levels"] == {"ERROR": 2}
+    assert (blocks[1]["context_time"], blocks[1]["context_level"]) == ("2024-01-01 12:00:00,000", "ERROR")
+    assert blocks[1]["levels"] == {"ERROR": 1, "INFO": 1}
+    assert blocks[1]["end_time"] == "2024-01-01 12:00:01,000"
+
+
+def test_index_entries_rule_out_blocks():
+    block = {"levels": {"INFO": 10}, "start_time": "2024-01-01 12:00:00,000", "end_time": "2024-01-01 12:00:09,000"}
+    assert block_may_match(block)
+    assert not block_may_match(block, levels=["ERROR"])
+    assert not block_may_match(block, since="2024-01-01 12:00:10,000")
+    assert not block_may_match(block, until="2024-01-01 11:59:59,000")
+    assert block_may_match(block, levels=["INFO"], since="2024-01-01 12:00:05,000")
+
+
+def make_store(tmp_path, logs):
+    store = ExperimentStore(str(tmp_path / "experiments.db"))
+    store.create("exp", "network_delay", {}, "completed")
+    store.save_metrics("exp", {"logs": logs})
+    read = []
+    fetch = store._log_block_data
+    store._log_block_data = lambda experiment_id, block: read.append(block) or fetch(experiment_id, block)
+    return store, read
+
+
+def test_query_seeks_to_the_block_holding_the_offset(tmp_path):
+    lines = log_lines(LOG_BLOCK_LINES * 2 + 500)
+    store, read = make_store(tmp_path, "\n".join(lines) + "\n")
+
+    page = store.query_logs("exp", offset=LOG_BLOCK_LINES + 10, limit=5)
+    assert [line["line"] for line in page["lines"]] == list(range(LOG_BLOCK_LINES + 10, LOG_BLOCK_LINES + 15))
+    assert page["lines"][0]["text"] == lines[LOG_BLOCK_LINES + 10]
+    assert page["total_lines"] == len(lines)
+    assert page["next_offset"] == LOG_BLOCK_LINES + 15
+    assert read == [1]
+
+    last = store.query_logs("exp", offset=len(lines) - 2, limit=5)
+    assert len(last["lines"]) == 2
+    assert last["next_offset"] is None
+    assert store.get_logs("exp") == "\n".join(lines) + "\n"
+
+
+def test_query_filters_skip_blocks_without_matches(tmp_path):
+    lines = log_lines(LOG_BLOCK_LINES * 3)
+    # Errors only in the last block
+    lines[LOG_BLOCK_LINES * 2 + 7] = lines[LOG_BLOCK_LINES * 2 + 7].replace("INFO", "ERROR")
+    store, read = make_store(tmp_path, "\n".join(lines))
+
+    page = store.query_logs("exp", levels=["ERROR"])
+    assert [line["line"] for line in page["lines"]] == [LOG_BLOCK_LINES * 2 + 7]
+    assert page["lines"][0]["level"] == "ERROR"
+    assert read == [2]
+
+    assert [line["line"] for line in store.query_logs("exp", search="REQUEST 12", limit=3)["lines"]] == [12, 120, 121]
+
+
+def test_legacy_plain_text_logs_are_moved_into_blocks(tmp_path):
+    store = ExperimentStore(str(tmp_path / "experiments.db"))
+    store._conn.execute("INSERT INTO experiment_logs (experiment_id, logs) VALUES ('old', ?)", ("\n".join(log_lines(3)),))
+    store._conn.commit()
+
+    assert [line["line"] for line in store.query_logs("old")["lines"]] == [0, 1, 2]
+    assert store._conn.execute("SELECT COUNT(*) FROM experiment_logs").fetchone()[0] == 0
+    assert store.query_logs("missing") is None
+
+
+def test_empty_logs_give_an_empty_page(tmp_path):
+    store, _ = make_store(tmp_path, "")
+    assert store.query_logs("exp", offset=10) == {"total_lines": 0, "offset": 10, "lines": [], "next_offset": None}
+
+    store.create("pending", "network_delay", {}, "running")
+    assert store.query_logs("pending") is None
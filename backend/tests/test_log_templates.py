@@ -0,0 +1,44 @@
+from services.log_templates import cluster_logs, mask_message, render_templates
+
+LOGS = """2024-01-01 12:00:00,000 - INFO - 127.0.0.1 - - [01/Jan/2024 12:00:00] "GET /api/data HTTP/1.1" 200 -
+2024-01-01 12:00:01,500 - INFO - 10.0.0.7 - - [01/Jan/2024 12:00:01] "GET /api/data HTTP/1.1" 200 -
+2024-01-01 12:00:05,000 - ERROR - Request 3f2b8c1d-9e4a-4b7c-8d2e-1a2b3c4d5e6f failed after 2.5s
+Traceback (most recent call last):
+  File "app.py", line 42, in handler
+2024-01-01 12:00:09,000 - ERROR - Request 0a1b2c3d-4e5f-4a7b-8c9d-0e1f2a3b4c5d failed after 10s
+"""
+
+
+def test_masking_replaces_variable_parts():
+    assert mask_message('10.0.0.7:5000 - [01/Jan/2024 12:00:01] "GET /x HTTP/1.1" 200') == '<IP> - <TS> "GET /x HTTP/<NUM>" <NUM>'
+    assert mask_message("worker 0x7f3a pid 4021 took -1.5ms") == "worker <HEX> pid <NUM> took <NUM>ms"
+    assert mask_message("trace deadbeef01 at 2024-01-01T12:00:00.123") == "trace <ID> at <TS>"
+    # Words are not ids just for being hex letters
+    assert mask_message("cafebabe decade") == "cafebabe decade"
+
+
+def test_clustering_groups_lines_and_keeps_record_context():
+    clusters = cluster_logs(LOGS)
+    assert clusters["lines"] == 6
+    assert clusters["levels"] == {"INFO": 2, "ERROR": 4}
+
+    templates = {(t["level"], t["template"]): t for t in clusters["templates"]}
+    access = templates[("INFO", '<IP> - - <TS> "GET /api/data HTTP/<NUM>" <NUM> -')]
+    assert access["count"] == 2
+    failure = templates[("ERROR", "Request <ID> failed after <NUM>s")]
+    assert (failure["count"], failure["first_time"], failure["last_time"]) == (2, "2024-01-01 12:00:05,000", "2024-01-01 12:00:09,000")
+    # The traceback belongs to the first failed request
+    assert templates[("ERROR", "Traceback (most recent call last):")]["first_time"] == "2024-01-01 12:00:05,000"
+
+
+def test_rendering_puts_errors_first_within_the_budget():
+    text = render_templates(cluster_logs(LOGS))
+    lines = text.splitlines()
+    assert lines[0] == "6 lines in 4 templates (ERROR 4, INFO 2)"
+    assert lines[1] == "[ERROR x2, +5s..+9s] Request <ID> failed after <NUM>s"
+    assert lines[-1].startswith("[INFO x2, +0s..+2s]")
+
+    small = render_templates(cluster_logs(LOGS), token_budget=40).splitlines()
+    assert small[1].startswith("[ERROR x2")
+    assert small[-1].endswith("omitted")
+    assert render_templates(cluster_logs("")) == "No log lines"
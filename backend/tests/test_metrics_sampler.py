@@ -0,0 +1,39 @@
+from sandbox_scripts.metrics_sampler import LOG_LINE_PATTERN, LogLevelCounter
+from services import log_index
+
+RECORDS = (
+    "2024-01-01 12:00:00,000 - INFO - started\n"
+    "2024-01-01 12:00:01,000 - ERROR - Exception on /api/data [GET]\n"
+    "Traceback (most recent call last):\n"
+    '  File "app.py", line 40, in get_data\n'
+    "ValueError: Exception raised\n"
+    "2024-01-01 12:00:02,000 - WARNING - 404 error: /missing (not an ERROR)\n"
+)
+
+
+def test_sampler_uses_the_log_index_record_pattern():
+    assert LOG_LINE_PATTERN.pattern == log_index.LOG_LINE_PATTERN.pattern
+
+
+def test_counts_records_not_marker_substrings(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text(RECORDS)
+    counts, deltas = LogLevelCounter(str(path)).update()
+    assert counts == {"error": 1, "warning": 1, "exception": 1}
+    assert deltas == counts
+
+
+def test_continuation_lines_keep_their_record_across_reads(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("2024-01-01 12:00:01,000 - ERROR - failed\nTrace")
+    counter = LogLevelCounter(str(path))
+    assert counter.update()[1] == {"error": 1, "warning": 0, "exception": 0}
+
+    with open(path, "a") as f:
+        f.write("back (most recent call last):\nTraceback (most recent call last):\n")
+    counts, deltas = counter.update()
+    assert deltas == {"error": 0, "warning": 0, "exception": 1}
+    assert counts == {"error": 1, "warning": 0, "exception": 1}
+
+    path.write_text("2024-01-01 12:00:03,000 - CRITICAL - down\n")
+    assert counter.update()[1] == {"error": 1, "warning": 0, "exception": 0}
@@ -0,0 +1,66 @@
+import asyncio
+from types import SimpleNamespace
+
+from services.metrics_stream import AsyncMetricsStreamCollector, parse_metrics_row
+
+COLUMNS = ["time_offset", "cpu_percent", "memory_percent", "error_count", "phase", "warning_count"]
+
+
+class FakeCommands:
+    """Serves `tail -c +N` of an in-memory file"""
+
+    def __init__(self):
+        self.content = ""
+
+    async def run(self, command, timeout=None):
+        offset = int(command.split("+")[1].split()[0]) - 1
+        return SimpleNamespace(stdout=self.content.encode()[offset:].decode())
+
+
+def test_parse_metrics_row_renames_and_types_columns():
+    point = parse_metrics_row(COLUMNS, "3,12.345,40.1,2,1,5")
+    assert point == {"time_offset": 3, "cpu": 12.35, "memory": 40.1, "error_count": 2, "phase": "fault", "warning_count": 5}
+    assert parse_metrics_row(COLUMNS, "3,12.3") is None
+
+
+def test_collector_reports_one_batch_per_poll_and_rereads_partial_rows():
+    async def main():
+        commands = FakeCommands()
+        batches = []
+
+        async def on_samples(points):
+            batches.append([p["time_offset"] for p in points])
+
+        collector = AsyncMetricsStreamCollector(SimpleNamespace(commands=commands), "/tmp/m.csv", on_samples=on_samples)
+        commands.content = "# start_time=1000.5\n" + ",".join(COLUMNS) + "\n0,1,10,0,0,0\n1,2,10,0,0,0\n2,3"
+        assert await collector.poll_once() == 2
+        commands.content += ",10,0,1,0\n"
+        assert await collector.poll_once() == 1
+        assert await collector.poll_once() == 0
+        assert collector.start_time == 1000.5
+        return batches, collector.timeline
+
+    batches, timeline = asyncio.run(main())
+    assert batches == [[0, 1], [2]]
+    assert [p["cpu"] for p in timeline] == [1.0, 2.0, 3.0]
+
+
+def test_collector_aborts_once_when_threshold_crossed():
+    async def main():
+        commands = FakeCommands()
+        reasons = []
+
+        async def on_abort(reason):
+            reasons.append(reason)
+
+        collector = AsyncMetricsStreamCollector(
+            SimpleNamespace(commands=commands), "/tmp/m.csv",
+            abort_thresholds={"cpu": 90, "memory": None}, on_abort=on_abort
+        )
+        commands.content = ",".join(COLUMNS) + "\n0,50,10,0,0,0\n1,95,10,0,1,0\n2,99,10,0,1,0\n"
+        await collector.poll_once()
+        return collector, reasons
+
+    collector, reasons = asyncio.run(main())
+    assert collector.aborted
+    assert len(reasons) == 1 and reasons[0].startswith("cpu reached 95")
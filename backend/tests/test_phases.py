@@ -0,0 +1,46 @@
+from services.phases import combine_phases, phase_boundaries, summarize_phases
+
+
+def timeline():
+    points = []
+    for offset in range(9):
+        phase = "baseline" if offset < 3 else "fault" if offset < 6 else "recovery"
+        cpu = 80.0 if phase == "fault" else 10.0
+        points.append({"time_offset": offset, "cpu": cpu, "memory": 20.0, "error_count": 0, "error_delta": 1 if phase == "fault" else 0, "phase": phase})
+    return points
+
+
+LOAD = {"phases": {
+    "baseline": {"requests": 30, "errors": 0, "timeouts": 0, "status": {}, "throughput_rps": 10.0, "latency_ms": {"p50": 5, "p95": 10, "p99": 12}},
+    "fault": {"requests": 30, "errors": 3, "timeouts": 3, "status": {}, "throughput_rps": 10.0, "latency_ms": {"p50": 50, "p95": 100, "p99": 120}}
+}}
+
+
+def test_phase_boundaries_are_first_sample_per_phase():
+    assert phase_boundaries(timeline()) == {"baseline": 0, "fault": 3, "recovery": 6}
+
+
+def test_summarize_phases_reports_stats_and_deltas_against_baseline():
+    summary = summarize_phases(timeline(), LOAD)
+    fault = summary["phases"]["fault"]
+    assert (fault["start"], fault["end"], fault["samples"]) == (3, 6, 3)
+    assert fault["log_errors"] == 3 and fault["log_error_rate"] == 1.0
+    assert fault["request_error_rate"] == 0.2
+    assert summary["deltas"]["fault"]["cpu_mean"] == {"absolute": 70.0, "percent": 700.0}
+    assert summary["deltas"]["fault"]["latency_p95"]["absolute"] == 90
+    assert "requests" not in summary["phases"]["recovery"]
+
+
+def test_timeline_without_phases_has_no_summary():
+    assert summarize_phases([{"time_offset": 0, "cpu": 1.0}]) is None
+
+
+def test_combined_phases_sum_counts_and_average_rates():
+    one = summarize_phases(timeline(), LOAD)
+    two = summarize_phases([{**p, "cpu": p["cpu"] + 10} for p in timeline()], LOAD)
+    fault = combine_phases([one, None, two])["phases"]["fault"]
+    assert fault["requests"] == 60 and fault["log_errors"] == 6 and fault["samples"] == 6
+    assert fault["cpu_mean"] == 85.0 and fault["request_error_rate"] == 0.2
+    assert fault["throughput_rps"] == 10.0 and fault["latency_p95"] == 100
+    assert (fault["start"], fault["end"]) == (3, 6)
+    assert combine_phases([None]) is None
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+from services.probes import (
+    async_wait_for_file_content,
+    async_wait_for_process_exit,
+    check_condition,
+    wait_until
+)
+from services.sandbox_backends import LocalSandboxBackend
+
+
+def test_wait_until_retries_failing_probes_until_ready():
+    probes = []
+
+    def check():
+        probes.append(time.monotonic())
+        if len(probes) < 3:
+            raise ConnectionError("not listening yet")
+        return len(probes) == 4
+
+    assert wait_until(check, timeout=5, description="app", initial_delay=0.01)
+    assert len(probes) == 4
+    # Backoff doubles the delay between probes
+    assert probes[3] - probes[2] > probes[1] - probes[0]
+
+
+def test_wait_until_gives_up_at_the_deadline():
+    started = time.monotonic()
+    assert not wait_until(lambda: False, timeout=0.2, description="app", initial_delay=0.05)
+    assert time.monotonic() - started < 0.5
+
+
+def test_async_probes_watch_files_and_processes(tmp_path):
+    async def main():
+        sandbox = await LocalSandboxBackend(base_dir=str(tmp_path)).acreate()
+        try:
+            assert not await async_wait_for_file_content(sandbox, "/tmp/out", timeout=0.1)
+            await sandbox.commands.run("(sleep 0.2; echo done > /tmp/out) & echo $! > /tmp/writer.pid", background=True)
+            assert await async_wait_for_file_content(sandbox, "/tmp/out", timeout=5)
+            assert await async_wait_for_process_exit(sandbox, "/tmp/writer.pid", timeout=5)
+        finally:
+            await sandbox.kill()
+
+    asyncio.run(main())
+
+
+def test_check_condition_reports_false_without_raising(tmp_path):
+    sandbox = LocalSandboxBackend(base_dir=str(tmp_path)).create()
+    try:
+        assert check_condition(sandbox, "[ -d /home/user ]")
+        assert not check_condition(sandbox, "[ -s /tmp/missing ]")
+    finally:
+        sandbox.kill()
@@ -0,0 +1,50 @@
+from services.prompt_builder import CHARS_PER_TOKEN, build_prompt, estimate_tokens, render_timeline, truncate_lines
+
+
+def test_sections_share_the_budget_and_pass_on_what_they_leave():
+    budgets = {}
+
+    def section(name, text):
+        def render(budget):
+            budgets[name] = budget
+            return text or "x" * budget * CHARS_PER_TOKEN
+        return render
+
+    prompt, size = build_prompt(
+        lambda parts: "HEADER\n" + "\n".join(parts[name] for name in ("logs", "timeline", "code")),
+        {"logs": section("logs", "short"), "timeline": section("timeline", None), "code": section("code", None)},
+        token_budget=1000
+    )
+
+    # Logs render first with their share; the code gets what the logs left
+    assert size["fixed_tokens"] == estimate_tokens("HEADER\n\n\n")
+    remaining = 1000 - size["fixed_tokens"]
+    assert budgets["logs"] == int(remaining * 0.2)
+    assert budgets["code"] > int(remaining * 0.5)
+    assert size["tokens"] <= 1000
+    assert size["sections"]["logs"]["tokens"] == estimate_tokens("short")
+
+
+def test_timeline_is_downsampled_to_fit():
+    timeline = [{"time_offset": float(i), "cpu": float(i % 50), "memory": 30.5, "phase": "fault"} for i in range(500)]
+
+    small = render_timeline(timeline, 200)
+    assert estimate_tokens(small) <= 200
+    assert small.splitlines()[0].endswith("of 500 samples, downsampled keeping peaks and turning points)")
+    assert small.splitlines()[1] == "time_offset,cpu,memory,phase"
+
+    full = render_timeline(timeline, 100000)
+    assert full.splitlines()[0] == "(500 samples)"
+    assert len(full.splitlines()) == 502
+    assert render_timeline([], 100) == "No timeline data available"
+
+
+def test_truncation_keeps_whole_lines_and_counts_the_rest():
+    text = "\n".join(f"line {i}" for i in range(100))
+    assert truncate_lines(text, 10000) == text
+
+    truncated = truncate_lines(text, 20)
+    lines = truncated.splitlines()
+    assert len(truncated) <= 20 * CHARS_PER_TOKEN
+    assert lines[:-1] == [f"line {i}" for i in range(len(lines) - 1)]
+    assert lines[-1] == f"# ... {100 - (len(lines) - 1)} more lines not shown"
@@ -0,0 +1,72 @@
+import json
+
+import numpy as np
+
+from services.e2b_manager import E2BManager
+from services.recovery import RecoveryAnalyzer
+from services.sandbox_backends import LocalSandboxBackend
+
+BAND = {"relative": 0.0, "absolute": 10.0}
+
+
+def series(values, step=1.0):
+    return np.arange(len(values)) * step, np.asarray(values, dtype=float)
+
+
+def test_metric_that_never_leaves_the_band_is_not_degraded():
+    result = RecoveryAnalyzer(fault_start=3).analyze_series(*series([10, 10, 10, 15, 12, 10]), BAND)
+    assert result["status"] == "not_degraded" and result["time_to_recover"] is None
+    assert result["baseline"] == 10 and result["baseline_source"] == "pre_fault"
+
+
+def test_recovery_needs_the_metric_to_stay_in_band_for_the_hold():
+    values = [10, 10, 10, 50, 60, 10, 50, 10, 10, 10, 10]
+    result = RecoveryAnalyzer(fault_start=3, hold_seconds=3).analyze_series(*series(values), BAND)
+    assert result["status"] == "recovered"
+    assert (result["onset_at"], result["peak"], result["recovered_at"]) == (3, 60, 7)
+    assert result["time_to_recover"] == 4 and result["degraded_seconds"] == 3
+
+
+def test_metric_still_degraded_at_the_end_has_not_recovered():
+    analyzer = RecoveryAnalyzer(fault_start=3)
+    result = analyzer.analyze([
+        {"time_offset": t, "cpu": cpu, "memory": 20.0, "error_count": 0}
+        for t, cpu in enumerate([10, 10, 10, 90, 90, 90])
+    ])
+    assert result["metrics"]["cpu"]["status"] == "not_recovered"
+    assert result["metrics"]["memory"]["status"] == "not_degraded"
+    assert result["status"] == "not_recovered" and result["recovery_time_seconds"] is None
+
+
+def test_run_where_nothing_degraded_has_no_recovery_time():
+    result = RecoveryAnalyzer(fault_start=3).analyze([
+        {"time_offset": t, "cpu": 10.0, "memory": 20.0, "error_count": 0} for t in range(6)
+    ])
+    # Not the 0.0 of a metric that degraded and recovered at once
+    assert result["status"] == "not_degraded" and result["recovery_time_seconds"] is None
+    assert RecoveryAnalyzer().analyze([])["status"] == "insufficient_data"
+
+
+def test_latency_buckets_are_rebased_onto_the_timeline_clock():
+    # The load generator started 2.5s after the sampler; its latency rises
+    # 8s into its own run, i.e. at 10.5s on the timeline where the fault starts at 10s
+    timeline = [
+        {"time_offset": t, "cpu": 10.0, "memory": 20.0, "error_count": 0, "phase": "baseline" if t < 10 else "fault"}
+        for t in range(20)
+    ]
+    lines = [{"type": "start", "start_time": 1002.5}] + [
+        {"type": "bucket", "time_offset": t, "requests": 10, "status": {"200": 10}, "latency_ms": {"p95": 500 if 8 <= t < 12 else 10}}
+        for t in range(1, 18)
+    ]
+    output = "\n".join(json.dumps(line) for line in lines)
+    manager = E2BManager("", backend=LocalSandboxBackend())
+
+    metrics = manager._summarize_timeseries(timeline, "", output, {"hold_seconds": 2}, start_time=1000.0)
+    assert metrics["latency_timeline"][0]["time_offset"] == 3.5
+    latency = metrics["recovery"]["metrics"]["latency_p95"]
+    assert (latency["onset_at"], latency["recovered_at"]) == (10.5, 14.5)
+    assert metrics["recovery"]["status"] == "recovered" and metrics["recovery_time_seconds"] == 4.0
+
+    # Without a common clock the buckets stay on the load generator's offsets
+    unaligned = manager._summarize_load(output)
+    assert unaligned["latency_timeline"][0]["time_offset"] == 1
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from services.sandbox_backends import (
+    LocalCommandExitException,
+    LocalSandbox,
+    LocalSandboxBackend,
+    SandboxBackend,
+    create_sandbox_backend
+)
+
+
+@pytest.fixture
+def sandbox(tmp_path):
+    sandbox = LocalSandbox(base_dir=str(tmp_path))
+    yield sandbox
+    sandbox.kill()
+
+
+def test_sandbox_paths_and_app_port_are_remapped(sandbox):
+    assert sandbox.translate("cat /home/user/app.py /tmp/x.log") == (
+        f"cat {sandbox.root}/home/user/app.py {sandbox.root}/tmp/x.log"
+    )
+    assert sandbox.translate("curl http://localhost:5000/health") == f"curl http://localhost:{sandbox.port}/health"
+    # Only whole sandbox paths and the app port
+    assert sandbox.translate("/usr/tmp/a localhost:50001") == "/usr/tmp/a localhost:50001"
+
+    sandbox.files.write("/home/user/run.sh", "echo /tmp/out")
+    assert sandbox.files.read("/home/user/run.sh") == f"echo {sandbox.root}/tmp/out"
+    assert sandbox.commands.run("bash /home/user/run.sh").stdout.strip() == f"{sandbox.root}/tmp/out"
+    assert b"".join(sandbox.files.read("/home/user/run.sh", format="stream")).decode().startswith("echo ")
+
+
+def test_failed_commands_raise_like_e2b(sandbox):
+    with pytest.raises(LocalCommandExitException) as error:
+        sandbox.commands.run("echo out; echo err >&2; exit 3")
+    assert (error.value.exit_code, error.value.stdout, error.value.stderr) == (3, "out\n", "err\n")
+
+
+def test_kill_stops_background_children_and_removes_the_root(sandbox):
+    handle = sandbox.commands.run("sleep 30 & echo $! > /tmp/child.pid; wait", background=True)
+    pid_file = os.path.join(sandbox.root, "tmp", "child.pid")
+    deadline = time.monotonic() + 5
+    # The file exists before echo has written to it
+    while not (os.path.exists(pid_file) and sandbox.files.read("/tmp/child.pid").endswith("\n")):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    child = int(sandbox.files.read("/tmp/child.pid"))
+
+    sandbox.kill()
+    with pytest.raises(LocalCommandExitException):
+        handle.wait()
+    assert not running(child)
+    assert not os.path.exists(sandbox.root)
+
+
+def running(pid):
+    """Whether a process exists and has not exited (killed orphans may linger as zombies until reaped)"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def test_async_sandbox_mirrors_the_sync_api(tmp_path):
+    async def main():
+        sandbox = await LocalSandboxBackend(base_dir=str(tmp_path)).acreate()
+        try:
+            await sandbox.files.write("/home/user/a.txt", "hello")
+            result = await sandbox.commands.run("cat /home/user/a.txt")
+            handle = await sandbox.commands.run("exit 0", background=True)
+            await handle.wait()
+            return result.stdout
+        finally:
+            await sandbox.kill()
+
+    assert asyncio.run(main()) == "hello"
+
+
+def test_backends_are_created_by_name():
+    assert create_sandbox_backend("local").name == "local"
+    assert create_sandbox_backend("e2b", "key").name == "e2b"
+    with pytest.raises(ValueError):
+        create_sandbox_backend("docker")
+
+
+def test_missing_e2b_key_is_reported_when_sandboxes_are_needed():
+    backend = create_sandbox_backend("e2b")
+    with pytest.raises(ValueError, match="E2B_API_KEY"):
+        backend.check_configured()
+    create_sandbox_backend("e2b", "key").check_configured()
+    create_sandbox_backend("local").check_configured()
+
+
+def test_backend_missing_part_of_the_interface_cannot_be_created():
+    class SyncOnlyBackend(SandboxBackend):
+        def create(self, timeout=120):
+            return None
+
+    with pytest.raises(TypeError):
+        SyncOnlyBackend()
@@ -0,0 +1,90 @@
+import threading
+import time
+
+from services.sandbox_pool import SandboxPool
+
+
+class FakeManager:
+    """Stand-in for E2BManager that records its lifecycle"""
+
+    def __init__(self, provision_seconds: float = 0.0):
+        self.provision_seconds = provision_seconds
+        self.created = False
+        self.cleaned_up = False
+
+    def create_sandbox(self):
+        time.sleep(self.provision_seconds)
+        self.created = True
+
+    def deploy_test_app(self):
+        pass
+
+    def check_health(self) -> bool:
+        return True
+
+    def extend_timeout(self, seconds: int):
+        pass
+
+    def cleanup(self):
+        self.cleaned_up = True
+
+
+def make_pool(size: int, provision_seconds: float = 0.0):
+    managers = []
+    lock = threading.Lock()
+
+    def factory():
+        manager = FakeManager(provision_seconds)
+        with lock:
+            managers.append(manager)
+        return manager
+
+    return SandboxPool(factory, size=size, health_check_interval=0.05), managers
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def test_acquire_hits_warm_sandbox():
+    pool, managers = make_pool(size=1)
+    pool.start()
+    try:
+        wait_for(lambda: pool.metrics()["idle"] == 1)
+        manager = pool.acquire()
+        assert manager is managers[0]
+        assert pool.metrics()["hits"] == 1
+    finally:
+        pool.stop()
+
+
+def test_acquire_without_pool_provisions_on_demand():
+    pool, managers = make_pool(size=0)
+    manager = pool.acquire()
+    assert manager.created
+    assert pool.metrics()["misses"] == 1
+    pool.stop()
+
+
+def test_stop_waits_for_in_flight_provisioning():
+    pool, managers = make_pool(size=2, provision_seconds=0.3)
+    pool.start()
+    wait_for(lambda: pool.metrics()["provisioning"] == 2)
+
+    pool.stop()
+
+    # Sandboxes still being created when stop() was called finish and are destroyed before it returns
+    assert len(managers) == 2
+    assert all(m.created and m.cleaned_up for m in managers)
+    assert pool.metrics()["idle"] == 0
+
+
+def test_stop_destroys_idle_sandboxes():
+    pool, managers = make_pool(size=2)
+    pool.start()
+    wait_for(lambda: pool.metrics()["idle"] == 2)
+    pool.stop()
+    assert all(m.cleaned_up for m in managers)
@@ -0,0 +1,42 @@
+from services.timeseries import combine_latency_timelines, downsample_lttb, resample_timelines
+
+
+def test_resample_aligns_instances_in_time_with_bands():
+    a = [{"time_offset": t, "cpu": 10.0, "error_count": t, "phase": "fault"} for t in range(0, 5)]
+    b = [{"time_offset": t + 0.5, "cpu": 30.0, "error_count": 0, "phase": "fault"} for t in range(0, 5)]
+    points = resample_timelines([a, b], step=1.0)
+    assert [p["time_offset"] for p in points] == [0, 1, 2, 3, 4]
+    assert points[0]["instances"] == 1 and points[0]["cpu"] == 10.0
+    second = points[1]
+    assert second["instances"] == 2 and second["cpu"] == 20.0
+    assert (second["cpu_min"], second["cpu_max"], second["cpu_std"]) == (10.0, 30.0, 10.0)
+    assert isinstance(second["error_count"], int) and second["phase"] == "fault"
+
+
+def test_lttb_keeps_endpoints_and_peak():
+    timeline = [{"time_offset": t, "cpu": 90.0 if t == 137 else 10.0 + (t % 3)} for t in range(500)]
+    sampled = downsample_lttb(timeline, 20, fields=("cpu",))
+    assert len(sampled) == 20
+    assert sampled[0] is timeline[0] and sampled[-1] is timeline[-1]
+    assert any(p["cpu"] == 90.0 for p in sampled)
+    assert downsample_lttb(timeline[:10], 20) == timeline[:10]
+
+
+def bucket(t, requests, p95, rps):
+    return {
+        "time_offset": t, "requests": requests, "errors": 1, "timeouts": 0, "dropped": 0,
+        "status": {"200": requests - 1, "500": 1}, "throughput_rps": rps,
+        "latency_ms": {"p50": p95 / 2, "p95": p95}, "phase": "fault"
+    }
+
+
+def test_latency_buckets_of_instances_are_combined_per_step():
+    a = [bucket(1.0, 10, 100.0, 10.0), bucket(2.0, 10, 100.0, 10.0)]
+    b = [bucket(1.1, 4, 300.0, 4.0), bucket(2.1, 4, 300.0, 4.0), bucket(3.1, 4, 300.0, 4.0)]
+    combined = combine_latency_timelines([a, [], b])
+    assert [(c["time_offset"], c["instances"]) for c in combined] == [(1, 2), (2, 2), (3, 1)]
+    first = combined[0]
+    assert first["requests"] == 14 and first["errors"] == 2
+    assert first["status"] == {"200": 12, "500": 2}
+    assert first["throughput_rps"] == 7.0 and first["latency_ms"]["p95"] == 200.0
+    assert combine_latency_timelines([[], []]) == []
@@ -24,6 +24,7 @@ export interface StatusResponse {
   status: string;
   progress: number;
   message?: string;
+  queue_position?: number | null;
 }
 
 export interface ExperimentMetrics {
@@ -41,6 +42,10 @@ export interface TimelineDataPoint {
   error_count: number;
 }
 
+export interface TimelineSample extends TimelineDataPoint {
+  instance?: number;
+}
+
 export interface ResultsResponse {
   experiment_id: string;
   summary: string;
@@ -76,6 +81,11 @@ export const chaosLabAPI = {
     return response.data;
   },
 
+  // Server-Sent Events stream of status changes and live timeline samples
+  eventsUrl(experimentId: string): string {
+    return `${API_URL}/api/experiment/${experimentId}/events`;
+  },
+
   async healthCheck(): Promise<any> {
     const response = await api.get('/');
     return response.data;
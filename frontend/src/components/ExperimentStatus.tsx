@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { Activity, Clock, Loader } from 'lucide-react';
-import { chaosLabAPI, type StatusResponse } from '../api/client';
+import { chaosLabAPI, type StatusResponse, type TimelineSample } from '../api/client';
 
 interface ExperimentStatusProps {
     experimentId: string;
@@ -13,28 +13,73 @@ export const ExperimentStatus: React.FC<ExperimentStatusProps> = ({
 }) => {
     const [status, setStatus] = useState<StatusResponse | null>(null);
     const [error, setError] = useState<string | null>(null);
+    const [latestSample, setLatestSample] = useState<TimelineSample | null>(null);
 
     useEffect(() => {
+        let interval: ReturnType<typeof setInterval> | null = null;
+
+        const handleStatus = (response: StatusResponse) => {
+            setStatus(response);
+
+            if (response.status === 'completed') {
+                onComplete();
+            } else if (response.status === 'failed') {
+                setError(response.message || 'Experiment failed');
+            }
+        };
+
         const pollStatus = async () => {
             try {
-                const response = await chaosLabAPI.getStatus(experimentId);
-                setStatus(response);
-
-                if (response.status === 'completed') {
-                    onComplete();
-                } else if (response.status === 'failed') {
-                    setError(response.message || 'Experiment failed');
-                }
+                handleStatus(await chaosLabAPI.getStatus(experimentId));
             } catch (err: any) {
                 setError(err.response?.data?.detail || 'Failed to fetch status');
             }
         };
 
-        // Poll every 2 seconds
-        const interval = setInterval(pollStatus, 2000);
-        pollStatus(); // Initial call
+        const startPolling = () => {
+            if (interval) return;
+            // Poll every 2 seconds
+            interval = setInterval(pollStatus, 2000);
+            pollStatus(); // Initial call
+        };
+
+        // Prefer the live event stream; fall back to polling if unavailable
+        if (typeof EventSource === 'undefined') {
+            startPolling();
+            return () => { if (interval) clearInterval(interval); };
+        }
 
-        return () => clearInterval(interval);
+        const source = new EventSource(chaosLabAPI.eventsUrl(experimentId), { withCredentials: true });
+        const handleStreamStatus = (response: StatusResponse) => {
+            handleStatus(response);
+            if (response.status === 'completed' || response.status === 'failed') {
+                source.close();
+            }
+        };
+        source.addEventListener('status', (event) => {
+            handleStreamStatus(JSON.parse((event as MessageEvent).data));
+        });
+        // Sent instead of events that can no longer be replayed: current status plus the timeline so far
+        source.addEventListener('reset', (event) => {
+            const { timeline, ...response } = JSON.parse((event as MessageEvent).data);
+            if (timeline && timeline.length) {
+                setLatestSample(timeline[timeline.length - 1]);
+            }
+            handleStreamStatus(response as StatusResponse);
+        });
+        source.addEventListener('sample', (event) => {
+            setLatestSample(JSON.parse((event as MessageEvent).data));
+        });
+        source.onerror = () => {
+            if (source.readyState === EventSource.CLOSED) {
+                startPolling();
+            }
+        };
+
+        return () => {
+            source.close();
+            if (interval) clearInterval(interval);
+        };
     }, [experimentId, onComplete]);
 
     if (error) {
@@ -67,6 +112,8 @@ export const ExperimentStatus: React.FC<ExperimentStatusProps> = ({
         );
     }
 
+    const queuePosition = status.queue_position;
+
     const getStatusBadge = (status: string) => {
         switch (status) {
             case 'pending':
@@ -87,7 +134,9 @@ export const ExperimentStatus: React.FC<ExperimentStatusProps> = ({
     const getStatusMessage = (status: string) => {
         switch (status) {
             case 'pending':
-                return 'Preparing experiment environment...';
+                return queuePosition
+                    ? `Waiting for sandbox capacity (position ${queuePosition} in queue)...`
+                    : 'Preparing experiment environment...';
             case 'running':
                 return 'Running chaos scenario in E2B sandbox...';
             case 'analyzing':
@@ -193,6 +242,13 @@ export const ExperimentStatus: React.FC<ExperimentStatusProps> = ({
                 })}
             </div>
 
+            {/* Live Metrics */}
+            {latestSample && status.status === 'running' && (
+                <div className="font-mono" style={{ marginTop: '24px', fontSize: '13px', color: 'var(--text-secondary)' }}>
+                    t+{latestSample.time_offset}s · CPU {latestSample.cpu.toFixed(1)}% · Memory {latestSample.memory.toFixed(1)}% · Errors {latestSample.error_count}
+                </div>
+            )}
+
             {/* Additional Info */}
             {status.status === 'running' && (
                 <div style={{ marginTop: '32px', padding: '16px', background: 'var(--bg-subtle)', borderRadius: 'var(--radius-md)', fontSize: '13px', color: 'var(--text-secondary)' }}>